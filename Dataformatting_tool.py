@@ -1,49 +1,2228 @@
+from __future__ import annotations
+
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox, simpledialog
-import pandas as pd
-import xml.etree.ElementTree as ET
 import os
+import sys
 import threading
 import re
 import json
-import xmlschema
+import csv
+import codecs
+import io
+import time
+import cProfile
+import pstats
+import sqlite3
+import math
+import gc
+import warnings
+import hashlib
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import StringIO
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+from lazy_imports import LazyModule, warm_in_background
+from compressed_io import (COMPRESSION_CODECS, open_output, compressed_path, input_compression, open_input,
+                           strip_compression_ext)
+from conversion_service import DEFAULT_URL, submit_job, wait_for_job, job_summary
+
+# Heavy libraries load on first use (or from a background thread once the window is up)
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+ET = LazyModule("xml.etree.ElementTree")
+xmlschema = LazyModule("xmlschema")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # ---------------------------
 # Helper Classes for Validation
 # ---------------------------
 
+VALIDATION_CHUNK_ROWS = 100000
+VALIDATION_KEEP_ERRORS = 500    # errors kept for the summary/error list; the rest are only counted or reported
+
+
 class ValidationRule:
     def __init__(self, col_name, rule_type, param=None):
         self.col_name = col_name
         self.rule_type = rule_type  # e.g. 'not_null', 'date', 'regex'
         self.param = param          # e.g. regex pattern
 
-    def validate(self, series: pd.Series):
-        errors = []
+    def validate(self, series, limit=None):
+        # Whole-column checks; limit caps how many (index, message) pairs come back, in row order
         if self.rule_type == "not_null":
-            invalid_rows = series[series.isnull()]
-            for idx in invalid_rows.index:
-                errors.append((idx, f"Null value in column '{self.col_name}'"))
+            bad = series.isnull().to_numpy()
+            if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+                bad = bad | series.astype("string").str.strip().eq("").fillna(False).to_numpy(dtype=bool)
+            positions = np.flatnonzero(bad)[:limit]
+            return [(series.index[pos], "Value cannot be null or empty") for pos in positions]
         elif self.rule_type == "date":
-            # Attempt to convert to datetime, errors if fail
-            invalid_rows = []
-            for idx, val in series.items():
-                if pd.isnull(val):
-                    continue
-                try:
-                    pd.to_datetime(val)
-                except Exception:
-                    invalid_rows.append(idx)
-            for idx in invalid_rows:
-                errors.append((idx, f"Invalid date in column '{self.col_name}': {series[idx]}"))
+            positions = self.invalid_date_positions(series, limit)
+            return [(series.index[pos], f"Invalid date: {series.iloc[pos]}") for pos in positions]
         elif self.rule_type == "regex":
-            pattern = re.compile(self.param)
-            invalid_rows = series[~series.fillna("").astype(str).apply(lambda x: bool(pattern.fullmatch(x)))]
-            for idx in invalid_rows.index:
-                errors.append((idx, f"Regex mismatch in '{self.col_name}': {series[idx]}"))
+            present = np.flatnonzero(series.notna().to_numpy())
+            matched = series.iloc[present].astype(str).str.match(self.param).to_numpy(dtype=bool)
+            positions = present[~matched][:limit]
+            return [(series.index[pos], f"Value does not match pattern: {self.param}") for pos in positions]
+        return []
+
+    @staticmethod
+    def invalid_date_positions(series, limit=None):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            return []
+        positions = np.flatnonzero(series.notna().to_numpy())
+        values = series.iloc[positions]
+        # Bulk parses narrow the column down to suspects: first with one inferred format, then value by value
+        for fmt in (None, "mixed"):
+            if not len(positions):
+                break
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    failed = pd.to_datetime(values, errors="coerce", format=fmt).isna().to_numpy()
+            except (ValueError, TypeError):
+                continue
+            positions, values = positions[failed], values[failed]
+        # Suspects get the exact per-value check (blank strings parse to NaT without raising, for instance)
+        invalid = []
+        for pos, val in zip(positions, values):
+            if limit is not None and len(invalid) >= limit:
+                break
+            try:
+                pd.to_datetime(val)
+            except Exception:
+                invalid.append(pos)
+        return invalid
+
+
+def validate_frame(df, rules, max_errors=None, report=None):
+    # Checks the frame chunk by chunk so a capped run stops as soon as max_errors is reached.
+    # report is an optional csv writer that receives every error as it is found.
+    kept, count = [], 0
+    for start in range(0, max(len(df), 1), VALIDATION_CHUNK_ROWS):
+        chunk = df.iloc[start:start + VALIDATION_CHUNK_ROWS]
+        for rule in rules:
+            # A SQL stage result may not carry every column a rule was defined for
+            if rule.col_name not in chunk.columns:
+                continue
+            remaining = None if max_errors is None else max_errors - count
+            found = rule.validate(chunk[rule.col_name], remaining)
+            count += len(found)
+            kept.extend(found[:max(0, VALIDATION_KEEP_ERRORS - len(kept))])
+            if report is not None:
+                report.writerows((idx + 1, rule.col_name, rule.rule_type, msg) for idx, msg in found)
+            if max_errors is not None and count >= max_errors:
+                return kept, count, True
+    return kept, count, False
+
+
+def stratified_sample(df, n, strata=100, seed=None):
+    # Equal-share random rows from each of `strata` contiguous slices, so problems confined to one part
+    # of the file still show up; original index labels are kept for the error list
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(0, len(df), min(strata, n) + 1).astype(int)
+    sizes = np.diff(edges)
+    take = sizes * n // len(df)
+    # Hand out the rows lost to rounding, largest remainders first
+    short = n - take.sum()
+    take[np.argsort(-(sizes * n % len(df)), kind="stable")[:short]] += 1
+    positions = np.concatenate([lo + rng.choice(size, k, replace=False)
+                                for lo, size, k in zip(edges[:-1], sizes, take) if k])
+    return df.iloc[np.sort(positions)]
+
+# ---------------------------
+# Helper Functions for Export
+# ---------------------------
+
+DELIMITER_MAP = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}
+# (between records, after each record) as the block writers lay out lines
+RECORD_TERMINATORS = {"Fixed Width": ("\n", ""), "Delimited": ("", "\n")}
+FORMATTED_OUTPUTS = ("Fixed Width", "Delimited", "XML")    # outputs that apply per-column format specs
+DEFAULT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"     # what str(Timestamp) gives without sub-second parts
+DATE_FIELDS = re.compile(r"(%.)")                   # strftime directives between literal text
+VECTOR_DATE_FIELDS = {"%Y", "%y", "%m", "%d", "%H", "%M", "%S", "%%"}     # the ones date_texts builds itself
+NUMBER_FORMAT_SPEC = re.compile(r"(?P<align>[<>])?(?P<zero>0)?(?P<width>[1-9]\d*)?(?:\.(?P<decimals>\d+))?f?")
+
+
+class ColumnFormat:
+    # Text spec for one column: a strftime pattern (anything containing "%"), or the number part of Python's
+    # format spec, [<|>][0][width][.decimals]: ".2", ">.2", "08", ">12.2". A bare "0" zero-pads to the
+    # fixed-width field; other formats need an explicit width for padding.
+    def __init__(self, spec):
+        self.spec = spec.strip()
+        self.date = None
+        self.align = "<"
+        self.zero = False
+        self.width = None
+        self.decimals = None
+        if "%" in self.spec:
+            self.date = self.spec
+            return
+        match = NUMBER_FORMAT_SPEC.fullmatch(self.spec)
+        if not self.spec or match is None:
+            raise ValueError(f"Invalid format spec '{spec}'")
+        self.zero = bool(match["zero"])
+        self.align = match["align"] or (">" if self.zero else "<")
+        self.width = int(match["width"]) if match["width"] else None
+        self.decimals = int(match["decimals"]) if match["decimals"] is not None else None
+
+    @classmethod
+    def parse_all(cls, specs):
+        # {column: spec text} -> {column: ColumnFormat}; blank specs are skipped
+        formats = {}
+        for col, spec in (specs or {}).items():
+            if spec and spec.strip():
+                try:
+                    formats[col] = cls(spec)
+                except ValueError as e:
+                    raise ValueError(f"Column '{col}': {e}")
+        return formats
+
+
+def plain_texts(series):
+    # str(value) for every value, as the row-by-row renderers produced
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        dates = series.dropna()
+        if not (dates.dt.microsecond.any() or dates.dt.nanosecond.any()):
+            return series.dt.strftime(DEFAULT_DATETIME_FORMAT).to_numpy(dtype=object)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == "b":
+        return np.where(series.to_numpy(), "True", "False").astype(object)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "iu":
+        return series.to_numpy().astype(np.dtypes.StringDType()).astype(object)
+    # Floats stay on str(): numpy's float-to-text casts are slower than Python's repr
+    return np.array(list(map(str, series.to_numpy(dtype=object))), dtype=object)
+
+
+def date_texts(dates, pattern):
+    # strftime for a naive datetime column built from whole-column arithmetic; None when the pattern uses a
+    # directive not covered here (or a year strftime would not write as four digits)
+    parts = DATE_FIELDS.split(pattern)
+    if (not pd.api.types.is_datetime64_dtype(dates.dtype) or not set(parts[1::2]) <= VECTOR_DATE_FIELDS
+            or any("%" in literal for literal in parts[::2])):
+        return None
+    values = dates.to_numpy().astype("M8[s]")
+    values[np.isnat(values)] = np.datetime64(0, "s")
+    days = values.astype("M8[D]")
+    months = days.astype("M8[M]")
+    years = months.astype("M8[Y]").astype(np.int64) + 1970
+    if len(years) and (years.min() < 1000 or years.max() > 9999):
+        return None
+    seconds = (values - days).astype(np.int64)
+    pairs = np.array([f"{i:02d}" for i in range(100)])
+    fields = {
+        "%Y": lambda: np.strings.add(pairs[years // 100], pairs[years % 100]),
+        "%y": lambda: pairs[years % 100],
+        "%m": lambda: pairs[months.astype(np.int64) % 12 + 1],
+        "%d": lambda: pairs[(days - months).astype(np.int64) + 1],
+        "%H": lambda: pairs[seconds // 3600],
+        "%M": lambda: pairs[seconds // 60 % 60],
+        "%S": lambda: pairs[seconds % 60],
+        "%%": lambda: "%",
+    }
+    texts = np.full(len(values), parts[0])
+    for directive, literal in zip(parts[1::2], parts[2::2]):
+        texts = np.strings.add(np.strings.add(texts, fields[directive]()), literal)
+    return texts.astype(object)
+
+
+def column_texts(series, fmt=None, width=None):
+    # Text of a whole column ("" where missing); width is the fixed-width field a bare zero-pad fills
+    missing = series.isna().to_numpy()
+    if fmt is not None and fmt.date and not pd.api.types.is_numeric_dtype(series.dtype):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            dates = series
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                dates = pd.to_datetime(series, errors="coerce", format="mixed")
+        texts = date_texts(dates, fmt.date)
+        if texts is None:
+            texts = dates.dt.strftime(fmt.date).to_numpy(dtype=object)
+        unparsed = dates.isna().to_numpy() & ~missing
+        if unparsed.any():
+            # Values that aren't dates are written as they are
+            texts[unparsed] = plain_texts(series[unparsed])
+    else:
+        texts = plain_texts(series)
+        if fmt is not None and (fmt.decimals is not None or fmt.zero):
+            # Text columns (object or pandas' str dtype) may hold numbers as strings
+            numeric = series if pd.api.types.is_numeric_dtype(series.dtype) else pd.to_numeric(series, errors="coerce")
+            numbers = numeric.notna().to_numpy() & ~missing
+            if pd.api.types.is_bool_dtype(numeric.dtype) or not pd.api.types.is_numeric_dtype(numeric.dtype):
+                numbers[:] = False
+            if fmt.decimals is not None and numbers.any():
+                # "%" is Python's correctly rounded formatting; np.char.mod and round().astype(str) were slower
+                pattern = f"%.{fmt.decimals}f"
+                texts[numbers] = [pattern % v for v in numeric[numbers].astype(float).tolist()]
+            pad = fmt.width or width
+            if fmt.zero and pad and numbers.any():
+                # zfill keeps the sign in front: -1.5 -> -001.5
+                texts[numbers] = np.strings.zfill(texts[numbers].astype(str), pad)
+    if fmt is not None and fmt.width:
+        present = pd.Series(texts[~missing], dtype=object)
+        texts[~missing] = (present.str.rjust(fmt.width) if fmt.align == ">" else present.str.ljust(fmt.width))
+    texts[missing] = ""
+    return texts
+
+
+def format_frame(df, formats):
+    # Copy of df with the formatted columns replaced by their text, for writers that encode values themselves
+    if not formats:
+        return df
+    df = df.copy(deep=False)
+    for i, col in enumerate(df.columns):
+        if col in formats:
+            df.isetitem(i, column_texts(df.iloc[:, i], formats[col]))
+    return df
+
+
+def render_fixed_width_lines(df, widths, formats=None):
+    # One column at a time; the per-row work is a single str.format that truncates and aligns every field
+    formats = formats or {}
+    if not len(df.columns):
+        return [""] * len(df)
+    columns, line = [], ""
+    for i, (col, width) in enumerate(zip(df.columns, widths)):
+        fmt = formats.get(col)
+        columns.append(column_texts(df.iloc[:, i], fmt, width))
+        line += f"{{:{fmt.align if fmt else '<'}{width}.{width}}}" if width > 0 else "{:.0}"
+    return list(map(line.format, *columns))
+
+
+def quote_delimited_field(val, delim):
+    text = "" if pd.isnull(val) else str(val)
+    if delim in text or '"' in text or "\n" in text or "\r" in text:
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def render_delimited_lines(df, delim, header=False):
+    # Rendered by hand because the csv module rejects multi-character delimiters such as "|||"
+    lines = []
+    if header:
+        lines.append(delim.join(quote_delimited_field(col, delim) for col in df.columns))
+    for row in df.itertuples(index=False, name=None):
+        lines.append(delim.join(quote_delimited_field(val, delim) for val in row))
+    return lines
+
+
+# One to_csv record: quoted fields may hold newlines, so a record ends at the first "\n" outside quotes
+CSV_RECORD = re.compile(r'(?:"(?:[^"]|"")*"|[^"\n])*\n')
+
+
+def split_csv_records(text):
+    return [record[:-1] for record in CSV_RECORD.findall(text)]
+
+
+def render_xml_rows(df, row_tag, formats=None):
+    # Same markup ElementTree produced per row (<col /> for empty values), built a column at a time
+    formats = formats or {}
+    if not len(df.columns):
+        return [f"<{row_tag} />"] * len(df)
+    elements = []
+    for i, col in enumerate(df.columns):
+        texts = xml_escape_values(column_texts(df.iloc[:, i], formats.get(col)))
+        tagged = f"<{col}>" + texts + f"</{col}>"
+        tagged[texts == ""] = f"<{col} />"
+        elements.append(tagged)
+    return [f"<{row_tag}>{''.join(parts)}</{row_tag}>" for parts in zip(*elements)]
+
+
+def xml_root_tags(root_tag):
+    # Opening and closing root tags; a "{ns}Root" template tag becomes a default namespace declaration
+    if root_tag.startswith("{"):
+        ns, local = root_tag[1:].split("}", 1)
+        return f'<{local} xmlns="{ns}">', f"</{local}>"
+    return f"<{root_tag}>", f"</{root_tag}>"
+
+
+def make_record_encoder(encoding, with_bom=True):
+    encoder = codecs.getincrementalencoder(encoding)()
+    if not with_bom:
+        # Swallow the BOM that utf-16/utf-8-sig emit on first use so patched records don't carry one
+        encoder.encode("")
+    return encoder
+
+# ---------------------------
+# Helper Classes for XSD-driven XML
+# ---------------------------
+
+XS = "{http://www.w3.org/2001/XMLSchema}"
+XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+XSD_INTEGER_KINDS = {"integer", "nonPositiveInteger", "negativeInteger", "long", "int", "short", "byte",
+                     "nonNegativeInteger", "unsignedLong", "unsignedInt", "unsignedShort", "unsignedByte",
+                     "positiveInteger"}
+XSD_DATE_FORMATS = {"date": "%Y-%m-%d", "dateTime": "%Y-%m-%dT%H:%M:%S", "time": "%H:%M:%S",
+                    "gYear": "%Y", "gYearMonth": "%Y-%m"}
+XSD_KINDS = XSD_INTEGER_KINDS | set(XSD_DATE_FORMATS) | {"decimal", "float", "double", "boolean", "string",
+                                                          "normalizedString", "token"}
+# Facets checked column-wise; any other facet sends the field through xmlschema's per-value check
+XSD_RANGE_FACETS = {"minInclusive", "maxInclusive", "minExclusive", "maxExclusive"}
+XSD_COLUMN_FACETS = XSD_RANGE_FACETS | {"length", "minLength", "maxLength", "pattern", "enumeration", "whiteSpace"}
+XSD_NUMERIC_KINDS = XSD_INTEGER_KINDS | {"decimal", "float", "double"}
+XSD_TRUE = {"true", "1", "yes", "y", "t"}
+XSD_FALSE = {"false", "0", "no", "n", "f"}
+
+
+def xsd_kind(xsd_type):
+    # Nearest built-in ancestor the generator knows how to format, or None
+    while xsd_type is not None:
+        name = getattr(xsd_type, "name", None) or ""
+        if name.startswith(XS) and name[len(XS):] in XSD_KINDS:
+            return name[len(XS):]
+        xsd_type = getattr(xsd_type, "base_type", None)
+    return None
+
+
+def xsd_facets(xsd_type):
+    facets = []
+    while xsd_type is not None:
+        facets.extend((key[len(XS):], facet) for key, facet in (getattr(xsd_type, "facets", None) or {}).items()
+                      if key is not None)
+        xsd_type = getattr(xsd_type, "base_type", None)
+    return facets
+
+
+def column_key(name):
+    return re.sub(r"[^0-9a-z]", "", str(name).lower())
+
+
+def xml_escape_values(values, quote=False):
+    # values: object array of str; only the entries holding markup characters are rewritten
+    markup = '&<>"' if quote else "&<>"
+    joined = "".join(values)
+    if not any(ch in joined for ch in markup):
+        return values
+    special = pd.Series(values, dtype=object).str.contains(f"[{markup}]").to_numpy(dtype=bool)
+    values = values.copy()
+    entities = {'"': "&quot;"} if quote else {}
+    values[special] = [xml_escape(val, entities) for val in values[special]]
+    return values
+
+
+class XSDField:
+    # A simple-typed element, simple content or attribute of the record, bound to at most one column
+    def __init__(self, xsd_type, path, required, default=None, nillable=False):
+        self.xsd_type = xsd_type
+        self.path = path
+        self.required = required
+        self.default = default
+        self.nillable = nillable
+        self.column = None
+        self.kind = xsd_kind(xsd_type) if xsd_type is not None and xsd_type.is_atomic() else None
+        self.facets = xsd_facets(xsd_type) if self.kind else []
+        # Ranges are only compared column-wise for numbers; date/time bounds go through xmlschema
+        self.exact = self.kind is not None and all(
+            name in XSD_COLUMN_FACETS
+            and (name != "enumeration" or self.kind in ("string", "normalizedString", "token"))
+            and (name not in XSD_RANGE_FACETS or self.kind in XSD_NUMERIC_KINDS)
+            for name, _ in self.facets)
+
+    @property
+    def local(self):
+        return self.path.rsplit("/", 1)[-1].lstrip("@")
+
+    @property
+    def type_label(self):
+        return getattr(self.xsd_type, "local_name", None) or self.kind or "value"
+
+    def typed_texts(self, series):
+        # Lexical form of every value for this field's type ("" where missing), plus missing/invalid row masks
+        missing = series.isna().to_numpy()
+        invalid = np.zeros(len(series), dtype=bool)
+        numeric = None
+        if self.kind in XSD_DATE_FORMATS:
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                parsed = series
+            else:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+            invalid = parsed.isna().to_numpy() & ~missing
+            texts = parsed.dt.strftime(XSD_DATE_FORMATS[self.kind])
+        elif self.kind == "boolean":
+            if pd.api.types.is_bool_dtype(series.dtype):
+                texts = series.map({True: "true", False: "false"})
+            else:
+                spellings = {}
+                for val in series.dropna().unique():
+                    word = str(val).strip().lower().removesuffix(".0")
+                    spellings[val] = "true" if word in XSD_TRUE else "false" if word in XSD_FALSE else None
+                texts = series.map(spellings)
+            invalid = texts.isna().to_numpy() & ~missing
+        elif self.kind in XSD_NUMERIC_KINDS:
+            numeric = pd.to_numeric(series, errors="coerce")
+            invalid = numeric.isna().to_numpy() & ~missing
+            if self.kind in XSD_INTEGER_KINDS:
+                if pd.api.types.is_integer_dtype(numeric.dtype):
+                    texts = numeric.astype(str)
+                else:
+                    integral = (numeric % 1 == 0).to_numpy(dtype=bool)
+                    invalid |= ~integral & ~missing
+                    texts = numeric.where(integral).astype("Int64").astype(str)
+            else:
+                texts = numeric.astype(str)
+                if self.kind == "decimal":
+                    # xs:decimal has no exponent notation
+                    exponent = texts.str.contains("e", regex=False).to_numpy(dtype=bool)
+                    if exponent.any():
+                        texts[exponent] = [np.format_float_positional(v, trim="-") for v in numeric[exponent]]
+                else:
+                    texts = texts.replace({"inf": "INF", "-inf": "-INF"})
+        else:
+            texts = series.astype(str)
+        texts = texts.to_numpy(dtype=object, copy=True)
+        texts[missing | invalid] = ""
+        invalid |= self.facet_failures(texts, numeric) & ~missing
+        return texts, missing, invalid
+
+    def facet_failures(self, texts, numeric):
+        failed = np.zeros(len(texts), dtype=bool)
+        if not self.exact:
+            # Rare facets/types: ask xmlschema, once per distinct value
+            verdict = {text: bool(self.xsd_type.is_valid(text)) for text in set(texts)}
+            return ~np.array([verdict[text] for text in texts], dtype=bool)
+        texts = pd.Series(texts, dtype=object)
+        lengths = None
+        for name, facet in self.facets:
+            if name in XSD_RANGE_FACETS:
+                bound = float(facet.value)
+                values = numeric.to_numpy(dtype=float, na_value=np.nan)
+                check = {"minInclusive": values >= bound, "maxInclusive": values <= bound,
+                         "minExclusive": values > bound, "maxExclusive": values < bound}[name]
+                failed |= ~check & ~np.isnan(values)
+            elif name in ("length", "minLength", "maxLength"):
+                lengths = texts.str.len().to_numpy() if lengths is None else lengths
+                limit = facet.value
+                failed |= {"length": lengths != limit, "minLength": lengths < limit,
+                           "maxLength": lengths > limit}[name]
+            elif name == "pattern":
+                matched = np.zeros(len(texts), dtype=bool)
+                for pattern in facet.patterns:
+                    matched |= texts.str.match(pattern).to_numpy(dtype=bool)
+                failed |= ~matched
+            elif name == "enumeration":
+                failed |= ~texts.isin([str(v) for v in facet.enumeration]).to_numpy()
+        return failed
+
+
+class XSDElementNode:
+    # Element of the record template: attributes, then either simple text or child elements in schema order
+    def __init__(self, name, path, required):
+        self.name = name
+        self.path = path
+        self.required = required
+        self.attributes = []    # [(qualified name, XSDField)]
+        self.text = None        # XSDField for simple content
+        self.children = []      # [XSDElementNode]
+
+    def fields(self):
+        for _, field in self.attributes:
+            yield field
+        if self.text is not None:
+            yield self.text
+        for child in self.children:
+            yield from child.fields()
+
+
+class XSDRecordGenerator:
+    # Compiled once from the XSD: the root element, its repeating record element and the record's element
+    # tree with types, order, occurrence and attributes. Columns are bound to schema paths by name
+    # ("Address_City", "Address/City" or a unique "City"; attributes as "@id" or "id"), and each block of rows
+    # is rendered column-wise into XML that is valid by construction, or rejected with row-level errors.
+    max_depth = 12
+
+    def __init__(self, schema_path, columns):
+        schema = xmlschema.XMLSchema(schema_path)
+        self.problems = []
+        self.namespaces = {}
+        self.uses_nil = False
+        self.target_ns = schema.target_namespace or ""
+        # The target namespace can be the default one only if every local element is qualified
+        self.default_ns = self.target_ns if schema.element_form_default == "qualified" else None
+        root, record = self.find_record(schema)
+        self.root_tag = self.qname(root.name)
+        self.root_attributes = self.fixed_attributes(root)
+        self.record = self.compile_element(record, "", 0, set(map(column_key, columns)))
+        self.columns_unused = self.bind(columns)
+        self.check_unbound()
+
+    # ------------- compilation --------------
+
+    def find_record(self, schema):
+        for root in schema.elements.values():
+            if not root.type.is_complex() or root.type.has_simple_content():
+                continue
+            for particle in self.iter_particles(root.type.content):
+                if hasattr(particle, "type") and (particle.max_occurs is None or particle.max_occurs > 1):
+                    for other in self.iter_particles(root.type.content):
+                        if other is not particle and hasattr(other, "type") and other.min_occurs > 0:
+                            self.problems.append(f"Required element {other.local_name} under the root is not "
+                                                 f"generated; only the repeating record element is.")
+                    return root, particle
+        raise ValueError("The XSD has no root element with a repeating record element.")
+
+    def iter_particles(self, group):
+        for particle in group or []:
+            if hasattr(particle, "model"):
+                yield from self.iter_particles(particle)
+            else:
+                yield particle
+
+    def fixed_attributes(self, element):
+        attrs = []
+        for name, attr in element.attributes.items():
+            if name is None or attr.use != "required":
+                continue
+            value = attr.fixed if attr.fixed is not None else attr.default
+            if value is None:
+                self.problems.append(f"Required root attribute {attr.local_name} has no fixed or default value.")
+            else:
+                attrs.append((self.qname(name, attribute=True), str(value)))
+        return attrs
+
+    def compile_element(self, element, path, depth, keys):
+        # path is relative to the record element, which itself has the empty path
+        node = XSDElementNode(self.qname(element.name), path, element.min_occurs > 0 or depth == 0)
+        if depth > self.max_depth:
+            return node
+        for name, attr in element.attributes.items():
+            if name is None or attr.use == "prohibited":
+                continue
+            field = XSDField(attr.type, f"{path}/@{attr.local_name}".lstrip("/"), attr.use == "required",
+                             attr.fixed if attr.fixed is not None else attr.default)
+            node.attributes.append((self.qname(name, attribute=True), field))
+        xsd_type = element.type
+        if xsd_type.is_simple() or xsd_type.has_simple_content():
+            simple = xsd_type if xsd_type.is_simple() else xsd_type.content
+            node.text = XSDField(simple, path or element.local_name, True,
+                                 element.fixed if element.fixed is not None else element.default, element.nillable)
+            self.uses_nil |= element.nillable
+        else:
+            self.compile_group(node, xsd_type.content, path, depth, keys)
+        return node
+
+    def compile_group(self, node, group, path, depth, keys):
+        if group is None:
+            return
+        if getattr(group, "model", None) == "choice":
+            # Take the first branch that any column binds to (or the first branch if the choice is required)
+            branches = [self.compile_particle(particle, path, depth, keys) for particle in group]
+            branches = [branch for branch in branches if branch]
+            bound = [branch for branch in branches
+                     if any(self.field_keys(field) & keys for child in branch for field in child.fields())]
+            chosen = bound[:1] or (branches[:1] if group.min_occurs > 0 else [])
+            for branch in chosen:
+                node.children.extend(branch)
+            return
+        for particle in group:
+            node.children.extend(self.compile_particle(particle, path, depth, keys))
+
+    def compile_particle(self, particle, path, depth, keys):
+        if hasattr(particle, "model"):
+            holder = XSDElementNode(None, path, False)
+            self.compile_group(holder, particle, path, depth, keys)
+            return holder.children
+        if not hasattr(particle, "type"):
+            return []   # xs:any wildcards are left out
+        return [self.compile_element(particle, f"{path}/{particle.local_name}".lstrip("/"), depth + 1, keys)]
+
+    def qname(self, name, attribute=False):
+        if not name.startswith("{"):
+            return name
+        ns, local = name[1:].split("}", 1)
+        if ns == self.default_ns and not attribute:
+            self.namespaces.setdefault("", ns)
+            return local
+        prefix = "tns" if ns == self.target_ns else f"ns{len(self.namespaces)}"
+        for existing, uri in self.namespaces.items():
+            if uri == ns and existing:
+                prefix = existing
+        self.namespaces[prefix] = ns
+        return f"{prefix}:{local}"
+
+    @staticmethod
+    def field_keys(field):
+        path = field.path.replace("@", "")
+        return {column_key(path), column_key(field.local)}
+
+    def bind(self, columns):
+        by_key = {}
+        for col in columns:
+            by_key.setdefault(column_key(col), col)
+        fields = list(self.record.fields())
+        # Full paths first, then leaf names that are unique within the record
+        for field in fields:
+            col = by_key.pop(column_key(field.path.replace("@", "")), None)
+            if col is not None:
+                field.column = col
+        local_counts = {}
+        for field in fields:
+            local_counts[column_key(field.local)] = local_counts.get(column_key(field.local), 0) + 1
+        for field in fields:
+            key = column_key(field.local)
+            if field.column is None and local_counts[key] == 1 and key in by_key:
+                field.column = by_key.pop(key)
+        return list(by_key.values())
+
+    def check_unbound(self, node=None):
+        # Only fields every record must carry; optional branches without columns are simply left out
+        node = node or self.record
+        if not node.required:
+            return
+        for _, field in node.attributes:
+            if field.column is None and field.default is None and field.required:
+                self.problems.append(f"Required attribute {field.path} has no matching column.")
+        text = node.text
+        if text is not None and text.column is None and text.default is None and not text.nillable:
+            self.problems.append(f"Required element {text.path} has no matching column.")
+        for child in node.children:
+            self.check_unbound(child)
+
+    # ------------- rendering --------------
+
+    def field_data(self, df):
+        # field -> (lexical text, missing mask, invalid mask); positional, so block indexes don't matter
+        df = df.reset_index(drop=True)
+        data = {"rows": len(df)}
+        for field in self.record.fields():
+            if field.column is None:
+                n = len(df)
+                text = np.full(n, field.default or "", dtype=object)
+                missing = np.full(n, field.default is None)
+                data[field] = (text, missing, np.zeros(n, dtype=bool))
+                continue
+            text, missing, invalid = field.typed_texts(df[field.column])
+            if field.default is not None:
+                text = np.where(missing, field.default, text)
+                missing = np.zeros(len(df), dtype=bool)
+            data[field] = (text, missing, invalid)
+        return data
+
+    def node_present(self, node, data):
+        # Rows where the node has content from a bound column (defaults alone don't make it appear)
+        n = data["rows"]
+        if node.text is not None:
+            return ~data[node.text][1] if node.text.column is not None else np.zeros(n, dtype=bool)
+        present = np.zeros(n, dtype=bool)
+        for _, field in node.attributes:
+            if field.column is not None:
+                present |= ~data[field][1]
+        for child in node.children:
+            present |= self.node_present(child, data)
+        return present
+
+    def field_failures(self, data, node=None, rows=None):
+        # (field, invalid rows, missing-but-required rows) for every bound field, in document order
+        node = node or self.record
+        rows = np.ones(data["rows"], dtype=bool) if rows is None else rows
+        # rows: where this node's parent is written; optional nodes are only written with content
+        rows = rows if node.required else rows & self.node_present(node, data)
+        fields = [field for _, field in node.attributes] + ([node.text] if node.text is not None else [])
+        for field in fields:
+            if field.column is None:
+                continue
+            _, missing, invalid = data[field]
+            required = field.required and not field.nillable
+            yield field, invalid & rows, (missing & rows if required else np.zeros(len(rows), dtype=bool))
+        for child in node.children:
+            yield from self.field_failures(data, child, rows)
+
+    def rejected_rows(self, data):
+        rejected = np.zeros(data["rows"], dtype=bool)
+        for _, invalid, missing in self.field_failures(data):
+            rejected |= invalid | missing
+        return rejected
+
+    def row_errors(self, df, limit=None, data=None):
+        data = data if data is not None else self.field_data(df)
+        errors = []
+
+        def report(positions, message):
+            for pos in positions[:None if limit is None else max(0, limit - len(errors))]:
+                errors.append(message(pos))
+
+        for field, invalid, missing in self.field_failures(data):
+            col = field.column
+            report(np.flatnonzero(invalid), lambda pos: (
+                f"Row {df.index[pos] + 1}: '{df[col].iloc[pos]}' in column '{col}' is not a valid "
+                f"{field.type_label} for {field.path}"))
+            report(np.flatnonzero(missing), lambda pos: (
+                f"Row {df.index[pos] + 1}: {field.path} is required but column '{col}' is empty"))
         return errors
 
+    def render_rows(self, df, data=None, keep=None):
+        # keep: mask of the rows to render; without one, any row that can't be made valid fails the block
+        if self.problems:
+            raise ValueError("Data does not fit the XSD:\n" + "\n".join(self.problems[:5]))
+        data = data if data is not None else self.field_data(df)
+        if keep is None:
+            errors = self.row_errors(df, limit=5, data=data)
+            if errors:
+                raise ValueError("Data does not fit the XSD:\n" + "\n".join(errors))
+        # Neighbouring constant pieces are merged, then each row is joined in one pass
+        columns = []
+        for piece in self.render_pieces(self.record, data):
+            if isinstance(piece, str) and columns and isinstance(columns[-1], str):
+                columns[-1] += piece
+            else:
+                columns.append(piece)
+        n = data["rows"]
+        if keep is not None:
+            columns = [c if isinstance(c, str) else c[keep] for c in columns]
+            n = int(keep.sum())
+        return ["".join(parts) for parts in zip(*[[c] * n if isinstance(c, str) else c for c in columns])]
+
+    def render_pieces(self, node, data):
+        # The node's per-row fragments in document order: constant strings or object arrays
+        pieces = ["<" + node.name]
+        for name, field in node.attributes:
+            text, missing, _ = data[field]
+            pieces.append(np.where(missing, "", f' {name}="' + xml_escape_values(text, quote=True) + '"'))
+        if node.text is not None:
+            text, missing, _ = data[node.text]
+            closed = ">" + xml_escape_values(text) + f"</{node.name}>"
+            # Missing text: xsi:nil when the schema allows it (optional elements are left out below)
+            pieces.append(np.where(missing, ' xsi:nil="true"/>', closed) if node.text.nillable else closed)
+        else:
+            pieces.append(">")
+            for child in node.children:
+                pieces.extend(self.render_pieces(child, data))
+            pieces.append(f"</{node.name}>")
+        if not node.required:
+            present = self.node_present(node, data)
+            pieces = [np.where(present, piece, "") for piece in pieces]
+        return pieces
+
+    def prologue(self):
+        decls = "".join(f' xmlns{":" + prefix if prefix else ""}={quoteattr(uri)}'
+                        for prefix, uri in self.namespaces.items())
+        if self.uses_nil:
+            decls += f' xmlns:xsi="{XSI_NS}"'
+        attrs = "".join(f" {name}={quoteattr(value)}" for name, value in self.root_attributes)
+        return f"<{self.root_tag}{decls}{attrs}>"
+
+    def epilogue(self):
+        return f"</{self.root_tag}>"
+
+    def document(self, df):
+        return self.prologue() + "".join(self.render_rows(df)) + self.epilogue()
+
+# ---------------------------
+# Helper Functions for Reverse Conversion
+# ---------------------------
+
+REVERSE_FORMATS = ["XML", "JSON", "JSONL", "CSV", "Fixed Width"]
+
+XML_PATH_STEP = re.compile(r"^[\w.\-]+(\[\d+\])?$")
+
+
+def xml_local(tag):
+    return tag.rsplit("}", 1)[-1].split(":")[-1]
+
+
+def xml_path_column(path):
+    # "Address/City" -> "Address_City", "Lines/Line[2]/@sku" -> "Lines_Line_2_sku", "@id" -> "id";
+    # dots are legal in element names and kept, so a "x.y" column reads back as "x.y"
+    return "_".join(part for part in re.split(r"[/@\[\]]+", path) if part)
+
+
+@contextmanager
+def gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class XMLRecordMapper:
+    # Flattens every record element of a (possibly nested) XML feed into one row. mapping is column -> path
+    # relative to the record, written with local names: "Name", "Address/City", "@id", "Lines/Line[2]/@sku".
+    # record is the path from the document root to the repeating element ("Row", "Items/Item"); its last step
+    # names the record elements. Paths are compiled once per file into chains of C-level find() lookups and
+    # the file is streamed with iterparse, records being cleared once their rows have been taken.
+    infer_records = 1000
+    scan_elements = 50000
+
+    def __init__(self, mapping, record="Row"):
+        self.mapping = {str(column): path for column, path in mapping.items()}
+        self.record = record.strip("/")
+        for column, path in self.mapping.items():
+            steps, attr = self.split(path)
+            if not all(XML_PATH_STEP.match(step) for step in steps) or (attr is not None and not attr):
+                raise ValueError(f"Unsupported XML path for column {column}: {path}")
+
+    @staticmethod
+    def split(path):
+        path, attr = (path.rsplit("@", 1) + [None])[:2] if "@" in path else (path, None)
+        return [step for step in path.split("/") if step and step != "."], attr
+
+    # ------------- mapping sources --------------
+
+    @classmethod
+    def infer(cls, source, record=None, records=None):
+        # Columns are the union of leaf elements and attributes over the first records, in document order;
+        # repeated sibling elements become positional paths (Line[1], Line[2], ...)
+        record = record or cls.find_record_path(source)
+        paths = {}
+        for elements in cls.iter_records(source, record, records or cls.infer_records):
+            for element in elements:
+                cls.collect_paths(element, "", paths)
+            break
+        # Positions are kept only where an element actually repeats within the sample
+        repeated = set()
+        for path in paths:
+            steps = path.split("/")
+            for i, step in enumerate(steps):
+                name, _, index = step.partition("[")
+                if index and index != "1]":
+                    repeated.add((tuple(steps[:i]), name))
+        mapping = {}
+        for path in paths:
+            steps = path.split("/")
+            path = "/".join(step if (tuple(steps[:i]), step.partition("[")[0]) in repeated else step.partition("[")[0]
+                            for i, step in enumerate(steps))
+            column = xml_path_column(path) or xml_local(record)
+            name, n = column, 2
+            while name in mapping:
+                name, n = f"{column}_{n}", n + 1
+            mapping[name] = path
+        return cls(mapping, record)
+
+    @classmethod
+    def from_xsd(cls, generator):
+        # Inverse of the XSD-driven generator: each bound column is read back from the path it is written to
+        mapping = {}
+        for field in generator.record.fields():
+            if field.column is not None:
+                mapping[str(field.column)] = "." if field is generator.record.text else field.path
+        return cls(mapping, xml_local(generator.record.name))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec["columns"], spec.get("record", "Row"))
+
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"record": self.record, "columns": self.mapping}, f, indent=2)
+
+    @classmethod
+    def find_record_path(cls, source):
+        # The shallowest element that repeats under one parent within the first elements. A single-record
+        # document has nothing repeating: its record is then the element carrying the most fields (leaf
+        # elements and attributes below it), the deepest one on ties, so <Header> loses to <Items><Item>
+        best = single = first = None
+        stack = []     # [local name, path, child counts, fields, has children] per open element
+        with open_input(source) as f:
+            for n, (event, elem) in enumerate(ET.iterparse(f, events=("start", "end"))):
+                if event == "end":
+                    _, path, _, fields, has_children = stack.pop()
+                    fields += 0 if has_children else 1
+                    if stack:
+                        stack[-1][3] += fields
+                        stack[-1][4] = True
+                        rank = (fields, path.count("/"))
+                        if single is None or rank >= single[0]:
+                            single = (rank, path)
+                    continue
+                local = xml_local(elem.tag)
+                path = ""
+                if stack:
+                    counts = stack[-1][2]
+                    counts[local] = counts.get(local, 0) + 1
+                    path = "/".join([entry[0] for entry in stack[1:]] + [local])
+                    first = first or path
+                    if counts[local] == 2 and (best is None or path.count("/") < best.count("/")):
+                        best = path
+                        if len(stack) == 1:
+                            break
+                attributes = sum(not name.startswith(f"{{{XSI_NS}}}") for name in elem.attrib)
+                stack.append([local, path, {}, attributes, False])
+                if n > cls.scan_elements:
+                    break
+        if best is None and first is None:
+            raise ValueError("The XML document has no record elements.")
+        return best or (single[1] if single else first)
+
+    @staticmethod
+    def iter_records(source, record, batch=1000):
+        # Yields lists of complete record elements, cleared once the consumer moves on. Records are matched
+        # on their whole path below the root, so a same-named element elsewhere in the feed isn't one.
+        # Everything down to record level is detached from its parent as it ends, so the tree stays small.
+        steps = [step for step in record.split("/") if step]
+        depth = -1      # of the current element; the root is 0
+        matched = 0     # leading steps matched by the open elements
+        opened = []     # open elements, root first
+        records = []
+        with open_input(source) as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    opened.append(elem)
+                    if matched == depth - 1 and depth <= len(steps) and xml_local(elem.tag) == steps[depth - 1]:
+                        matched = depth
+                    continue
+                opened.pop()
+                if 0 < depth <= len(steps):
+                    opened[-1].remove(elem)
+                if depth and matched == depth:
+                    matched -= 1
+                    if depth == len(steps):
+                        records.append(elem)
+                        if len(records) >= batch:
+                            yield records
+                            for elem in records:
+                                elem.clear()
+                            records = []
+                depth -= 1
+        if records:
+            yield records
+
+    @staticmethod
+    def collect_paths(element, prefix, paths):
+        for name in element.attrib:
+            if not name.startswith(f"{{{XSI_NS}}}"):
+                paths.setdefault(f"{prefix}@{xml_local(name)}", None)
+        children = list(element)
+        if not children:
+            if prefix or (element.text and element.text.strip()):
+                paths.setdefault(prefix.rstrip("/") or ".", None)
+            return
+        seen = {}
+        for child in children:
+            local = xml_local(child.tag)
+            seen[local] = seen.get(local, 0) + 1
+            XMLRecordMapper.collect_paths(child, f"{prefix}{local}[{seen[local]}]/", paths)
+
+    # ------------- extraction --------------
+
+    def compile(self, namespace):
+        # Child elements are looked up in the record's own namespace
+        return [self.compile_path(path, namespace) for path in self.mapping.values()]
+
+    def compile_path(self, path, namespace):
+        steps, attr = self.split(path)
+        steps = [(f"{{{namespace}}}{name}" if namespace else name, int(index[:-1]) - 1 if index else None)
+                 for name, _, index in (step.partition("[") for step in steps)]
+        if not steps:
+            return (lambda elem: elem.get(attr)) if attr else (lambda elem: elem.text)
+        if len(steps) == 1 and steps[0][1] is None:
+            tag = steps[0][0]
+
+            def get(elem):
+                found = elem.find(tag)
+                if found is None:
+                    return None
+                return found.get(attr) if attr else found.text
+            return get
+
+        def get(elem):
+            for tag, index in steps:
+                if index is None:
+                    elem = elem.find(tag)
+                else:
+                    found = elem.findall(tag)
+                    elem = found[index] if index < len(found) else None
+                if elem is None:
+                    return None
+            return elem.get(attr) if attr else elem.text
+        return get
+
+    def read(self, source):
+        columns = [[] for _ in self.mapping]
+        getters = None
+        # Parsing allocates millions of short-lived elements and no cycles, so the cyclic collector only costs time
+        with gc_paused():
+            for records in self.iter_records(source, self.record):
+                if getters is None:
+                    tag = records[0].tag
+                    getters = list(zip(columns, self.compile(tag[1:].split("}")[0] if tag.startswith("{") else "")))
+                for values, get in getters:
+                    values.extend(map(get, records))
+        return pd.DataFrame(dict(zip(self.mapping, columns)), columns=list(self.mapping))
+
+
+def parse_reverse_file(path, fmt, delimiter=",", widths=None, xml_mapper=None, encoding=None, header=True):
+    # encoding applies to the text formats; XML parsers take it from the BOM or declaration
+    # gzip/zstd/bz2 inputs are decompressed as they are read
+    header = 0 if header else None
+    if fmt == "XML":
+        return (xml_mapper or XMLRecordMapper.infer(path)).read(path)
+    if fmt not in REVERSE_FORMATS:
+        raise ValueError(f"Unsupported input format: {fmt}")
+    with open_input(path) as f:
+        if fmt == "JSON":
+            return pd.read_json(f, encoding=encoding)
+        elif fmt == "JSONL":
+            return pd.read_json(f, lines=True, encoding=encoding)
+        elif fmt == "CSV":
+            # Multi-character separators such as "|||" need the python engine, which reads them as regexes
+            if len(delimiter) > 1:
+                return pd.read_csv(f, sep=re.escape(delimiter), engine="python", encoding=encoding, header=header)
+            return pd.read_csv(f, sep=delimiter, encoding=encoding, header=header)
+        return pd.read_fwf(f, widths=widths, encoding=encoding, header=header)
+
+
+# ---------------------------
+# Input Sniffing for Reverse Conversion
+# ---------------------------
+
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 200
+SNIFF_DELIMITERS = ",|;\t"
+REVERSE_EXTENSIONS = {".xml": "XML", ".json": "JSON", ".jsonl": "JSONL", ".ndjson": "JSONL", ".csv": "CSV",
+                      ".txt": "CSV", ".fwf": "Fixed Width", ".dat": "Fixed Width"}
+# Longest first: a UTF-32 LE BOM starts with the UTF-16 LE one
+BYTE_ORDER_MARKS = [(codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"), (codecs.BOM_UTF8, "utf-8-sig"),
+                    (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+XML_DECLARED_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*encoding\s*=\s*["']([A-Za-z0-9._\-]+)["']""")
+
+
+def is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def looks_like_header(rows):
+    # A first row that breaks the type of a column that is numeric everywhere else, or, for all-text data,
+    # distinct labels that never recur in their column
+    first, rest = rows[0], rows[1:]
+    if not rest:
+        return True
+    numeric = 0
+    for i, value in enumerate(first):
+        column = [row[i].strip() for row in rest if i < len(row) and row[i].strip()]
+        if column and all(map(is_number, column)):
+            if not is_number(value.strip()):
+                return True
+            numeric += 1
+    if numeric:
+        return False
+    labels = [value.strip() for value in first]
+    if "" in labels or len(set(labels)) < len(labels):
+        return False
+    return not any(label in {row[i].strip() for row in rest if i < len(row)} for i, label in enumerate(labels))
+
+
+def char_class(ch):
+    return "digit" if ch.isdigit() else "letter" if ch.isalpha() else "blank" if ch == " " else "other"
+
+
+def fixed_width_boundaries(lines):
+    # A field starts wherever a non-blank character column follows a column that is blank on every line.
+    # A value that fills its width leaves no blank column before the next field, so each such run is split
+    # further where values start lined up on other lines (see split_filled_fields)
+    length = max(map(len, lines), default=0)
+    blank = [True] * length
+    for line in lines:
+        for i, ch in enumerate(line):
+            if ch != " ":
+                blank[i] = False
+    starts = [0] + [i for i in range(1, length) if blank[i - 1] and not blank[i]]
+    padded = [line.ljust(length) for line in lines]
+    starts = [start for run, end in zip(starts, starts[1:] + [length])
+              for start in split_filled_fields(padded, run, end)]
+    return [end - start for start, end in zip(starts, starts[1:] + [length])]
+
+
+def split_filled_fields(lines, start, end):
+    # Field starts within [start, end). Position p starts a field when values begin there (after a blank) on
+    # some lines and the lines running through p look like a full value meeting the next one: a character
+    # class change (epsilon9999beta12). Runs without one (kappa87052021-...) are allowed only when values
+    # line up on p at least four times as often, so a text column with spaces isn't cut at its spaces.
+    # Where no value begins at p it takes a column that fills its width on every line with one run of
+    # digits or letters, followed by the other kind (123456alpha)
+    fields = [start]
+    for p in range(start + 1, end):
+        begun = unchanged = 0
+        filled = True
+        for line in lines:
+            before, at = line[p - 1], line[p]
+            if at == " ":
+                filled = False
+                continue
+            if before == " ":
+                begun += 1
+                filled = False
+            else:
+                kinds = char_class(before), char_class(at)
+                unchanged += kinds[0] == kinds[1]
+                if filled and not (sorted(kinds) == ["digit", "letter"]
+                                   and all(char_class(ch) == kinds[0] for ch in line[fields[-1]:p])):
+                    filled = False
+        if begun and unchanged * 4 <= begun or not begun and filled:
+            fields.append(p)
+    return fields
+
+
+class InputSniff:
+    # Format, encoding, delimiter, header row and fixed-width boundaries of a reverse input, judged from its
+    # first SNIFF_BYTES only so the full parse is configured right the first time. Undecided fields stay None.
+    def __init__(self, path, size=SNIFF_BYTES):
+        self.compression = input_compression(path)
+        with open_input(path) as f:
+            raw = f.read(size + 1)
+        truncated = len(raw) > size
+        raw = raw[:size]
+        self.format = None
+        self.delimiter = None
+        self.header = None
+        self.widths = None
+        self.encoding = self.detect_encoding(raw)
+        text = codecs.getincrementaldecoder(self.encoding)(errors="replace").decode(raw, final=not truncated)
+        lines = text.splitlines()
+        if truncated and lines:
+            lines.pop()   # most likely cut off mid-line
+        lines = [line for line in lines if line.strip()][:SNIFF_LINES]
+        self.detect_format(text.lstrip("\ufeff \t\r\n"), lines)
+        if self.format is None:
+            self.format = REVERSE_EXTENSIONS.get(os.path.splitext(strip_compression_ext(path))[1].lower())
+
+    @staticmethod
+    def detect_encoding(raw):
+        for bom, encoding in BYTE_ORDER_MARKS:
+            if raw.startswith(bom):
+                return encoding
+        declared = XML_DECLARED_ENCODING.match(raw)
+        if declared:
+            return declared.group(1).decode("ascii").lower()
+        if raw and raw.count(0) > len(raw) // 4:
+            # UTF-16 without a BOM: ASCII characters leave every other byte zero
+            return "utf-16-be" if raw[0::2].count(0) > raw[1::2].count(0) else "utf-16-le"
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(raw, final=False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+        try:
+            raw.decode("cp1252")
+            return "cp1252"
+        except UnicodeDecodeError:
+            return "iso-8859-1"
+
+    def detect_format(self, text, lines):
+        if not text:
+            return
+        if text.startswith("<"):
+            self.format = "XML"
+            return
+        if text[0] in "[{":
+            self.format = "JSONL" if len(lines) > 1 and all(self.json_record(line) for line in lines) else "JSON"
+            return
+        widths = fixed_width_boundaries(lines)
+        aligned = len(widths) > 1 and len({len(line.rstrip()) for line in lines}) == 1 and len(lines) > 1
+        delimiter = self.detect_delimiter(lines)
+        if delimiter is not None and not aligned:
+            self.format = "CSV"
+            self.delimiter = delimiter
+            rows = [line.split(delimiter) for line in lines] if len(delimiter) > 1 else list(
+                csv.reader(lines, delimiter=delimiter))
+            self.header = looks_like_header(rows)
+        elif len(widths) > 1:
+            self.format = "Fixed Width"
+            self.widths = widths
+            starts = [sum(widths[:i]) for i in range(len(widths))]
+            self.header = looks_like_header([[line[start:start + width] for start, width in zip(starts, widths)]
+                                             for line in lines])
+        else:
+            # A single column of text
+            self.format = "CSV"
+            self.delimiter = ","
+            self.header = looks_like_header([[line] for line in lines])
+
+    @staticmethod
+    def json_record(line):
+        line = line.strip()
+        if line[:1] not in ("{", "["):
+            return False
+        try:
+            json.loads(line)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def detect_delimiter(lines):
+        # The delimiter must split (nearly) every line into the same number of fields, at least two
+        def consistent(counts):
+            return counts and counts[0] > 1 and sum(count == counts[0] for count in counts) >= 0.9 * len(counts)
+
+        if consistent([line.count("|||") + 1 for line in lines]):
+            return "|||"
+        try:
+            delimiter = csv.Sniffer().sniff("\n".join(lines), delimiters=SNIFF_DELIMITERS).delimiter
+        except csv.Error:
+            return None
+        if consistent([len(row) for row in csv.reader(lines, delimiter=delimiter)]):
+            return delimiter
+        return None
+
+    def describe(self):
+        parts = [f"encoding {self.encoding}"]
+        if self.compression:
+            parts.insert(0, f"{self.compression} compressed")
+        if self.delimiter is not None:
+            parts.append("delimiter " + ("Tab" if self.delimiter == "\t" else repr(self.delimiter)))
+        if self.widths:
+            parts.append("widths " + ",".join(map(str, self.widths)))
+        if self.header is not None:
+            parts.append("header row" if self.header else "no header row")
+        return f"Detected {self.format or 'unknown format'} ({', '.join(parts)})"
+
+# ---------------------------
+# Helper Classes for Instrumentation
+# ---------------------------
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class PipelineTrace:
+    # Per-stage wall time, rows and bytes; repeated spans (one per streamed block) accumulate into one stage
+    def __init__(self):
+        self.stages = {}
+        self.profiler = None
+
+    @contextmanager
+    def span(self, name, rows=None, nbytes=None):
+        info = {"rows": rows, "bytes": nbytes}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.add(name, time.perf_counter() - start, info["rows"], info["bytes"])
+
+    def add(self, name, seconds, rows=None, nbytes=None):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "rows": 0, "bytes": 0, "calls": 0})
+        stage["seconds"] += seconds
+        stage["rows"] += rows or 0
+        stage["bytes"] += nbytes or 0
+        stage["calls"] += 1
+        stage["peak_rss_bytes"] = peak_rss_bytes()
+
+    def extend(self, other):
+        for name, stage in other.stages.items():
+            self.add(name, stage["seconds"], stage["rows"], stage["bytes"])
+
+    def start_profiler(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop_profiler(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def summary_text(self):
+        total = sum(stage["seconds"] for stage in self.stages.values())
+        lines = [f"Timing breakdown ({total:.2f}s total):"]
+        for name, stage in self.stages.items():
+            line = f"  {name}: {stage['seconds']:.3f}s ({stage['seconds'] / total * 100 if total else 0:.0f}%)"
+            if stage["rows"] and stage["seconds"]:
+                line += f", {stage['rows'] / stage['seconds']:,.0f} rows/s"
+            if stage["bytes"]:
+                line += f", {stage['bytes'] / 1e6:.1f} MB"
+            lines.append(line)
+        rss = peak_rss_bytes()
+        if rss:
+            lines.append(f"  Peak RSS: {rss / 1e6:.0f} MB")
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"stages": [dict(stage=name, **stage) for name, stage in self.stages.items()]}, f, indent=2)
+
+    def dump_pstats(self, path):
+        if self.profiler is None:
+            raise ValueError("cProfile was not enabled for the last run.")
+        pstats.Stats(self.profiler).dump_stats(path)
+
+# ---------------------------
+# Helper Classes for Block Writers
+# ---------------------------
+
+class BlockWriter(ABC):
+    # Writes an output file one DataFrame block at a time so large inputs never need to be joined in memory
+    label = "block"
+
+    def __init__(self, path, encoding):
+        self.path = path
+        self.encoding = encoding
+        self.f = None
+        self.raw = None
+        self.wrote_rows = False
+        self.trace = None   # optional PipelineTrace splitting encode time from disk time
+        self.compression = None   # codec from COMPRESSION_CODECS, set like trace by the caller
+        self.compression_level = None
+        self.compression_threads = None    # None: every core the codec can use
+        self.plain = None
+        self.digest = None   # optional hashlib object over the bytes on disk (partition manifests)
+
+    def __enter__(self):
+        self.f, self.raw, self.plain = open_output(self.path, self.encoding, self.compression,
+                                                   self.compression_level, self.digest, self.compression_threads)
+        self.write_prologue()
+        return self
+
+    def __exit__(self, *exc):
+        self.write_epilogue()
+        self.f.close()
+        self.f = None
+        if self.trace is not None:
+            if self.plain is not None:
+                self.trace.add(f"{self.compression} compression", self.plain.seconds - self.raw.seconds,
+                               nbytes=self.plain.bytes)
+            self.trace.add("file write", self.raw.seconds, nbytes=self.raw.bytes)
+
+    @property
+    def sink_seconds(self):
+        # Time spent below the text layer: compression (if any) plus disk writes
+        return (self.plain if self.plain is not None else self.raw).seconds
+
+    def write_prologue(self):
+        pass
+
+    def write_epilogue(self):
+        pass
+
+    def write_block(self, df):
+        if self.trace is None:
+            self.write_rows(df)
+            return
+        sink_before = self.sink_seconds
+        start = time.perf_counter()
+        self.write_rows(df)
+        encode_seconds = time.perf_counter() - start - (self.sink_seconds - sink_before)
+        self.trace.add(f"{self.label} writer", encode_seconds, rows=len(df))
+
+    @abstractmethod
+    def write_rows(self, df):
+        pass
+
+
+class FixedWidthBlockWriter(BlockWriter):
+    label = "Fixed Width"
+
+    def __init__(self, path, encoding, widths, formats=None):
+        super().__init__(path, encoding)
+        self.widths = widths
+        self.formats = formats or {}    # column -> ColumnFormat
+
+    def write_rows(self, df):
+        lines = render_fixed_width_lines(df, self.widths, self.formats)
+        if not lines:
+            return
+        if self.wrote_rows:
+            self.f.write("\n")
+        self.f.write("\n".join(lines))
+        self.wrote_rows = True
+
+
+class DelimitedBlockWriter(BlockWriter):
+    label = "Delimited"
+
+    def __init__(self, path, encoding, delim, formats=None):
+        super().__init__(path, encoding)
+        self.delim = delim
+        self.formats = formats or {}
+        self.wrote_header = False
+
+    def write_rows(self, df):
+        df = format_frame(df, self.formats)
+        if len(self.delim) == 1:
+            df.to_csv(self.f, sep=self.delim, index=False, header=not self.wrote_header, lineterminator="\n")
+        else:
+            lines = render_delimited_lines(df, self.delim, header=not self.wrote_header)
+            self.f.write("".join(line + "\n" for line in lines))
+        self.wrote_header = True
+
+
+class JSONBlockWriter(BlockWriter):
+    label = "JSON"
+
+    def write_prologue(self):
+        self.f.write("[")
+
+    def write_rows(self, df):
+        records = df.to_json(orient="records", indent=2).strip()[1:-1].strip("\n")
+        if not records:
+            return
+        self.f.write(("," if self.wrote_rows else "") + "\n" + records)
+        self.wrote_rows = True
+
+    def write_epilogue(self):
+        self.f.write("\n]" if self.wrote_rows else "]")
+
+
+class XMLBlockWriter(BlockWriter):
+    label = "XML"
+
+    def __init__(self, path, encoding, root_tag, row_tag, formats=None):
+        super().__init__(path, encoding)
+        self.root_tag = root_tag
+        self.row_tag = row_tag
+        self.formats = formats or {}
+
+    def write_prologue(self):
+        self.f.write(xml_root_tags(self.root_tag)[0])
+
+    def write_rows(self, df):
+        self.f.write("".join(render_xml_rows(df, self.row_tag, self.formats)))
+
+    def write_epilogue(self):
+        self.f.write(xml_root_tags(self.root_tag)[1])
+
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sqlite_column_type(col):
+    if pd.api.types.is_bool_dtype(col.dtype) or pd.api.types.is_integer_dtype(col.dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(col.dtype) or pd.api.types.is_timedelta64_dtype(col.dtype):
+        return "REAL"
+    if pd.api.types.is_object_dtype(col.dtype):
+        # Excel columns with blanks or mixed cells arrive as object; type them by their values
+        inferred = pd.api.types.infer_dtype(col, skipna=True)
+        if inferred in ("integer", "boolean"):
+            return "INTEGER"
+        if inferred in ("floating", "mixed-integer-float", "decimal"):
+            return "REAL"
+    return "TEXT"
+
+
+def sqlite_create_table_sql(table, df):
+    columns = ", ".join(f"{quote_identifier(name)} {sqlite_column_type(col)}" for name, col in df.items())
+    return f"CREATE TABLE {quote_identifier(table)} ({columns})"
+
+
+def _sqlite_value(val):
+    if isinstance(val, np.generic):
+        return val.item()
+    return val if isinstance(val, (int, float, str, bytes)) else str(val)
+
+
+def sqlite_rows(df):
+    # Plain Python values sqlite3 can bind; missing values become NULL, timestamps ISO-8601 text,
+    # durations seconds
+    columns = []
+    for _, col in df.items():
+        if pd.api.types.is_datetime64_any_dtype(col.dtype):
+            col = col.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif pd.api.types.is_timedelta64_dtype(col.dtype):
+            col = col.dt.total_seconds()
+        elif pd.api.types.is_object_dtype(col.dtype):
+            col = col.map(_sqlite_value, na_action="ignore")
+        columns.append(col.to_numpy(dtype=object, na_value=None).tolist())
+    return list(zip(*columns))
+
+
+class SQLiteBlockWriter(BlockWriter):
+    # Bulk load into a table of a local SQLite database: the table is typed from the first block's dtypes,
+    # rows go in as batched executemany transactions with syncing off, and indexes are built after the load
+    label = "SQLite"
+
+    def __init__(self, path, table, index_columns=(), batch_size=50000):
+        super().__init__(path, None)
+        self.table = table
+        self.index_columns = list(index_columns)
+        self.batch_size = batch_size
+        self.con = None
+        self.insert_sql = None
+        self.rows_loaded = 0
+        self.load_seconds = 0.0
+
+    def __enter__(self):
+        self.con = sqlite3.connect(self.path, isolation_level=None)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=OFF")
+        self.con.execute("PRAGMA temp_store=MEMORY")
+        self.con.execute("PRAGMA cache_size=-65536")
+        self.con.execute(f"DROP TABLE IF EXISTS {quote_identifier(self.table)}")
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                start = time.perf_counter()
+                for col in self.index_columns:
+                    index = quote_identifier(f"idx_{self.table}_{col}")
+                    self.con.execute(f"CREATE INDEX {index} ON {quote_identifier(self.table)} ({quote_identifier(col)})")
+                self.con.execute("PRAGMA synchronous=NORMAL")
+                self.con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                if self.trace is not None and self.index_columns:
+                    self.trace.add("SQLite index build", time.perf_counter() - start)
+        finally:
+            self.con.close()
+            self.con = None
+        if self.trace is not None and os.path.exists(self.path):
+            self.trace.add("database file", 0.0, nbytes=os.path.getsize(self.path))
+
+    def write_block(self, df):
+        start = time.perf_counter()
+        self.write_rows(df)
+        seconds = time.perf_counter() - start
+        self.load_seconds += seconds
+        self.rows_loaded += len(df)
+        if self.trace is not None:
+            self.trace.add(f"{self.label} writer", seconds, rows=len(df))
+
+    def write_rows(self, df):
+        if self.insert_sql is None:
+            self.con.execute(sqlite_create_table_sql(self.table, df))
+            placeholders = ", ".join("?" * len(df.columns))
+            self.insert_sql = f"INSERT INTO {quote_identifier(self.table)} VALUES ({placeholders})"
+        for start in range(0, len(df), self.batch_size):
+            rows = sqlite_rows(df.iloc[start:start + self.batch_size])
+            self.con.execute("BEGIN")
+            self.con.executemany(self.insert_sql, rows)
+            self.con.execute("COMMIT")
+
+    @property
+    def rows_per_second(self):
+        return self.rows_loaded / self.load_seconds if self.load_seconds else 0.0
+
+class XSDBlockWriter(BlockWriter):
+    # Rows that can't be made valid for the schema fail the export, like preview does; with skip_invalid
+    # they are left out and reported instead
+    label = "XML (XSD)"
+    keep_errors = 100
+
+    def __init__(self, path, encoding, generator, skip_invalid=False):
+        super().__init__(path, encoding)
+        self.generator = generator
+        self.skip_invalid = skip_invalid
+        self.rows_rejected = 0
+        self.errors = []    # first keep_errors messages for the rejected rows
+
+    def write_prologue(self):
+        self.f.write(self.generator.prologue())
+
+    def write_rows(self, df):
+        data = self.generator.field_data(df)
+        if not self.skip_invalid:
+            self.f.write("".join(self.generator.render_rows(df, data)))
+            return
+        rejected = self.generator.rejected_rows(data)
+        if rejected.any():
+            self.rows_rejected += int(rejected.sum())
+            self.errors.extend(self.generator.row_errors(df, max(0, self.keep_errors - len(self.errors)), data))
+        self.f.write("".join(self.generator.render_rows(df, data, ~rejected)))
+
+    def rejection_summary(self):
+        if not self.rows_rejected:
+            return ""
+        return (f"{self.rows_rejected} row(s) left out because they don't fit the XSD:\n"
+                + "\n".join(self.errors[:10]))
+
+    def write_epilogue(self):
+        self.f.write(self.generator.epilogue())
+
+# ---------------------------
+# Helper Functions for Out-of-Core Processing
+# ---------------------------
+
+def strip_text(col):
+    if isinstance(col.dtype, pd.StringDtype):
+        return col.str.strip()
+    if col.dtype != 'object':
+        return col
+    # Mixed columns keep their numbers and dates; .str.strip() would turn them into NaN
+    is_text = col.map(lambda v: isinstance(v, str)).astype(bool)
+    if not is_text.any():
+        return col
+    return col.mask(is_text, col[is_text].str.strip())
+
+
+def normalize_frame(df):
+    # Strip strings (pandas 3 reads text into the dedicated string dtype rather than object)
+    return df.apply(strip_text)
+
+
+def read_workbook(path, trace=None):
+    trace = trace or PipelineTrace()
+    with trace.span("read_excel_file") as stage:
+        df = pd.read_excel(path)
+        stage["rows"] = len(df)
+    with trace.span("strip", rows=len(df)):
+        return normalize_frame(df)
+
+
+def excel_cell(value):
+    # The conversions pandas' openpyxl reader makes before type inference: empty -> "", 2.0 -> 2
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def parse_excel_rows(rows, columns, start=0):
+    # TextParser is what read_excel types a sheet with, so a block gets the dtypes read_excel would give it
+    df = pd.io.parsers.TextParser(rows, names=columns, header=None, skip_blank_lines=False).read()
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+def without_trailing_blanks(rows):
+    # read_excel drops the empty rows at the end of a sheet
+    blanks = []
+    for row in rows:
+        if all(value is None for value in row):
+            blanks.append(row)
+            continue
+        yield from blanks
+        blanks.clear()
+        yield row
+
+
+class ExcelColumnTypes:
+    # Settles each streamed column's dtype the way read_excel types the whole column at once: one value of
+    # each kind the blocks were inferred as (plus an empty cell if any) goes through the same inference again
+    def __init__(self):
+        self.kinds = {}     # column position -> {block dtype: representative value}
+        self.nulls = set()
+
+    def update(self, block):
+        for i in range(block.shape[1]):
+            series = block.iloc[:, i]
+            kinds = self.kinds.setdefault(i, {})
+            missing = series.isna()
+            if missing.any():
+                self.nulls.add(i)
+            if not missing.all():
+                kinds.setdefault(str(series.dtype), self.witness(series))
+
+    @staticmethod
+    def witness(series):
+        dtype = series.dtype
+        if isinstance(dtype, pd.StringDtype):
+            return "a"
+        if pd.api.types.is_bool_dtype(dtype):
+            return True
+        if pd.api.types.is_integer_dtype(dtype):
+            return 0
+        if pd.api.types.is_float_dtype(dtype):
+            return 0.5
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return series.dropna().iloc[0].to_pydatetime()
+        return None     # mixed values: the column stays object whatever the other blocks hold
+
+    def dtypes(self, columns):
+        result = []
+        for i, col in enumerate(columns):
+            witnesses = list(self.kinds.get(i, {}).values())
+            if None in witnesses:
+                result.append(np.dtype(object))
+                continue
+            if i in self.nulls:
+                witnesses.append("")
+            result.append(parse_excel_rows([[w] for w in witnesses], [col]).dtypes.iloc[0])
+        return result
+
+
+def conform_block(block, dtypes):
+    # Cast a block to the column dtypes settled for the whole sheet, so every block renders like read_excel's frame
+    for i, dtype in enumerate(dtypes):
+        if block.iloc[:, i].dtype != dtype:
+            block.isetitem(i, block.iloc[:, i].astype(dtype))
+    return block
+
+
+def iter_excel_blocks(path, block_size, dtypes=None, types=None):
+    # Streams the first sheet through openpyxl's read-only mode instead of materializing it with read_excel.
+    # A first pass feeds `types` (ExcelColumnTypes); later passes pass its dtypes so each block is cast to them.
+    if os.path.splitext(path)[1].lower() == ".xls":
+        raise ValueError("Streaming mode reads .xlsx workbooks only; open this .xls file with "
+                         "streaming switched off, or save it as .xlsx first.")
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [f"Unnamed: {i}" if col is None else str(col) for i, col in enumerate(header)]
+        width = len(columns)
+        start = 0
+        block = []
+
+        def frame():
+            df = parse_excel_rows(block, columns, start)
+            if types is not None:
+                types.update(df)
+            return df if dtypes is None else conform_block(df, dtypes)
+
+        for row in without_trailing_blanks(rows):
+            if len(row) != width:
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+            block.append([excel_cell(value) for value in row])
+            if len(block) >= block_size:
+                yield frame()
+                start += len(block)
+                block = []
+        if block or start == 0:
+            yield frame()
+    finally:
+        wb.close()
+
+
+# ---------------------------
+# Helper Classes for Column Profiling
+# ---------------------------
+
+class HyperLogLog:
+    # Distinct-count estimate in fixed memory (2**precision one-byte registers)
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if not len(hashes):
+            return
+        idx = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        # Rank = position of the leftmost set bit in the bits left after the register index
+        rank = (64 - np.floor(np.log2(rest.astype(np.float64)))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        # Union of the two sets seen (e.g. per-block or per-file sketches)
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class ColumnProfile:
+    def __init__(self, name):
+        self.name = name
+        self.dtypes = []
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.max_len = 0
+        self.distinct = HyperLogLog()
+
+    def update(self, series):
+        dtype = str(series.dtype)
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+        non_null = series.dropna()
+        self.nulls += len(series) - len(non_null)
+        if not len(non_null):
+            return
+        text = non_null.astype(str)
+        self.max_len = max(self.max_len, int(text.str.len().max()))
+        self.distinct.add_hashes(pd.util.hash_pandas_object(text, index=False).to_numpy())
+        if pd.api.types.is_numeric_dtype(non_null) or pd.api.types.is_datetime64_any_dtype(non_null):
+            lo, hi = non_null.min(), non_null.max()
+        else:
+            lo, hi = text.min(), text.max()
+        self.min = lo if self.min is None else self._pick(min, self.min, lo)
+        self.max = hi if self.max is None else self._pick(max, self.max, hi)
+
+    @staticmethod
+    def _pick(func, a, b):
+        try:
+            return func(a, b)
+        except TypeError:
+            # Blocks disagreed on type (e.g. numbers then text); compare as text like a single object column would
+            return func(str(a), str(b))
+
+    @property
+    def dtype(self):
+        return "/".join(self.dtypes)
+
+
+class FrameProfile:
+    # Single-pass profile of a frame that can keep absorbing appended or streamed blocks
+    def __init__(self):
+        self.rows = 0
+        self.columns = []
+        self.column_profiles = {}
+
+    @classmethod
+    def of(cls, df):
+        profile = cls()
+        profile.update(df)
+        return profile
+
+    def update(self, block):
+        for col in block.columns:
+            if col not in self.column_profiles:
+                self.columns.append(col)
+                self.column_profiles[col] = ColumnProfile(col)
+            self.column_profiles[col].update(block[col])
+        self.rows += len(block)
+
+    @property
+    def null_counts(self):
+        return pd.Series({col: self.column_profiles[col].nulls for col in self.columns}, dtype="int64")
+
+    def max_width(self, col):
+        return self.column_profiles[col].max_len if col in self.column_profiles else 0
+
+# ---------------------------
+# Helper Classes for Incremental Export
+# ---------------------------
+
+def compute_row_hashes(df, key_col):
+    keys = df[key_col].astype(str)
+    if keys.duplicated().any():
+        raise ValueError(f"Key column '{key_col}' contains duplicate values.")
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return dict(zip(keys, (format(int(h), "016x") for h in hashes)))
+
+
+def diff_row_hashes(old_rows, new_hashes):
+    inserts = [key for key in new_hashes if key not in old_rows]
+    updates = [key for key, h in new_hashes.items() if key in old_rows and old_rows[key][0] != h]
+    deletes = [key for key in old_rows if key not in new_hashes]
+    return inserts, updates, deletes
+
+
+class ExportManifest:
+    def __init__(self, key_col, fmt, settings, rows=None, in_sync=True):
+        self.key_col = key_col
+        self.fmt = fmt
+        self.settings = settings    # widths / delimiter / encoding the output was written with
+        self.rows = rows or {}      # key -> [row hash, byte offset, byte length]
+        self.in_sync = in_sync      # False once only a delta was written, so offsets no longer match the output
+
+    @staticmethod
+    def path_for(save_path):
+        return save_path + ".manifest.json"
+
+    @classmethod
+    def load(cls, save_path):
+        path = cls.path_for(save_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data["key_col"], data["format"], data["settings"], data["rows"], data.get("in_sync", True))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, save_path):
+        with open(self.path_for(save_path), "w") as f:
+            json.dump({
+                "key_col": self.key_col,
+                "format": self.fmt,
+                "settings": self.settings,
+                "in_sync": self.in_sync,
+                "rows": self.rows
+            }, f)
+
+    def compatible_with(self, key_col, fmt, settings):
+        return self.key_col == key_col and self.fmt == fmt and self.settings == settings
+
+# ---------------------------
+# Helper Functions for Partitioned Output
+# ---------------------------
+
+PARTITION_MODES = ["None", "Rows per file", "MB per file", "By column value"]
+PARTITION_SAMPLE_ROWS = 2000    # rows written to a scratch file to estimate bytes per row for "MB per file"
+PARTITION_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def partition_compression_threads(workers):
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def partition_path(save_path, label):
+    # out.txt.gz -> out.<label>.txt.gz
+    inner = strip_compression_ext(save_path)
+    stem, ext = os.path.splitext(inner)
+    return f"{stem}.{label}{ext}{save_path[len(inner):]}"
+
+
+def partition_label(value):
+    text = "" if pd.isna(value) else re.sub(r"[^\w.-]+", "_", str(value)).strip("._")
+    return text or "empty"
+
+
+def plan_partitions(df, mode, rows_per_file=None, column=None):
+    # -> [{"label", "frame", ...row range or value}], in output order
+    if mode == "By column value":
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=False)   # first-seen order, NaN kept as a group
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        parts, used = [], set()
+        for value, positions in zip(uniques, np.split(order, bounds)):
+            label = base = partition_label(value)
+            n = 2
+            while label.lower() in used:    # "A/B" and "A_B" (or case-only differences) would share a file name
+                label = f"{base}_{n}"
+                n += 1
+            used.add(label.lower())
+            parts.append({"label": label, "frame": df.take(positions),
+                          "value": None if pd.isna(value) else str(value)})
+        return parts
+    rows_per_file = max(1, int(rows_per_file))
+    starts = range(0, len(df), rows_per_file) if len(df) else [0]
+    return [{"label": f"part{i + 1:05d}", "frame": df.iloc[start:start + rows_per_file],
+             "row_start": start, "row_end": min(start + rows_per_file, len(df))}
+            for i, start in enumerate(starts)]
+
+
+def partition_manifest_path(save_path):
+    return save_path + ".partitions.json"
+
+
+def save_partition_manifest(save_path, fmt, mode, param, entries):
+    with open(partition_manifest_path(save_path), "w") as f:
+        json.dump({
+            "format": fmt,
+            "split": mode,
+            "param": param,
+            "total_rows": sum(entry["rows"] for entry in entries),
+            "files": entries
+        }, f, indent=2)
+
+# ---------------------------
+# Helper Classes for SQL Stage
+# ---------------------------
+
+def _sql_mod(a, b):
+    if a is None or b is None or b == 0:
+        return None
+    result = math.fmod(a, b)
+    return int(result) if isinstance(a, int) and isinstance(b, int) else result
+
+
+# MySQL-style functions used by the SQL exercises; only registered when this SQLite build lacks them
+SQLITE_FALLBACK_FUNCTIONS = {
+    "MOD": (2, _sql_mod),
+    "POWER": (2, lambda a, b: None if a is None or b is None else float(a) ** b),
+    "SQRT": (1, lambda a: None if a is None or a < 0 else math.sqrt(a)),
+    "FLOOR": (1, lambda a: None if a is None else math.floor(a)),
+    "CEIL": (1, lambda a: None if a is None else math.ceil(a)),
+    # LEFT/RIGHT are join keywords to SQLite's parser, so calls are renamed by sqlite_dialect()
+    "STR_LEFT": (2, lambda s, n: None if s is None else str(s)[:max(0, n)]),
+    "STR_RIGHT": (2, lambda s, n: None if s is None else (str(s)[-n:] if n > 0 else "")),
+}
+
+# Quoted strings and identifiers are matched first so a LEFT( inside them is left alone
+SQLITE_RENAMED_CALLS = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\b(LEFT|RIGHT)\s*\(""", re.IGNORECASE)
+
+
+def sqlite_dialect(sql):
+    return SQLITE_RENAMED_CALLS.sub(lambda m: f"STR_{m.group(1).upper()}(" if m.group(1) else m.group(0), sql)
+
+
+def add_sqlite_functions(con):
+    for name, (nargs, func) in SQLITE_FALLBACK_FUNCTIONS.items():
+        try:
+            con.execute(f"SELECT {name}({', '.join(['1'] * nargs)})")
+        except sqlite3.OperationalError:
+            con.create_function(name, nargs, func, deterministic=True)
+
+
+class SQLStage:
+    # In-process SQL over loaded frames: DuckDB when installed (frames are scanned in place, no copy),
+    # otherwise an in-memory SQLite database the frames are copied into
+    def __init__(self, engine="Auto"):
+        self.duckdb = None
+        if engine in ("Auto", "DuckDB"):
+            try:
+                import duckdb
+                self.duckdb = duckdb
+            except ImportError:
+                if engine == "DuckDB":
+                    raise ImportError("DuckDB is not installed; choose SQLite or install the duckdb package.")
+        if self.duckdb is not None:
+            self.engine = "DuckDB"
+            self.con = self.duckdb.connect(":memory:")
+        else:
+            self.engine = "SQLite"
+            self.con = sqlite3.connect(":memory:", check_same_thread=False)
+            add_sqlite_functions(self.con)
+        self.tables = {}
+
+    def register(self, name, df):
+        # Re-registering the same frame object is free, so callers can register before every query
+        if self.tables.get(name) is df:
+            return
+        if self.engine == "DuckDB":
+            self.con.register(name, df)
+        else:
+            df.to_sql(name, self.con, index=False, if_exists="replace")
+        self.tables[name] = df
+
+    def query(self, sql):
+        if self.engine == "DuckDB":
+            return self.con.execute(sql).df()
+        return pd.read_sql_query(sqlite_dialect(sql), self.con)
+
+    def close(self):
+        self.con.close()
+
+# ---------------------------
+# Helper Widgets
+# ---------------------------
+
+def grid_cell_text(val, limit=200):
+    if not pd.api.types.is_scalar(val):
+        return str(val)[:limit]
+    return "" if pd.isna(val) else str(val)[:limit]
+
+
+class VirtualGrid(ttk.Frame):
+    # Treeview that only ever holds the visible window of rows/columns; scrolling re-slices the frame with iloc
+    def __init__(self, parent, visible_rows=15, visible_cols=8, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.df = None
+        self.row_offset = 0
+        self.col_offset = 0
+        self.visible_rows = visible_rows
+        self.visible_cols = visible_cols
+        self.highlight_row = None
+
+        self.tree = ttk.Treeview(self, show="headings", height=visible_rows, selectmode="browse")
+        self.tree.tag_configure("highlight", background="yellow")
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.on_vscroll)
+        self.hbar = ttk.Scrollbar(self, orient="horizontal", command=self.on_hscroll)
+        self.position_label = ttk.Label(self, text="No data")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        self.position_label.grid(row=2, column=0, columnspan=2, sticky="w")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(1, "units"))
+        self.tree.bind("<Prior>", lambda e: self.scroll_rows(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll_rows(1, "pages"))
+        self.tree.bind("<Home>", lambda e: self.jump_to_position(0))
+        self.tree.bind("<End>", lambda e: self.jump_to_position(self.total_rows() - 1))
+
+    def set_frame(self, df):
+        self.df = df
+        self.row_offset = 0
+        self.col_offset = 0
+        self.highlight_row = None
+        self.render()
+
+    def total_rows(self):
+        return 0 if self.df is None else len(self.df)
+
+    def total_cols(self):
+        return 0 if self.df is None else len(self.df.columns)
+
+    @staticmethod
+    def _clamp(offset, total, page):
+        return max(0, min(offset, max(0, total - page)))
+
+    def _scrolled(self, args, offset, total, page):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            offset += int(args[1]) * (page if args[2] == "pages" else 1)
+        return self._clamp(offset, total, page)
+
+    def on_vscroll(self, *args):
+        self.row_offset = self._scrolled(args, self.row_offset, self.total_rows(), self.visible_rows)
+        self.render()
+
+    def on_hscroll(self, *args):
+        self.col_offset = self._scrolled(args, self.col_offset, self.total_cols(), self.visible_cols)
+        self.render()
+
+    def scroll_rows(self, n, what):
+        self.on_vscroll("scroll", n, what)
+        return "break"
+
+    def jump_to_position(self, pos):
+        self.highlight_row = pos
+        self.row_offset = self._clamp(pos - self.visible_rows // 2, self.total_rows(), self.visible_rows)
+        self.render()
+        return "break"
+
+    def jump_to_row(self, label):
+        # Validation reports index labels; fall back to treating the label as a position
+        if self.df is None:
+            return False
+        try:
+            pos = self.df.index.get_loc(label)
+        except KeyError:
+            pos = label
+        if not isinstance(pos, (int, np.integer)) or not 0 <= pos < self.total_rows():
+            return False
+        self.jump_to_position(int(pos))
+        return True
+
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        if self.df is None:
+            self.tree["columns"] = ()
+            self.position_label.config(text="No data")
+            return
+        cols = list(self.df.columns[self.col_offset:self.col_offset + self.visible_cols])
+        ids = ["row"] + [f"c{i}" for i in range(len(cols))]
+        if tuple(self.tree["columns"]) != tuple(ids):
+            self.tree["columns"] = ids
+        self.tree.heading("row", text="Row")
+        self.tree.column("row", width=70, stretch=False, anchor="e")
+        for col_id, col in zip(ids[1:], cols):
+            self.tree.heading(col_id, text=str(col))
+            self.tree.column(col_id, width=120, anchor="w")
+
+        window = self.df.iloc[self.row_offset:self.row_offset + self.visible_rows,
+                              self.col_offset:self.col_offset + self.visible_cols]
+        for pos, row in enumerate(window.itertuples(index=False, name=None)):
+            row_no = self.row_offset + pos
+            values = [row_no + 1] + [grid_cell_text(val) for val in row]
+            tags = ("highlight",) if row_no == self.highlight_row else ()
+            self.tree.insert("", tk.END, values=values, tags=tags)
+
+        rows, total_cols = self.total_rows(), self.total_cols()
+        self.vbar.set(*self._fractions(self.row_offset, self.visible_rows, rows))
+        self.hbar.set(*self._fractions(self.col_offset, self.visible_cols, total_cols))
+        last_row = min(self.row_offset + self.visible_rows, rows)
+        last_col = min(self.col_offset + self.visible_cols, total_cols)
+        self.position_label.config(text=f"Rows {self.row_offset + 1 if rows else 0}-{last_row} of {rows:,} | "
+                                        f"Columns {self.col_offset + 1 if total_cols else 0}-{last_col} of {total_cols}")
+
+    @staticmethod
+    def _fractions(offset, page, total):
+        if not total:
+            return 0.0, 1.0
+        return offset / total, min(1.0, (offset + page) / total)
+
 # ---------------------------
 # Main App Class
 # ---------------------------
@@ -58,15 +2237,36 @@ class ExcelConverterApp:
         # Data and states
         self.file_path = None
         self.df = None
+        self.workbook_df = None     # frame read from file_path; a reverse preview can replace self.df
         self.col_width_entries = []
+        self.col_format_entries = []
         self.xml_sample_path = None
         self.xml_sample_type = None  # 'xml' or 'xsd'
+        self.xsd_full_check = tk.BooleanVar(value=False)
+        self.xsd_skip_invalid = tk.BooleanVar(value=False)
+        self.xsd_generator_cache = None
         self.validation_rules = []  # List[ValidationRule]
         self.validation_enabled = tk.BooleanVar(value=False)
         self.reverse_mode = tk.BooleanVar(value=False)
         self.reverse_file_path = None
         self.reverse_df = None
         self.fixed_width_entries_reverse = []
+        self.rev_xml_mapper = None      # XMLRecordMapper loaded from a mapping file
+        self.rev_xml_mapper_used = None
+        self.incremental_enabled = tk.BooleanVar(value=False)
+        self.stream_mode = tk.BooleanVar(value=False)
+        self.stream_source = None   # workbook path when running out-of-core; self.df then holds only the first block
+        self.stream_dtypes = None   # column dtypes settled while loading stream_source
+        self.profile = None         # FrameProfile cached for profile_frame
+        self.profile_frame = None
+        self.load_trace = PipelineTrace()
+        self.last_trace = None
+        self.cprofile_enabled = tk.BooleanVar(value=False)
+        self.use_service = tk.BooleanVar(value=False)
+        self.sql_enabled = tk.BooleanVar(value=False)
+        self.sql_stage = None
+        self.sql_stage_engine = None
+        self.stream_block_size = 50000
 
         self.create_widgets()
 
@@ -99,6 +2299,11 @@ class ExcelConverterApp:
         tk.Button(file_frame, text="Browse Excel File", command=self.load_excel, bg="green", fg="white").pack(side="left")
         self.file_label = ttk.Label(file_frame, text="No file selected")
         self.file_label.pack(side="left", padx=10)
+        ttk.Checkbutton(file_frame, text="Out-of-core mode (stream in blocks of",
+                        variable=self.stream_mode).pack(side="left", padx=10)
+        self.block_size_var = tk.StringVar(value=str(self.stream_block_size))
+        ttk.Entry(file_frame, textvariable=self.block_size_var, width=8).pack(side="left")
+        ttk.Label(file_frame, text="rows)").pack(side="left", padx=2)
 
         # Format options frame
         options_frame = ttk.LabelFrame(parent, text="Export Options", padding=10)
@@ -107,20 +2312,31 @@ class ExcelConverterApp:
         ttk.Label(options_frame, text="Format:").grid(row=0, column=0, sticky="e", padx=5)
         self.format_var = tk.StringVar(value="Fixed Width")
         self.format_combo = ttk.Combobox(options_frame, textvariable=self.format_var, state="readonly",
-                                         values=["Fixed Width", "Delimited", "JSON", "XML"], width=20)
+                                         values=["Fixed Width", "Delimited", "JSON", "XML", "Database (SQLite)"],
+                                         width=20)
         self.format_combo.grid(row=0, column=1, sticky="w")
         self.format_combo.bind("<<ComboboxSelected>>", self.on_format_change)
 
+        ttk.Label(options_frame, text="Table:").grid(row=0, column=2, sticky="e", padx=5)
+        self.db_table_var = tk.StringVar(value="data")
+        self.db_table_entry = ttk.Entry(options_frame, textvariable=self.db_table_var, width=20)
+        self.db_table_entry.grid(row=0, column=3, sticky="w")
+
+        ttk.Label(options_frame, text="Index Columns:").grid(row=1, column=2, sticky="e", padx=5)
+        self.db_index_var = tk.StringVar()
+        self.db_index_entry = ttk.Entry(options_frame, textvariable=self.db_index_var, width=20)
+        self.db_index_entry.grid(row=1, column=3, sticky="w")
+
         ttk.Label(options_frame, text="Delimiter:").grid(row=1, column=0, sticky="e", padx=5)
         self.delimiter_var = tk.StringVar(value=",")
         self.delimiter_combo = ttk.Combobox(options_frame, textvariable=self.delimiter_var, state="readonly",
-                                            values=[",", "Single Pipe (|)", "Triple Pipe (|||)"], width=20)
+                                            values=list(DELIMITER_MAP), width=20)
         self.delimiter_combo.grid(row=1, column=1, sticky="w")
 
         ttk.Label(options_frame, text="File Extension:").grid(row=2, column=0, sticky="e", padx=5)
         self.ext_var = tk.StringVar(value=".txt")
         self.ext_combo = ttk.Combobox(options_frame, textvariable=self.ext_var, state="readonly",
-                                      values=[".txt", ".csv", ".json", ".xml", ".xlsx"], width=20)
+                                      values=[".txt", ".csv", ".json", ".xml", ".xlsx", ".db"], width=20)
         self.ext_combo.grid(row=2, column=1, sticky="w")
 
         ttk.Label(options_frame, text="Encoding:").grid(row=3, column=0, sticky="e", padx=5)
@@ -129,6 +2345,25 @@ class ExcelConverterApp:
                                            values=["utf-8", "utf-16", "ascii", "iso-8859-1"], width=20)
         self.encoding_combo.grid(row=3, column=1, sticky="w")
 
+        ttk.Label(options_frame, text="Compression:").grid(row=2, column=2, sticky="e", padx=5)
+        self.compression_var = tk.StringVar(value="None")
+        self.compression_combo = ttk.Combobox(options_frame, textvariable=self.compression_var, state="readonly",
+                                              values=["None"] + COMPRESSION_CODECS, width=20)
+        self.compression_combo.grid(row=2, column=3, sticky="w")
+
+        # Split output into several files written concurrently, plus a .partitions.json manifest
+        ttk.Label(options_frame, text="Split Output:").grid(row=3, column=2, sticky="e", padx=5)
+        self.partition_mode_var = tk.StringVar(value="None")
+        self.partition_mode_combo = ttk.Combobox(options_frame, textvariable=self.partition_mode_var,
+                                                 state="readonly", values=PARTITION_MODES, width=20)
+        self.partition_mode_combo.grid(row=3, column=3, sticky="w")
+        self.partition_mode_combo.bind("<<ComboboxSelected>>", lambda e: self.update_partition_values())
+
+        ttk.Label(options_frame, text="Rows / MB / Column:").grid(row=4, column=2, sticky="e", padx=5)
+        self.partition_value_var = tk.StringVar()
+        self.partition_value_combo = ttk.Combobox(options_frame, textvariable=self.partition_value_var, width=20)
+        self.partition_value_combo.grid(row=4, column=3, sticky="w")
+
         self.browse_xml_btn = tk.Button(options_frame, text="Browse XML/XSD", command=self.load_xml_sample, bg="orange", fg="white")
         self.browse_xml_btn.grid(row=4, column=0, columnspan=2, pady=5)
         self.browse_xml_btn.grid_remove()
@@ -137,11 +2372,64 @@ class ExcelConverterApp:
         self.schema_check_cb = ttk.Checkbutton(options_frame, text="Enable schema/XSD conformity check before save",
                                                variable=self.validation_enabled)
         self.schema_check_cb.grid(row=5, column=0, columnspan=2, pady=5)
-
-        # Fixed width frame
-        self.fixed_frame = ttk.LabelFrame(parent, text="Fixed Width Column Settings", padding=10)
+        ttk.Checkbutton(options_frame, text="Full XSD re-validation of generated XML (slow)",
+                        variable=self.xsd_full_check).grid(row=5, column=2, columnspan=2, sticky="w", pady=5)
+
+        # Incremental export against the previous run's manifest
+        ttk.Checkbutton(options_frame, text="Incremental export (only changed rows)",
+                        variable=self.incremental_enabled).grid(row=6, column=0, columnspan=2, pady=5)
+        ttk.Checkbutton(options_frame, text="Leave out rows that don't fit the XSD (instead of failing)",
+                        variable=self.xsd_skip_invalid).grid(row=6, column=2, columnspan=2, sticky="w", pady=5)
+
+        ttk.Label(options_frame, text="Key Column:").grid(row=7, column=0, sticky="e", padx=5)
+        self.incr_key_var = tk.StringVar()
+        self.incr_key_combo = ttk.Combobox(options_frame, textvariable=self.incr_key_var, state="readonly", width=20)
+        self.incr_key_combo.grid(row=7, column=1, sticky="w")
+
+        ttk.Label(options_frame, text="Incremental Output:").grid(row=8, column=0, sticky="e", padx=5)
+        self.incr_mode_var = tk.StringVar(value="Delta file")
+        self.incr_mode_combo = ttk.Combobox(options_frame, textvariable=self.incr_mode_var, state="readonly",
+                                            values=["Delta file", "Patch in place"], width=20)
+        self.incr_mode_combo.grid(row=8, column=1, sticky="w")
+
+        ttk.Checkbutton(options_frame, text="Profile load/export with cProfile",
+                        variable=self.cprofile_enabled).grid(row=9, column=0, columnspan=2, pady=5)
+
+        # Hand the export to a running conversion_service.py instead of doing it in-process
+        ttk.Checkbutton(options_frame, text="Use conversion service",
+                        variable=self.use_service).grid(row=10, column=0, columnspan=2, pady=5)
+        ttk.Label(options_frame, text="Service URL:").grid(row=10, column=2, sticky="e", padx=5)
+        self.service_url_var = tk.StringVar(value=DEFAULT_URL)
+        ttk.Entry(options_frame, textvariable=self.service_url_var, width=24).grid(row=10, column=3, sticky="w")
+
+        # Optional SQL stage applied before preview/export
+        sql_frame = ttk.LabelFrame(parent, text="SQL Stage (tables: data = loaded sheet, reverse = reverse-loaded file)",
+                                   padding=10)
+        sql_frame.pack(fill="x", pady=5)
+        ttk.Checkbutton(sql_frame, text="Export query result instead of the full sheet",
+                        variable=self.sql_enabled).grid(row=0, column=0, sticky="w")
+        ttk.Label(sql_frame, text="Engine:").grid(row=0, column=1, sticky="e", padx=5)
+        self.sql_engine_var = tk.StringVar(value="Auto")
+        ttk.Combobox(sql_frame, textvariable=self.sql_engine_var, state="readonly",
+                     values=["Auto", "DuckDB", "SQLite"], width=10).grid(row=0, column=2, sticky="w")
+        ttk.Button(sql_frame, text="Run Query", command=self.preview_sql_query).grid(row=0, column=3, padx=5)
+        self.sql_text = tk.Text(sql_frame, height=3, width=110)
+        self.sql_text.insert("1.0", "SELECT * FROM data")
+        self.sql_text.grid(row=1, column=0, columnspan=4, sticky="ew", pady=2)
+
+        # Column settings frame: fixed widths plus per-column value formats for the text outputs
+        self.fixed_frame = ttk.LabelFrame(parent, text="Column Settings", padding=10)
         self.fixed_frame.pack(fill="x", pady=5)
 
+        col_btn_frame = ttk.Frame(self.fixed_frame)
+        col_btn_frame.pack(side="top", fill="x")
+        ttk.Button(col_btn_frame, text="Load Column Settings",
+                   command=self.load_column_settings).pack(side="left", padx=2)
+        ttk.Button(col_btn_frame, text="Save Column Settings",
+                   command=self.save_column_settings).pack(side="left", padx=2)
+        ttk.Label(col_btn_frame, text="Format: date pattern (%d/%m/%Y), decimals (.2), zero-pad (0 or 08), "
+                                      "right-align (>)").pack(side="left", padx=10)
+
         self.width_canvas = tk.Canvas(self.fixed_frame, height=150, bg="lightgrey")
         self.width_canvas.pack(side="left", fill="both", expand=True)
 
@@ -155,15 +2443,25 @@ class ExcelConverterApp:
 
         self.fixed_frame.pack_forget()
 
-        # Preview frame
-        preview_frame = ttk.LabelFrame(parent, text="Preview Output (first 25 rows)", padding=10)
+        # Preview frame: formatted output of the first rows, plus a paged grid over the whole frame
+        preview_frame = ttk.LabelFrame(parent, text="Preview", padding=10)
         preview_frame.pack(fill="both", expand=True, pady=5)
-        self.preview_box = tk.Text(preview_frame, height=15, width=120)
+        self.preview_notebook = ttk.Notebook(preview_frame)
+        self.preview_notebook.pack(expand=True, fill="both")
+        output_tab = ttk.Frame(self.preview_notebook)
+        self.preview_notebook.add(output_tab, text="Output (first 25 rows)")
+        self.preview_box = tk.Text(output_tab, height=15, width=120)
         self.preview_box.pack(expand=True, fill="both")
+        self.data_grid = VirtualGrid(self.preview_notebook)
+        self.preview_notebook.add(self.data_grid, text="Data Grid")
 
-        # Validation summary below preview
+        # Validation summary below preview; selecting an error jumps the grid to that row
         self.validation_summary_label = ttk.Label(preview_frame, text="", foreground="red", justify="left")
         self.validation_summary_label.pack(fill="x")
+        self.error_listbox = tk.Listbox(preview_frame, height=4)
+        self.error_listbox.pack(fill="x")
+        self.error_listbox.bind("<<ListboxSelect>>", self.on_error_select)
+        self.error_rows = []
 
         # Dashboard frame
         dashboard_frame = ttk.LabelFrame(parent, text="File Stats", padding=10)
@@ -171,6 +2469,13 @@ class ExcelConverterApp:
         self.dashboard_label = ttk.Label(dashboard_frame, text="No data loaded", justify="left", foreground="green")
         self.dashboard_label.pack()
 
+        profile_cols = ("Column", "Type", "Nulls", "Distinct (est.)", "Min", "Max", "Max Len")
+        self.profile_tree = ttk.Treeview(dashboard_frame, columns=profile_cols, show="headings", height=5)
+        for col in profile_cols:
+            self.profile_tree.heading(col, text=col)
+            self.profile_tree.column(col, width=120 if col in ("Column", "Min", "Max") else 80, anchor="w")
+        self.profile_tree.pack(fill="x")
+
         # Progress and buttons
         self.progress = ttk.Progressbar(parent, orient="horizontal", length=400, mode="determinate")
         self.progress.pack(pady=5)
@@ -180,6 +2485,7 @@ class ExcelConverterApp:
 
         tk.Button(btn_frame, text="Preview", command=self.preview_output, bg="red", fg="white").grid(row=0, column=0, padx=5)
         tk.Button(btn_frame, text="Convert & Save", command=self.convert_and_save, bg="blue", fg="white").grid(row=0, column=1, padx=5)
+        ttk.Button(btn_frame, text="Save Timing Report", command=self.save_timing_report).grid(row=0, column=2, padx=5)
 
         # Status area
         self.status_label = ttk.Label(parent, text="", foreground="blue")
@@ -192,19 +2498,26 @@ class ExcelConverterApp:
         for widget in self.width_inner.winfo_children():
             widget.destroy()
         self.col_width_entries.clear()
-
-        if self.df is not None and self.format_var.get() == "Fixed Width":
-            for i, col in enumerate(self.df.columns):
-                suggested_width = max(10, int(self.df[col].astype(str).str.len().max()))
+        self.col_format_entries.clear()
+
+        if self.df is not None and self.format_var.get() in FORMATTED_OUTPUTS:
+            profile = self.get_profile()
+            ttk.Label(self.width_inner, text="Width").grid(row=0, column=1, sticky="w")
+            ttk.Label(self.width_inner, text="Format").grid(row=0, column=2, sticky="w")
+            for i, col in enumerate(self.df.columns, start=1):
+                suggested_width = max(10, profile.max_width(col))
                 ttk.Label(self.width_inner, text=f"{col}:", width=20).grid(row=i, column=0, sticky="e")
                 entry = ttk.Entry(self.width_inner, width=10)
                 entry.insert(0, str(suggested_width))
                 entry.grid(row=i, column=1, sticky="w")
                 self.col_width_entries.append((col, entry))
+                format_entry = ttk.Entry(self.width_inner, width=16)
+                format_entry.grid(row=i, column=2, sticky="w", padx=5)
+                self.col_format_entries.append((col, format_entry))
 
     def update_options_visibility(self):
         fmt = self.format_var.get()
-        if fmt == "Fixed Width":
+        if fmt in FORMATTED_OUTPUTS:
             self.fixed_frame.pack(fill="x", pady=5)
         else:
             self.fixed_frame.pack_forget()
@@ -219,6 +2532,16 @@ class ExcelConverterApp:
         else:
             self.browse_xml_btn.grid_remove()
 
+        db_state = "normal" if fmt == "Database (SQLite)" else "disabled"
+        self.db_table_entry.configure(state=db_state)
+        self.db_index_entry.configure(state=db_state)
+        if fmt == "Database (SQLite)":
+            self.ext_var.set(".db")
+            self.compression_var.set("None")
+            self.partition_mode_var.set("None")
+        self.compression_combo.configure(state="disabled" if fmt == "Database (SQLite)" else "readonly")
+        self.partition_mode_combo.configure(state="disabled" if fmt == "Database (SQLite)" else "readonly")
+
     def load_excel(self):
         path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
         if path:
@@ -226,29 +2549,112 @@ class ExcelConverterApp:
             threading.Thread(target=self.read_excel_file, args=(path,), daemon=True).start()
 
     def read_excel_file(self, path):
+        trace = PipelineTrace()
         try:
             self.progress.start()
-            self.df = pd.read_excel(path)
-            # Strip strings
-            self.df = self.df.apply(lambda col: col.str.strip() if col.dtype == 'object' else col)
+            if self.cprofile_enabled.get():
+                trace.start_profiler()
+            if self.stream_mode.get():
+                self.load_excel_streaming(path, trace)
+            else:
+                self.df = read_workbook(path, trace)
+                self.stream_source = None
+            trace.stop_profiler()
+            self.load_trace = self.last_trace = trace
+            self.summary_label.config(text=trace.summary_text())
             self.file_path = path
+            self.workbook_df = self.df
             self.file_label.config(text=os.path.basename(path))
             self.update_dashboard()
+            self.update_validation_columns()
+            self.update_incremental_key_columns()
             self.set_status("Excel file loaded successfully.")
             self.root.after(100, self.on_format_change)
+            self.root.after(100, lambda: self.data_grid.set_frame(self.df))
         except Exception as e:
             messagebox.showerror("Error", str(e))
             self.set_status("Failed to load Excel file.")
         finally:
+            trace.stop_profiler()
             self.progress.stop()
 
+    def load_excel_streaming(self, path, trace):
+        self.stream_block_size = max(1, int(self.block_size_var.get()))
+        profile = FrameProfile()
+        types = ExcelColumnTypes()
+        first_block = None
+        for block in self.iter_stream_blocks(path, trace, types=types):
+            if first_block is None:
+                first_block = block
+            with trace.span("profile", rows=len(block)):
+                profile.update(block)
+        # Column dtypes are only known once every block has been seen; later passes cast to them
+        self.stream_dtypes = types.dtypes(first_block.columns)
+        for col, dtype in zip(first_block.columns, self.stream_dtypes):
+            profile.column_profiles[col].dtypes = [str(dtype)]
+        self.df = conform_block(first_block, self.stream_dtypes)
+        self.stream_source = path
+        self.profile = profile
+        self.profile_frame = self.df
+
+    def iter_stream_blocks(self, path, trace, types=None):
+        dtypes = None if types is not None else self.stream_dtypes
+        blocks = iter_excel_blocks(path, self.stream_block_size, dtypes, types)
+        while True:
+            with trace.span("read_excel_file") as stage:
+                block = next(blocks, None)
+                stage["rows"] = 0 if block is None else len(block)
+            if block is None:
+                return
+            with trace.span("strip", rows=len(block)):
+                block = normalize_frame(block)
+            yield block
+
+    def get_profile(self):
+        # Cached per frame: only rebuilt once self.df has been replaced (streamed profiles are built while loading)
+        if self.df is None:
+            return None
+        if self.profile is None or self.profile_frame is not self.df:
+            self.profile = FrameProfile.of(self.df)
+            self.profile_frame = self.df
+        return self.profile
+
     def update_dashboard(self):
-        if self.df is not None:
-            rows, cols = self.df.shape
-            nulls = self.df.isnull().sum()
-            null_report = ", ".join([f"{col}: {val}" for col, val in nulls.items() if val > 0]) or "No null values."
-            text = f"Rows: {rows} | Columns: {cols}\nNulls: {null_report}"
-            self.dashboard_label.config(text=text)
+        profile = self.get_profile()
+        if profile is None:
+            return
+        nulls = profile.null_counts
+        null_report = ", ".join([f"{col}: {val}" for col, val in nulls.items() if val > 0]) or "No null values."
+        text = f"Rows: {profile.rows} | Columns: {len(profile.columns)}\nNulls: {null_report}"
+        self.dashboard_label.config(text=text)
+
+        self.profile_tree.delete(*self.profile_tree.get_children())
+        for col in profile.columns:
+            cp = profile.column_profiles[col]
+            self.profile_tree.insert("", tk.END, values=(col, cp.dtype, cp.nulls, cp.distinct.count(),
+                                                         "" if cp.min is None else str(cp.min)[:30],
+                                                         "" if cp.max is None else str(cp.max)[:30],
+                                                         cp.max_len))
+
+    def update_incremental_key_columns(self):
+        cols = list(self.df.columns) if self.df is not None else []
+        self.incr_key_combo["values"] = cols
+        if self.incr_key_var.get() not in cols:
+            self.incr_key_var.set(cols[0] if cols else "")
+        self.update_partition_values()
+
+    def update_partition_values(self):
+        mode = self.partition_mode_var.get()
+        if mode == "By column value":
+            cols = list(self.df.columns) if self.df is not None else []
+            self.partition_value_combo["values"] = cols
+            if self.partition_value_var.get() not in cols:
+                self.partition_value_var.set(cols[0] if cols else "")
+        else:
+            self.partition_value_combo["values"] = []
+            defaults = {"Rows per file": "100000", "MB per file": "100"}
+            if not re.fullmatch(r"\d+(\.\d+)?", self.partition_value_var.get().strip()):
+                self.partition_value_var.set(defaults.get(mode, ""))
 
     def load_xml_sample(self):
         path = filedialog.askopenfilename(filetypes=[("XML or XSD files", "*.xml *.xsd")])
@@ -257,74 +2663,68 @@ class ExcelConverterApp:
             self.xml_sample_type = "xsd" if ext == ".xsd" else "xml"
             self.xml_sample_path = path
             msg = "XSD structure-based generation" if self.xml_sample_type == "xsd" else "XML file mapping based generation"
+            if self.xml_sample_type == "xsd" and self.df is not None:
+                try:
+                    generator = self.xsd_generator(self.df.columns)
+                    if generator.columns_unused:
+                        msg += f"\nColumns not in the schema (left out): {', '.join(map(str, generator.columns_unused))}"
+                    if generator.problems:
+                        msg += "\n" + "\n".join(generator.problems)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to compile XSD: {e}")
+                    return
             messagebox.showinfo("XML/XSD Upload", f"Proceeding to preview with {msg}")
 
-    def convert_df_to_sampled_xml(self, df):
+    def xsd_generator(self, columns):
+        # Compiled once per schema file version and column set
+        key = (self.xml_sample_path, os.path.getmtime(self.xml_sample_path), tuple(columns))
+        if self.xsd_generator_cache is None or self.xsd_generator_cache[0] != key:
+            self.xsd_generator_cache = (key, XSDRecordGenerator(self.xml_sample_path, columns))
+        return self.xsd_generator_cache[1]
+
+    def xml_tags(self):
+        # Root and row element names used by the XML writers
         if self.xml_sample_type == "xml":
-            tree = ET.parse(self.xml_sample_path)
-            root_template = tree.getroot()
-            root = ET.Element(root_template.tag)
-            for _, row in df.iterrows():
-                item = ET.SubElement(root, root_template[0].tag)
-                for col in df.columns:
-                    child = ET.SubElement(item, col)
-                    val = "" if pd.isnull(row[col]) else str(row[col])
-                    child.text = val
-            return ET.tostring(root, encoding="unicode")
-        elif self.xml_sample_type == "xsd":
-            # Generate XML using XSD structure is complex;
-            # Here just call generic XML converter for demo
-            return self.convert_df_to_xml(df)
-        else:
-            return self.convert_df_to_xml(df)
-
-    def convert_df_to_xml(self, df):
-        def escape_xml(s):
-            return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        root = ET.Element("Root")
-        for _, row in df.iterrows():
-            item = ET.SubElement(root, "Row")
-            for col in df.columns:
-                col_elem = ET.SubElement(item, col)
-                val = "" if pd.isnull(row[col]) else escape_xml(row[col])
-                col_elem.text = val
-        return ET.tostring(root, encoding="unicode")
+            root_template = ET.parse(self.xml_sample_path).getroot()
+            return root_template.tag, root_template[0].tag
+        return "Root", "Row"
+
+    def convert_df_to_sampled_xml(self, df):
+        if self.xml_sample_type == "xsd":
+            return self.xsd_generator(df.columns).document(df)
+        return self.convert_df_to_xml(df, *self.xml_tags())
+
+    def convert_df_to_xml(self, df, root_tag="Root", row_tag="Row"):
+        # Same markup the XML writer produces, including the column format specs
+        opening, closing = xml_root_tags(root_tag)
+        return opening + "".join(render_xml_rows(df, row_tag, self.column_formats())) + closing
 
     def preview_output(self):
         if self.df is None:
             messagebox.showerror("Error", "No file loaded.")
             return
         try:
-            preview_df = self.df.head(25)
+            frame = self.export_frame()
+            preview_df = frame.head(25)
             fmt = self.format_var.get()
             output = ""
 
             if fmt == "Fixed Width":
-                widths = []
-                for col, entry in self.col_width_entries:
-                    try:
-                        w = int(entry.get())
-                        widths.append(w)
-                    except:
-                        messagebox.showerror("Error", f"Invalid width for column '{col}'")
-                        return
-                lines = []
-                for _, row in preview_df.iterrows():
-                    line = ""
-                    for col, width in zip(preview_df.columns, widths):
-                        val = "" if pd.isnull(row[col]) else str(row[col])
-                        val = val[:width].ljust(width)
-                        line += val
-                    lines.append(line)
-                output = "\n".join(lines)
+                try:
+                    widths = self.fixed_widths_for(preview_df)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                output = "\n".join(render_fixed_width_lines(preview_df, widths, self.column_formats()))
             elif fmt == "Delimited":
-                delim_map = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}
-                delim = delim_map.get(self.delimiter_var.get(), ",")
-                output = preview_df.to_csv(sep=delim, index=False)
+                delim = DELIMITER_MAP.get(self.delimiter_var.get(), ",")
+                output = format_frame(preview_df, self.column_formats()).to_csv(sep=delim, index=False)
             elif fmt == "JSON":
                 output = preview_df.to_json(orient="records", indent=2)
             elif fmt == "XML":
                 output = self.convert_df_to_sampled_xml(preview_df)
+            elif fmt == "Database (SQLite)":
+                output = sqlite_create_table_sql(self.db_table(), preview_df) + ";\n\n" + preview_df.to_string(index=False)
             else:
                 output = "Unsupported format."
 
@@ -333,93 +2733,729 @@ class ExcelConverterApp:
 
             # Perform validation if enabled
             if self.validation_enabled.get():
-                self.perform_validation(preview_df)
+                if self.val_preview_var.get() == "Stratified sample":
+                    sample = stratified_sample(frame, self.validation_sample_size())
+                    self.perform_validation(sample, note=f"Checked a stratified sample of {len(sample):,} "
+                                                         f"of {len(frame):,} rows.", frame=frame)
+                else:
+                    self.perform_validation(preview_df, frame=frame)
             else:
                 self.validation_summary_label.config(text="")
+                self.error_listbox.delete(0, tk.END)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to preview: {e}")
 
-    def perform_validation(self, df_for_validation):
-        errors = []
-        for rule in self.validation_rules:
-            errors.extend(rule.validate(df_for_validation[rule.col_name]))
+    def perform_validation(self, df_for_validation, trace=None, max_errors=None, report=None, note=None, frame=None):
+        # frame: what the error row labels point into when df_for_validation is a sample or head of it
+        errors, schema_errors, error_count, stopped = self.collect_validation_errors(
+            df_for_validation, trace, max_errors, report)
+        self.show_validation_summary(errors, schema_errors, error_count, stopped, note,
+                                     df_for_validation if frame is None else frame)
+        return error_count, schema_errors
+
+    def collect_validation_errors(self, df_for_validation, trace=None, max_errors=None, report=None):
+        with (trace or PipelineTrace()).span("perform_validation", rows=len(df_for_validation)):
+            return self._collect_validation_errors(df_for_validation, max_errors, report)
+
+    def _collect_validation_errors(self, df_for_validation, max_errors=None, report=None):
+        errors, error_count, stopped = validate_frame(df_for_validation, self.validation_rules, max_errors, report)
 
         # Schema/XSD validation if enabled and XSD uploaded
         schema_errors = []
-        if self.validation_enabled.get() and self.xml_sample_type == "xsd" and self.xml_sample_path:
+        # A capped run that hit its limit already has its answer; skip the (whole-frame) schema pass
+        if self.validation_enabled.get() and self.xml_sample_type == "xsd" and self.xml_sample_path and not stopped:
             try:
-                schema = xmlschema.XMLSchema(self.xml_sample_path)
-                xml_str = self.convert_df_to_sampled_xml(df_for_validation)
-                schema.validate(xml_str)
+                # Output is generated from the compiled schema, so checking values against their fields is
+                # enough; re-validating the whole document is the optional slow path
+                generator = self.xsd_generator(df_for_validation.columns)
+                schema_errors.extend(generator.problems)
+                schema_errors.extend(generator.row_errors(df_for_validation, limit=10))
+                if self.xsd_full_check.get() and not schema_errors:
+                    schema = xmlschema.XMLSchema(self.xml_sample_path)
+                    schema.validate(generator.document(df_for_validation))
             except xmlschema.validators.exceptions.XMLSchemaValidationError as e:
                 schema_errors.append(str(e))
             except Exception as e:
                 schema_errors.append(f"Schema validation failed: {e}")
-
-        summary = ""
-        if errors or schema_errors:
-            summary += f"Validation errors: {len(errors)} column rule errors, {len(schema_errors)} schema errors.\n"
+        return errors, schema_errors, error_count, stopped
+
+    def show_validation_summary(self, errors, schema_errors, error_count=None, stopped=False, note=None, frame=None):
+        # error_count lets capped/streamed validation report a total while keeping only the first errors
+        if errors and frame is not None and self.data_grid.df is not frame:
+            # Row labels refer to the validated frame (e.g. a SQL stage result), so show that one in the grid
+            self.data_grid.set_frame(frame)
+        if error_count is None:
+            error_count = len(errors)
+        summary = f"{note}\n" if note else ""
+        if error_count or schema_errors:
+            summary += f"Validation errors: {error_count} column rule errors, {len(schema_errors)} schema errors.\n"
+            if stopped:
+                summary += f"Stopped after the first {error_count} errors.\n"
             for idx, msg in errors[:10]:
                 summary += f"Row {idx + 1}: {msg}\n"
             for err in schema_errors:
                 summary += f"Schema Error: {err}\n"
         else:
-            summary = "No validation errors found."
+            summary += "No validation errors found."
 
         self.validation_summary_label.config(text=summary)
+        self.error_listbox.delete(0, tk.END)
+        self.error_rows = [idx for idx, _ in errors[:500]]
+        for idx, msg in errors[:500]:
+            self.error_listbox.insert(tk.END, f"Row {idx + 1}: {msg}")
+
+    def on_error_select(self, event=None):
+        sel = self.error_listbox.curselection()
+        if not sel:
+            return
+        idx = self.error_rows[sel[0]]
+        self.preview_notebook.select(self.data_grid)
+        if not self.data_grid.jump_to_row(idx):
+            self.set_status(f"Row {idx + 1} is not in the loaded frame.")
 
     def convert_and_save(self):
         if self.df is None:
             messagebox.showerror("Error", "No file loaded.")
             return
+        if self.use_service.get():
+            self.convert_via_service()
+            return
+        if self.stream_source is not None:
+            if self.sql_enabled.get():
+                messagebox.showerror("Error", "The SQL stage needs the workbook in memory; turn off out-of-core mode.")
+                return
+            if self.partition_mode_var.get() != "None":
+                messagebox.showerror("Error", "Split output needs the workbook in memory; turn off out-of-core mode.")
+                return
+            self.convert_and_save_streaming()
+            return
+        # The export breakdown starts from the stages that loaded the workbook
+        trace = PipelineTrace()
+        trace.extend(self.load_trace)
+        if self.cprofile_enabled.get():
+            trace.start_profiler()
+        try:
+            self._convert_and_save(trace)
+        finally:
+            trace.stop_profiler()
+            self.last_trace = trace
+            self.summary_label.config(text=trace.summary_text())
+
+    def _convert_and_save(self, trace):
+        try:
+            export_df = self.export_frame(trace)
+        except Exception as e:
+            messagebox.showerror("Error", f"SQL query failed: {e}")
+            return
         if self.validation_enabled.get():
-            # Validate full df before save
-            self.perform_validation(self.df)
-            if "Validation errors" in self.validation_summary_label.cget("text"):
+            # Validate full df before save; the capped mode only needs to know that errors exist
+            with self.validation_report() as report:
+                note = f"Error report written to {self.val_report_var.get()}" if report else None
+                error_count, schema_errors = self.perform_validation(export_df, trace, self.validation_cap(),
+                                                                     report, note)
+            if error_count or schema_errors:
                 res = messagebox.askyesno("Validation Errors",
                                           "Validation errors detected. Save anyway?")
                 if not res:
                     return
 
-        save_path = filedialog.asksaveasfilename(defaultextension=self.ext_var.get(),
-                                                 filetypes=[("All files", "*.*")])
+        partitioned = self.partition_mode_var.get() != "None"
+        if partitioned and self.incremental_enabled.get():
+            messagebox.showerror("Error", "Incremental export can't be combined with split output.")
+            return
+
+        save_path = self.ask_save_path()
         if not save_path:
             return
 
         fmt = self.format_var.get()
         try:
-            if fmt == "Fixed Width":
-                widths = []
-                for col, entry in self.col_width_entries:
-                    widths.append(int(entry.get()))
-                lines = []
-                for _, row in self.df.iterrows():
-                    line = ""
-                    for col, width in zip(self.df.columns, widths):
-                        val = "" if pd.isnull(row[col]) else str(row[col])
-                        val = val[:width].ljust(width)
-                        line += val
-                    lines.append(line)
-                with open(save_path, "w", encoding=self.encoding_var.get()) as f:
-                    f.write("\n".join(lines))
-            elif fmt == "Delimited":
-                delim_map = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}
-                delim = delim_map.get(self.delimiter_var.get(), ",")
-                self.df.to_csv(save_path, sep=delim, index=False, encoding=self.encoding_var.get())
-            elif fmt == "JSON":
-                self.df.to_json(save_path, orient="records", indent=2)
-            elif fmt == "XML":
-                xml_str = self.convert_df_to_sampled_xml(self.df)
-                with open(save_path, "w", encoding=self.encoding_var.get()) as f:
-                    f.write(xml_str)
-            else:
+            if partitioned:
+                entries = self.write_partitions(export_df, save_path, fmt, trace)
+                self.set_status(f"Wrote {len(entries)} files; manifest saved to "
+                                f"{partition_manifest_path(save_path)}")
+                return
+            if self.incremental_enabled.get():
+                with trace.span("incremental export", rows=len(export_df)):
+                    self.incremental_export(save_path, fmt, export_df)
+                return
+            writer = self.write_output(export_df, save_path, fmt, trace=trace)
+            if not writer:
                 messagebox.showerror("Error", "Unsupported format for saving.")
                 return
+            if isinstance(writer, SQLiteBlockWriter):
+                self.set_status(f"Loaded {writer.rows_loaded} rows into table '{writer.table}' of {save_path} "
+                                f"({writer.rows_per_second:,.0f} rows/s)")
+                return
             self.set_status(f"File saved successfully to {save_path}")
+            self.report_rejected_rows([writer])
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save: {e}")
 
+    def get_fixed_widths(self):
+        return [int(entry.get()) for _, entry in self.col_width_entries]
+
+    def column_format_specs(self):
+        return {col: entry.get().strip() for col, entry in self.col_format_entries if entry.get().strip()}
+
+    def column_formats(self):
+        return ColumnFormat.parse_all(self.column_format_specs())
+
+    def save_column_settings(self):
+        if not self.col_width_entries:
+            messagebox.showerror("Error", "No column settings to save.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if not path:
+            return
+        try:
+            widths = {}
+            for col, entry in self.col_width_entries:
+                try:
+                    widths[col] = int(entry.get())
+                except ValueError:
+                    raise ValueError(f"Invalid width for column '{col}'")
+            self.column_formats()   # refuse to save specs that wouldn't load
+            with open(path, "w") as f:
+                json.dump({"widths": widths, "formats": self.column_format_specs()}, f, indent=2)
+            self.set_status(f"Column settings saved to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save column settings: {e}")
+
+    def load_column_settings(self):
+        path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            widths, formats = data.get("widths", {}), data.get("formats", {})
+            ColumnFormat.parse_all(formats)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load column settings: {e}")
+            return
+        # Matched by column name; columns the file doesn't mention keep their current settings
+        matched = 0
+        for (col, width_entry), (_, format_entry) in zip(self.col_width_entries, self.col_format_entries):
+            if col in widths or col in formats:
+                matched += 1
+            if col in widths:
+                width_entry.delete(0, tk.END)
+                width_entry.insert(0, str(widths[col]))
+            if col in formats:
+                format_entry.delete(0, tk.END)
+                format_entry.insert(0, formats[col])
+        self.set_status(f"Column settings loaded for {matched} of {len(self.col_width_entries)} columns")
+
+    def fixed_widths_for(self, df):
+        # Columns without a width entry (a SQL stage result or the delta's _change column) get the usual suggestion
+        entered = {}
+        for col, entry in self.col_width_entries:
+            try:
+                entered[col] = int(entry.get())
+            except ValueError:
+                raise ValueError(f"Invalid width for column '{col}'")
+        widths = []
+        for col in df.columns:
+            if col in entered:
+                widths.append(entered[col])
+            else:
+                widths.append(max(10, int(df[col].astype(str).str.len().max()) if len(df) else 10))
+        return widths
+
+    def output_compression(self):
+        codec = self.compression_var.get()
+        return codec if codec in COMPRESSION_CODECS and self.format_var.get() != "Database (SQLite)" else None
+
+    def ask_save_path(self):
+        save_path = filedialog.asksaveasfilename(defaultextension=self.ext_var.get(),
+                                                 filetypes=[("All files", "*.*")])
+        return compressed_path(save_path, self.output_compression()) if save_path else save_path
+
+    def make_block_writer(self, save_path, fmt, widths=None, columns=None):
+        writer = self._make_block_writer(save_path, fmt, widths, columns)
+        if writer is not None and not isinstance(writer, SQLiteBlockWriter):
+            writer.compression = self.output_compression()
+        return writer
+
+    def _make_block_writer(self, save_path, fmt, widths=None, columns=None):
+        encoding = self.encoding_var.get()
+        if fmt == "Fixed Width":
+            return FixedWidthBlockWriter(save_path, encoding, widths or self.get_fixed_widths(),
+                                         self.column_formats())
+        elif fmt == "Delimited":
+            return DelimitedBlockWriter(save_path, encoding, DELIMITER_MAP.get(self.delimiter_var.get(), ","),
+                                        self.column_formats())
+        elif fmt == "JSON":
+            return JSONBlockWriter(save_path, encoding)
+        elif fmt == "XML":
+            if self.xml_sample_type == "xsd":
+                generator = self.xsd_generator(columns if columns is not None else self.df.columns)
+                return XSDBlockWriter(save_path, encoding, generator, self.xsd_skip_invalid.get())
+            root_tag, row_tag = self.xml_tags()
+            return XMLBlockWriter(save_path, encoding, root_tag, row_tag, self.column_formats())
+        elif fmt == "Database (SQLite)":
+            return SQLiteBlockWriter(save_path, self.db_table(), self.db_index_columns())
+        return None
+
+    def db_table(self):
+        return self.db_table_var.get().strip() or "data"
+
+    def db_index_columns(self):
+        return [col.strip() for col in self.db_index_var.get().split(",") if col.strip()]
+
+    def write_output(self, df, save_path, fmt, widths=None, trace=None):
+        if widths is None and fmt == "Fixed Width":
+            widths = self.fixed_widths_for(df)
+        writer = self.make_block_writer(save_path, fmt, widths, df.columns)
+        if writer is None:
+            return False
+        writer.trace = trace
+        with writer:
+            writer.write_block(df)
+        return writer
+
+    # ------------- Partitioned Output --------------
+
+    def partition_settings(self, df):
+        mode = self.partition_mode_var.get()
+        value = self.partition_value_var.get().strip()
+        if mode == "By column value":
+            if value not in df.columns:
+                raise ValueError(f"Split column '{value}' is not in the export.")
+            return mode, value
+        try:
+            size = float(value)
+        except ValueError:
+            size = 0
+        if size <= 0:
+            raise ValueError(f"'{mode}' needs a positive number, got '{value}'.")
+        return mode, int(size) if mode == "Rows per file" else size
+
+    def estimate_rows_per_file(self, df, fmt, widths, max_mb):
+        # Bytes per row measured on a scratch file written with the same writer and compression
+        if not len(df):
+            return 1
+        sample = df.iloc[np.linspace(0, len(df) - 1, min(len(df), PARTITION_SAMPLE_ROWS)).astype(int)]
+        fd, scratch = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            writer = self.make_block_writer(scratch, fmt, widths, df.columns)
+            with writer:
+                writer.write_block(sample)
+            per_row = writer.raw.bytes / len(sample)
+        finally:
+            os.remove(scratch)
+        return max(1, int(max_mb * 1024 * 1024 / per_row))
+
+    def write_partitions(self, df, save_path, fmt, trace):
+        if fmt == "Database (SQLite)":
+            raise ValueError("Split output is not available for the database target.")
+        mode, param = self.partition_settings(df)
+        widths = self.fixed_widths_for(df) if fmt == "Fixed Width" else None   # same layout in every file
+        with trace.span("partition plan", rows=len(df)):
+            if mode == "By column value":
+                parts = plan_partitions(df, mode, column=param)
+            elif mode == "MB per file":
+                parts = plan_partitions(df, mode, self.estimate_rows_per_file(df, fmt, widths, param))
+            else:
+                parts = plan_partitions(df, mode, param)
+
+        # Writers are built here since they read option variables; only the encoding/writing runs in the pool
+        workers = min(len(parts), PARTITION_WORKERS)
+        jobs = []
+        for part in parts:
+            writer = self.make_block_writer(partition_path(save_path, part["label"]), fmt, widths, df.columns)
+            if writer is None:
+                raise ValueError("Unsupported format for saving.")
+            writer.trace = PipelineTrace()    # PipelineTrace isn't thread-safe; merged below
+            writer.digest = hashlib.sha256()
+            # The partitions already keep the cores busy; share them out instead of giving each file a full pool
+            writer.compression_threads = partition_compression_threads(workers)
+            jobs.append((writer, part["frame"]))
+
+        def write_part(job):
+            writer, frame = job
+            with writer:
+                writer.write_block(frame)
+            return writer
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            writers = list(pool.map(write_part, jobs))
+        entries = []
+        for writer, part in zip(writers, parts):
+            trace.extend(writer.trace)
+            entry = {"file": os.path.basename(writer.path),
+                     "rows": len(part["frame"]) - getattr(writer, "rows_rejected", 0)}
+            entry.update({key: part[key] for key in ("row_start", "row_end", "value") if key in part})
+            entry.update({"bytes": writer.raw.bytes, "sha256": writer.digest.hexdigest()})
+            entries.append(entry)
+        save_partition_manifest(save_path, fmt, mode, param, entries)
+        self.report_rejected_rows(writers)
+        return entries
+
+    def report_rejected_rows(self, writers):
+        summaries = [writer.rejection_summary() for writer in writers if isinstance(writer, XSDBlockWriter)]
+        summaries = [summary for summary in summaries if summary]
+        if summaries:
+            messagebox.showwarning("Rows left out", "\n\n".join(summaries[:3]))
+
+    # ------------- Conversion Service --------------
+
+    def service_job_spec(self, save_path):
+        # The service re-reads the workbook itself (from its per-worker cache), so only settings travel
+        fmt = self.format_var.get()
+        spec = {"input": os.path.abspath(self.file_path), "output": os.path.abspath(save_path), "format": fmt,
+                "encoding": self.encoding_var.get(), "validate": self.validation_enabled.get()}
+        if self.output_compression():
+            spec["compression"] = self.output_compression()
+        if fmt == "Fixed Width":
+            spec["widths"] = self.fixed_widths_for(self.df)
+        elif fmt == "Delimited":
+            spec["delimiter"] = DELIMITER_MAP.get(self.delimiter_var.get(), ",")
+        elif fmt == "XML":
+            if self.xml_sample_type == "xsd":
+                spec["xsd"] = os.path.abspath(self.xml_sample_path)
+                spec["skip_invalid"] = self.xsd_skip_invalid.get()
+            else:
+                spec["root_tag"], spec["row_tag"] = self.xml_tags()
+        elif fmt == "Database (SQLite)":
+            spec["table"], spec["index_columns"] = self.db_table(), self.db_index_columns()
+        if fmt in FORMATTED_OUTPUTS and self.column_format_specs():
+            self.column_formats()   # bad specs are reported here rather than by the worker
+            spec["formats"] = self.column_format_specs()
+        if spec["validate"]:
+            spec["rules"] = [[rule.col_name, rule.rule_type, rule.param] for rule in self.validation_rules]
+            spec["max_errors"] = self.validation_cap()
+            spec["xsd_check"] = self.xsd_full_check.get()
+            if self.val_mode_var.get() == "Full (CSV error report)":
+                if not self.val_report_var.get().strip():
+                    self.choose_validation_report()
+                if self.val_report_var.get().strip():
+                    spec["report"] = os.path.abspath(self.val_report_var.get().strip())
+        return spec
+
+    def convert_via_service(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "The conversion service needs the workbook loaded from a file.")
+            return
+        if self.df is not self.workbook_df:
+            # The service re-reads file_path, which would export the workbook rather than the frame on screen
+            messagebox.showerror("Error", "The loaded data was replaced by a reverse preview, which the conversion "
+                                          "service can't read; turn off 'Use conversion service' or reload the "
+                                          "workbook.")
+            return
+        if self.sql_enabled.get() or self.incremental_enabled.get() or self.partition_mode_var.get() != "None":
+            messagebox.showerror("Error", "SQL stage, incremental export and split output run in-process only; "
+                                          "turn off 'Use conversion service'.")
+            return
+        save_path = self.ask_save_path()
+        if not save_path:
+            return
+        try:
+            spec = self.service_job_spec(save_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to prepare job: {e}")
+            return
+        self.submit_service_job(spec)
+
+    def submit_service_job(self, spec):
+        url = self.service_url_var.get().strip() or DEFAULT_URL
+        self.status_label.config(text=f"Job queued on {url}...")
+        threading.Thread(target=self.run_service_job, args=(url, spec), daemon=True).start()
+
+    def run_service_job(self, url, spec):
+        try:
+            job = wait_for_job(submit_job(spec, url), url)
+        except Exception as e:
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Conversion service at {url}: {e}"))
+            return
+        self.root.after(0, lambda: self.service_job_done(spec, job))
+
+    def service_job_done(self, spec, job):
+        summary = job_summary(job)
+        if job["state"] == "failed":
+            messagebox.showerror("Error", summary)
+            return
+        if job["state"] == "rejected":
+            validation = job["result"]["validation"]
+            self.show_validation_summary([(row - 1, msg) for row, msg in validation["errors"]],
+                                         validation["schema_errors"], validation["error_count"],
+                                         validation["stopped"])
+            if messagebox.askyesno("Validation Errors", "Validation errors detected. Save anyway?"):
+                self.submit_service_job(dict(spec, validate=False))
+            return
+        self.summary_label.config(text=summary)
+        self.set_status(f"File saved successfully to {spec['output']}")
+
+    # ------------- SQL Stage --------------
+
+    def get_sql_stage(self):
+        engine = self.sql_engine_var.get()
+        if self.sql_stage is None or self.sql_stage_engine != engine:
+            if self.sql_stage is not None:
+                self.sql_stage.close()
+            self.sql_stage = SQLStage(engine)
+            self.sql_stage_engine = engine
+        return self.sql_stage
+
+    def run_sql_query(self, sql, trace=None):
+        trace = trace or PipelineTrace()
+        stage = self.get_sql_stage()
+        with trace.span(f"sql register ({stage.engine})"):
+            if self.df is not None:
+                stage.register("data", self.df)
+            if self.reverse_df is not None:
+                stage.register("reverse", self.reverse_df)
+        with trace.span(f"sql query ({stage.engine})") as info:
+            result = stage.query(sql)
+            info["rows"] = len(result)
+        return result
+
+    def export_frame(self, trace=None):
+        # The frame that preview/validation/export work on: the loaded sheet, or the SQL stage result
+        sql = self.sql_text.get("1.0", tk.END).strip()
+        if not self.sql_enabled.get() or not sql:
+            return self.df
+        return self.run_sql_query(sql, trace)
+
+    def preview_sql_query(self):
+        sql = self.sql_text.get("1.0", tk.END).strip()
+        if not sql:
+            messagebox.showerror("Error", "Please enter a SQL query.")
+            return
+        try:
+            result = self.run_sql_query(sql)
+        except Exception as e:
+            messagebox.showerror("Error", f"SQL query failed: {e}")
+            return
+        self.data_grid.set_frame(result)
+        self.preview_notebook.select(self.data_grid)
+        self.set_status(f"Query returned {len(result)} rows ({self.sql_stage.engine}).")
+
+    # ------------- Out-of-Core Export --------------
+
+    def convert_and_save_streaming(self):
+        if self.incremental_enabled.get():
+            messagebox.showerror("Error", "Incremental export is not available in out-of-core mode.")
+            return
+        save_path = self.ask_save_path()
+        if not save_path:
+            return
+        if self.validation_enabled.get() and self.val_mode_var.get() == "Full (CSV error report)" \
+                and not self.val_report_var.get().strip():
+            self.choose_validation_report()
+        try:
+            # Built on the UI thread since it reads the width entries and option variables
+            writer = self.make_block_writer(save_path + ".part", self.format_var.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save: {e}")
+            return
+        if writer is None:
+            messagebox.showerror("Error", "Unsupported format for saving.")
+            return
+        self.set_status("Streaming export...")
+        threading.Thread(target=self._stream_export_thread, args=(save_path, writer), daemon=True).start()
+
+    def _stream_export_thread(self, save_path, writer):
+        validate = self.validation_enabled.get()
+        cap = self.validation_cap()
+        errors, schema_errors = [], []
+        error_count = 0
+        stopped = False
+        done = 0
+        trace = writer.trace = PipelineTrace()
+        if self.cprofile_enabled.get():
+            trace.start_profiler()
+        try:
+            self.progress["maximum"] = max(1, self.profile.rows)
+            # Each block goes normalize -> validate -> write before the next one is read
+            with writer, self.validation_report(ask=False) as report:
+                for block in self.iter_stream_blocks(self.stream_source, trace):
+                    if validate and not stopped:
+                        remaining = None if cap is None else cap - error_count
+                        block_errors, block_schema_errors, block_count, stopped = self.collect_validation_errors(
+                            block, trace, remaining, report)
+                        error_count += block_count
+                        errors.extend(block_errors[:max(0, VALIDATION_KEEP_ERRORS - len(errors))])
+                        schema_errors.extend(block_schema_errors[:max(0, 10 - len(schema_errors))])
+                    writer.write_block(block)
+                    done += len(block)
+                    self.progress["value"] = done
+            if validate:
+                self.show_validation_summary(errors, schema_errors, error_count, stopped)
+                if error_count or schema_errors:
+                    if not messagebox.askyesno("Validation Errors", "Validation errors detected. Save anyway?"):
+                        os.remove(writer.path)
+                        self.set_status("Save cancelled.")
+                        return
+            os.replace(writer.path, save_path)
+            self.set_status(f"File saved successfully to {save_path} ({done} rows streamed)")
+            self.report_rejected_rows([writer])
+        except Exception as e:
+            if os.path.exists(writer.path):
+                os.remove(writer.path)
+            messagebox.showerror("Error", f"Failed to save: {e}")
+        finally:
+            trace.stop_profiler()
+            self.last_trace = trace
+            self.summary_label.config(text=trace.summary_text())
+            self.progress["value"] = 0
+
+    # ------------- Incremental Export --------------
+
+    def export_settings(self, fmt, df):
+        settings = {"encoding": self.encoding_var.get()}
+        if self.output_compression():
+            settings["compression"] = self.output_compression()
+        if fmt == "Fixed Width":
+            settings["widths"] = self.fixed_widths_for(df)
+        elif fmt == "Delimited":
+            settings["delimiter"] = DELIMITER_MAP.get(self.delimiter_var.get(), ",")
+        if self.column_format_specs():
+            settings["formats"] = self.column_format_specs()
+        return settings
+
+    def render_records(self, df, fmt, settings):
+        # Records carry no line ends; RECORD_TERMINATORS adds them the way DelimitedBlockWriter and
+        # FixedWidthBlockWriter lay out the file
+        formats = ColumnFormat.parse_all(settings.get("formats"))
+        if fmt == "Fixed Width":
+            return None, render_fixed_width_lines(df, settings["widths"], formats)
+        frame, delim = format_frame(df, formats), settings["delimiter"]
+        if len(delim) == 1:
+            # Split the same to_csv text the writer produces, so values and quoting match byte for byte
+            lines = split_csv_records(frame.to_csv(sep=delim, index=False, lineterminator="\n"))
+        else:
+            lines = render_delimited_lines(frame, delim, header=True)
+        return lines[0], lines[1:]
+
+    def incremental_export(self, save_path, fmt, df):
+        key_col = self.incr_key_var.get()
+        if key_col not in df.columns:
+            messagebox.showerror("Error", "Please select a key column for incremental export.")
+            return
+        settings = self.export_settings(fmt, df)
+        new_hashes = compute_row_hashes(df, key_col)
+        manifest = ExportManifest.load(save_path)
+        if manifest is None or not manifest.compatible_with(key_col, fmt, settings):
+            self.write_full_export(df, save_path, fmt, key_col, settings, new_hashes)
+            self.set_status(f"No matching previous manifest; full export written to {save_path}")
+            return
+
+        inserts, updates, deletes = diff_row_hashes(manifest.rows, new_hashes)
+        if not (inserts or updates or deletes):
+            self.set_status("No changed rows since the previous export.")
+            return
+        counts = f"{len(inserts)} inserts, {len(updates)} updates, {len(deletes)} deletes"
+
+        if self.incr_mode_var.get() == "Patch in place":
+            if self.patch_output_in_place(df, save_path, fmt, key_col, settings, manifest, new_hashes,
+                                          inserts, updates, deletes):
+                self.set_status(f"Patched {save_path} in place ({counts})")
+            else:
+                # Deletes, changed record lengths or a stale output can't be patched; rewrite everything
+                self.write_full_export(df, save_path, fmt, key_col, settings, new_hashes)
+                self.set_status(f"Patch not possible; full export written to {save_path} ({counts})")
+            return
+
+        delta_path = self.write_delta_file(df, save_path, fmt, key_col, inserts, updates, deletes)
+        # The base output is left untouched, so its offsets are no longer valid for patching
+        manifest.rows = {key: [h, None, None] for key, h in new_hashes.items()}
+        manifest.in_sync = False
+        manifest.save(save_path)
+        self.set_status(f"Delta written to {delta_path} ({counts})")
+
+    def write_full_export(self, df, save_path, fmt, key_col, settings, new_hashes):
+        rows = {}
+        if fmt in ("Fixed Width", "Delimited") and "compression" not in settings:
+            # Written record by record so each row's byte offset can be kept for later in-place patches
+            header, lines = self.render_records(df, fmt, settings)
+            separator, terminator = RECORD_TERMINATORS[fmt]
+            encoder = make_record_encoder(settings["encoding"])
+            with open(save_path, "wb") as f:
+                f.write(encoder.encode(""))    # BOM (if any) kept out of the first record's span
+                if header is not None:
+                    f.write(encoder.encode(header + terminator))
+                for i, (key, line) in enumerate(zip(df[key_col].astype(str), lines)):
+                    if i:
+                        f.write(encoder.encode(separator))
+                    data = encoder.encode(line + terminator)
+                    rows[key] = [new_hashes[key], f.tell(), len(data)]
+                    f.write(data)
+        else:
+            self.write_output(df, save_path, fmt)
+            rows = {key: [h, None, None] for key, h in new_hashes.items()}
+        ExportManifest(key_col, fmt, settings, rows).save(save_path)
+
+    def write_delta_file(self, df, save_path, fmt, key_col, inserts, updates, deletes):
+        base, ext = os.path.splitext(save_path)
+        delta_path = f"{base}.delta{ext}"
+        keys = df[key_col].astype(str)
+        inserted = set(inserts)
+        changed = df[keys.isin(inserted | set(updates))].copy()
+        changed.insert(0, "_change", ["insert" if key in inserted else "update" for key in keys[changed.index]])
+        delta_df = changed.reset_index(drop=True)
+        if deletes:
+            removed = pd.DataFrame({"_change": "delete", key_col: deletes})
+            delta_df = pd.concat([delta_df, removed], ignore_index=True)
+        self.write_output(delta_df, delta_path, fmt)
+        return delta_path
+
+    def patch_output_in_place(self, df, save_path, fmt, key_col, settings, manifest, new_hashes,
+                              inserts, updates, deletes):
+        if fmt not in ("Fixed Width", "Delimited") or not manifest.in_sync or deletes or "compression" in settings:
+            return False
+        if not os.path.exists(save_path):
+            return False
+        keys = df[key_col].astype(str)
+        changed = df[keys.isin(set(inserts) | set(updates))]
+        _, lines = self.render_records(changed, fmt, settings)
+        separator, terminator = RECORD_TERMINATORS[fmt]
+        encoder = make_record_encoder(settings["encoding"], with_bom=False)
+        records = {key: encoder.encode(line + terminator) for key, line in zip(keys[changed.index], lines)}
+
+        patches = []
+        for key in updates:
+            _, offset, length = manifest.rows[key]
+            if offset is None or len(records[key]) != length:
+                return False
+            patches.append((offset, records[key]))
+
+        with open(save_path, "r+b") as f:
+            for offset, data in patches:
+                f.seek(offset)
+                f.write(data)
+            f.seek(0, os.SEEK_END)
+            for key in inserts:
+                if manifest.rows:
+                    f.write(encoder.encode(separator))
+                manifest.rows[key] = [new_hashes[key], f.tell(), len(records[key])]
+                f.write(records[key])
+        for key in updates:
+            manifest.rows[key][0] = new_hashes[key]
+        manifest.save(save_path)
+        return True
+
+    def save_timing_report(self):
+        if self.last_trace is None:
+            messagebox.showinfo("Info", "No load or export has been timed yet.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("JSON timing report", "*.json"),
+                                                       ("cProfile stats", "*.pstats *.prof")])
+        if not path:
+            return
+        try:
+            if os.path.splitext(path)[1].lower() in (".pstats", ".prof"):
+                self.last_trace.dump_pstats(path)
+            else:
+                self.last_trace.dump_json(path)
+            self.set_status(f"Timing report saved to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save timing report: {e}")
+
     def set_status(self, msg):
         self.status_label.config(text=msg)
         self.root.after(5000, lambda: self.status_label.config(text=""))
@@ -460,6 +3496,32 @@ class ExcelConverterApp:
 
         ttk.Button(frm, text="Add Rule", command=self.add_validation_rule).grid(row=3, column=0, columnspan=2, pady=5)
 
+        # How much of the frame gets checked, and when a check may stop early
+        mode_frame = ttk.LabelFrame(parent, text="Validation Mode", padding=10)
+        mode_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(mode_frame, text="Save-time check:").grid(row=0, column=0, sticky="e")
+        self.val_mode_var = tk.StringVar(value="Stop after N errors")
+        ttk.Combobox(mode_frame, textvariable=self.val_mode_var, state="readonly", width=24,
+                     values=["Stop after N errors", "Full (CSV error report)"]).grid(row=0, column=1, sticky="w", padx=5)
+        ttk.Label(mode_frame, text="N:").grid(row=0, column=2, sticky="e")
+        self.val_max_errors_var = tk.StringVar(value="100")
+        ttk.Entry(mode_frame, textvariable=self.val_max_errors_var, width=10).grid(row=0, column=3, sticky="w", padx=5)
+
+        ttk.Label(mode_frame, text="Preview check:").grid(row=1, column=0, sticky="e")
+        self.val_preview_var = tk.StringVar(value="Stratified sample")
+        ttk.Combobox(mode_frame, textvariable=self.val_preview_var, state="readonly", width=24,
+                     values=["Stratified sample", "Preview rows"]).grid(row=1, column=1, sticky="w", padx=5)
+        ttk.Label(mode_frame, text="Sample rows:").grid(row=1, column=2, sticky="e")
+        self.val_sample_var = tk.StringVar(value="10000")
+        ttk.Entry(mode_frame, textvariable=self.val_sample_var, width=10).grid(row=1, column=3, sticky="w", padx=5)
+
+        ttk.Label(mode_frame, text="Error report:").grid(row=2, column=0, sticky="e")
+        self.val_report_var = tk.StringVar()
+        ttk.Entry(mode_frame, textvariable=self.val_report_var, width=50).grid(row=2, column=1, columnspan=3,
+                                                                              sticky="w", padx=5)
+        ttk.Button(mode_frame, text="Browse", command=self.choose_validation_report).grid(row=2, column=4, padx=5)
+
         # Validation rules display
         self.rules_listbox = tk.Listbox(parent, height=10)
         self.rules_listbox.pack(fill="both", expand=True, padx=10, pady=5)
@@ -473,6 +3535,41 @@ class ExcelConverterApp:
 
         self.update_validation_columns()
 
+    def validation_cap(self):
+        if self.val_mode_var.get() != "Stop after N errors":
+            return None
+        try:
+            return max(1, int(self.val_max_errors_var.get()))
+        except ValueError:
+            return 100
+
+    def validation_sample_size(self):
+        try:
+            return max(1, int(self.val_sample_var.get()))
+        except ValueError:
+            return 10000
+
+    def choose_validation_report(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if path:
+            self.val_report_var.set(path)
+
+    @contextmanager
+    def validation_report(self, ask=True):
+        # csv writer receiving every error in full mode; None when no report is wanted
+        path = None
+        if self.val_mode_var.get() == "Full (CSV error report)":
+            if ask and not self.val_report_var.get().strip():
+                self.choose_validation_report()
+            path = self.val_report_var.get().strip()
+        if not path:
+            yield None
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            report = csv.writer(f)
+            report.writerow(["row", "column", "rule", "message"])
+            yield report
+
     def update_validation_columns(self):
         if self.df is not None:
             self.val_col_combo["values"] = list(self.df.columns)
@@ -555,7 +3652,7 @@ class ExcelConverterApp:
     # ------------- Reverse Tab --------------
 
     def build_reverse_tab(self, parent):
-        file_frame = ttk.LabelFrame(parent, text="Input File Selection (XML, JSON, CSV, Fixed Width)", padding=10)
+        file_frame = ttk.LabelFrame(parent, text="Input File Selection (XML, JSON, JSONL, CSV, Fixed Width)", padding=10)
         file_frame.pack(fill="x", pady=5)
 
         tk.Button(file_frame, text="Browse Input File", command=self.load_reverse_file, bg="green", fg="white").pack(side="left")
@@ -568,25 +3665,41 @@ class ExcelConverterApp:
         ttk.Label(options_frame, text="Input Format:").grid(row=0, column=0, sticky="e", padx=5)
         self.rev_format_var = tk.StringVar(value="Auto Detect")
         self.rev_format_combo = ttk.Combobox(options_frame, textvariable=self.rev_format_var, state="readonly",
-                                            values=["Auto Detect", "XML", "JSON", "CSV", "Fixed Width"], width=20)
+                                            values=["Auto Detect"] + REVERSE_FORMATS, width=20)
         self.rev_format_combo.grid(row=0, column=1, sticky="w")
         self.rev_format_combo.bind("<<ComboboxSelected>>", self.on_reverse_format_change)
 
         ttk.Label(options_frame, text="Delimiter (for CSV):").grid(row=1, column=0, sticky="e", padx=5)
         self.rev_delimiter_var = tk.StringVar(value=",")
         self.rev_delimiter_combo = ttk.Combobox(options_frame, textvariable=self.rev_delimiter_var, state="readonly",
-                                                values=[",", "|", "|||"], width=20)
+                                                values=[",", "|", "|||", ";", "Tab"], width=20)
         self.rev_delimiter_combo.grid(row=1, column=1, sticky="w")
 
+        # Set from the file's first bytes by auto_detect_reverse_format; editable for encodings not listed
+        ttk.Label(options_frame, text="Encoding:").grid(row=0, column=2, sticky="e", padx=5)
+        self.rev_encoding_var = tk.StringVar(value="utf-8")
+        ttk.Combobox(options_frame, textvariable=self.rev_encoding_var, width=15,
+                     values=["utf-8", "utf-8-sig", "utf-16", "cp1252", "iso-8859-1"]).grid(row=0, column=3, sticky="w")
+        self.rev_header_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="First row is a header", variable=self.rev_header_var).grid(
+            row=1, column=2, columnspan=2, sticky="w", padx=5)
+
+        ttk.Label(options_frame, text="XML Mapping:").grid(row=2, column=0, sticky="e", padx=5)
+        self.rev_xml_mapping_var = tk.StringVar(value="Infer from input")
+        ttk.Combobox(options_frame, textvariable=self.rev_xml_mapping_var, state="readonly", width=20,
+                     values=["Infer from input", "From XML/XSD template", "From mapping file"]).grid(row=2, column=1, sticky="w")
+        ttk.Button(options_frame, text="Load Mapping...", command=self.load_xml_mapping).grid(row=2, column=2, padx=5)
+        ttk.Button(options_frame, text="Save Mapping...", command=self.save_xml_mapping).grid(row=2, column=3, padx=5)
+
         self.rev_fixed_width_frame = ttk.LabelFrame(parent, text="Fixed Width Column Widths", padding=10)
         self.rev_fixed_width_frame.pack(fill="x", pady=5)
         self.rev_fixed_width_inner = ttk.Frame(self.rev_fixed_width_frame)
         self.rev_fixed_width_inner.pack(fill="x")
 
-        preview_frame = ttk.LabelFrame(parent, text="Preview Parsed Excel Table (first 25 rows)", padding=10)
+        preview_frame = ttk.LabelFrame(parent, text="Preview Parsed Excel Table", padding=10)
         preview_frame.pack(fill="both", expand=True, pady=5)
-        self.rev_preview_box = tk.Text(preview_frame, height=15, width=120)
-        self.rev_preview_box.pack(expand=True, fill="both")
+        self.rev_grid = VirtualGrid(preview_frame)
+        self.rev_grid.pack(expand=True, fill="both")
 
         btn_frame = ttk.Frame(parent)
         btn_frame.pack(pady=5)
@@ -596,7 +3709,9 @@ class ExcelConverterApp:
         self.rev_fixed_width_frame.pack_forget()
 
     def load_reverse_file(self):
-        path = filedialog.askopenfilename(filetypes=[("All supported", "*.xml *.json *.csv *.txt *.dat *.fwf")])
+        path = filedialog.askopenfilename(filetypes=[("All supported", "*.xml *.json *.jsonl *.ndjson *.csv *.txt *.dat *.fwf "
+                                                                        "*.gz *.zst *.bz2"),
+                                                     ("All files", "*.*")])
         if path:
             self.reverse_file_path = path
             self.rev_file_label.config(text=os.path.basename(path))
@@ -605,18 +3720,21 @@ class ExcelConverterApp:
     def auto_detect_reverse_format(self):
         if not self.reverse_file_path:
             return
-        ext = os.path.splitext(self.reverse_file_path)[1].lower()
-        detected_format = "Auto Detect"
-        if ext == ".xml":
-            detected_format = "XML"
-        elif ext == ".json":
-            detected_format = "JSON"
-        elif ext in [".csv", ".txt"]:
-            detected_format = "CSV"
-        elif ext in [".fwf", ".dat"]:
-            detected_format = "Fixed Width"
-        self.rev_format_var.set(detected_format)
+        try:
+            sniff = InputSniff(self.reverse_file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to read input file: {e}")
+            return
+        self.rev_format_var.set(sniff.format or "Auto Detect")
+        self.rev_encoding_var.set(sniff.encoding)
+        if sniff.delimiter is not None:
+            self.rev_delimiter_var.set("Tab" if sniff.delimiter == "\t" else sniff.delimiter)
+        if sniff.header is not None:
+            self.rev_header_var.set(sniff.header)
         self.on_reverse_format_change()
+        if sniff.widths:
+            self.rev_fixed_width_entry.insert(0, ",".join(map(str, sniff.widths)))
+        self.set_status(sniff.describe())
 
     def on_reverse_format_change(self, event=None):
         fmt = self.rev_format_var.get()
@@ -641,54 +3759,90 @@ class ExcelConverterApp:
         if fmt == "Auto Detect":
             self.auto_detect_reverse_format()
             fmt = self.rev_format_var.get()
-        try:
-            if fmt == "XML":
-                tree = ET.parse(self.reverse_file_path)
-                root = tree.getroot()
-                data = []
-                cols = set()
-                for child in root:
-                    row_dict = {}
-                    for elem in child:
-                        row_dict[elem.tag] = elem.text
-                        cols.add(elem.tag)
-                    data.append(row_dict)
-                cols = list(cols)
-                df = pd.DataFrame(data, columns=cols)
-            elif fmt == "JSON":
-                df = pd.read_json(self.reverse_file_path)
-            elif fmt == "CSV":
-                delim = self.rev_delimiter_var.get()
-                df = pd.read_csv(self.reverse_file_path, sep=delim)
-            elif fmt == "Fixed Width":
-                if not hasattr(self, "rev_fixed_width_entry"):
-                    messagebox.showerror("Error", "Please define fixed width column widths.")
-                    return
-                widths_text = self.rev_fixed_width_entry.get()
-                try:
-                    widths = [int(w.strip()) for w in widths_text.split(",")]
-                except:
-                    messagebox.showerror("Error", "Invalid fixed width column widths.")
-                    return
-                df = pd.read_fwf(self.reverse_file_path, widths=widths)
-            else:
-                messagebox.showerror("Error", "Unsupported input format.")
+            if fmt == "Auto Detect":
+                messagebox.showerror("Error", "Could not detect the input format; please choose one.")
                 return
-
-            preview_text = df.head(25).to_string(index=False)
-            self.rev_preview_box.delete("1.0", tk.END)
-            self.rev_preview_box.insert(tk.END, preview_text)
+        widths = None
+        if fmt == "Fixed Width":
+            if not hasattr(self, "rev_fixed_width_entry"):
+                messagebox.showerror("Error", "Please define fixed width column widths.")
+                return
+            widths_text = self.rev_fixed_width_entry.get()
+            try:
+                widths = [int(w.strip()) for w in widths_text.split(",")]
+            except:
+                messagebox.showerror("Error", "Invalid fixed width column widths.")
+                return
+        elif fmt not in REVERSE_FORMATS:
+            messagebox.showerror("Error", "Unsupported input format.")
+            return
+        try:
+            mapper = self.reverse_xml_mapper() if fmt == "XML" else None
+            delimiter = self.rev_delimiter_var.get()
+            df = parse_reverse_file(self.reverse_file_path, fmt, delimiter="\t" if delimiter == "Tab" else delimiter,
+                                    widths=widths, xml_mapper=mapper, encoding=self.rev_encoding_var.get().strip() or None,
+                                    header=self.rev_header_var.get())
+            self.rev_xml_mapper_used = mapper
+
+            self.rev_grid.set_frame(df)
             self.reverse_df = df
             self.set_status("Preview loaded for reverse conversion.")
 
             # Update validation columns on main tab as well if applicable
             if fmt in ["CSV", "Fixed Width"]:
                 self.df = df
+                self.stream_source = None
                 self.update_validation_columns()
+                self.data_grid.set_frame(df)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to parse file: {e}")
 
+    def reverse_xml_mapper(self):
+        source = self.rev_xml_mapping_var.get()
+        if source == "From mapping file":
+            if self.rev_xml_mapper is None:
+                self.load_xml_mapping()
+            if self.rev_xml_mapper is None:
+                raise ValueError("No XML mapping file loaded.")
+            return self.rev_xml_mapper
+        if source == "From XML/XSD template":
+            if self.xml_sample_type == "xml":
+                return XMLRecordMapper.infer(self.xml_sample_path)
+            if self.xml_sample_type == "xsd":
+                if self.df is None:
+                    raise ValueError("Load the Excel file first: XSD paths are bound to its columns.")
+                return XMLRecordMapper.from_xsd(self.xsd_generator(self.df.columns))
+            raise ValueError("No XML/XSD template loaded on the Excel to Output tab.")
+        return XMLRecordMapper.infer(self.reverse_file_path)
+
+    def load_xml_mapping(self):
+        path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if not path:
+            return
+        try:
+            self.rev_xml_mapper = XMLRecordMapper.from_json(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load XML mapping: {e}")
+            return
+        self.rev_xml_mapping_var.set("From mapping file")
+        self.set_status(f"XML mapping loaded: {len(self.rev_xml_mapper.mapping)} columns of "
+                        f"{self.rev_xml_mapper.record} records")
+
+    def save_xml_mapping(self):
+        # Saves the mapping of the last XML preview, to be edited and loaded back
+        if self.rev_xml_mapper_used is None:
+            messagebox.showerror("Error", "Preview an XML input first.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if not path:
+            return
+        try:
+            self.rev_xml_mapper_used.to_json(path)
+            self.set_status(f"XML mapping saved to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save XML mapping: {e}")
+
     def reverse_save_excel(self):
         if not hasattr(self, "reverse_df"):
             messagebox.showerror("Error", "No preview available to save.")
@@ -703,49 +3857,10 @@ class ExcelConverterApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save Excel file: {e}")
 
-# ------------- ValidationRule class -------------
-
-class ValidationRule:
-    def __init__(self, col_name, rule_type, param=None):
-        self.col_name = col_name
-        self.rule_type = rule_type
-        self.param = param
-
-    def validate(self, series):
-        errors = []
-        if self.rule_type == "not_null":
-            for idx, val in series.items():
-                if pd.isnull(val) or (isinstance(val, str) and val.strip() == ""):
-                    errors.append((idx, "Value cannot be null or empty"))
-        elif self.rule_type == "date":
-            for idx, val in series.items():
-                if pd.isnull(val):
-                    continue
-                try:
-                    pd.to_datetime(val)
-                except:
-                    errors.append((idx, f"Invalid date: {val}"))
-        elif self.rule_type == "regex":
-            pattern = self.param
-            import re
-            for idx, val in series.items():
-                if pd.isnull(val):
-                    continue
-                if not re.match(pattern, str(val)):
-                    errors.append((idx, f"Value does not match pattern: {pattern}"))
-        return errors
-
 # ------------- Main program --------------
 
 if __name__ == "__main__":
-    import pandas as pd
-    import tkinter as tk
-    from tkinter import ttk, filedialog, messagebox
-    import os
-    import json
-    import xml.etree.ElementTree as ET
-    import xmlschema
-
     root = tk.Tk()
     app = ExcelConverterApp(root)
+    warm_in_background(root, pd, np, ET, xmlschema)
     root.mainloop()
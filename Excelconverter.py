@@ -1,9 +1,65 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import pandas as pd
-import xml.etree.ElementTree as ET
 import os
 import threading
+from lazy_imports import LazyModule, warm_in_background
+from compressed_io import COMPRESSION_CODECS, open_output, compressed_path
+
+pd = LazyModule("pandas")
+ET = LazyModule("xml.etree.ElementTree")
+
+DELIMITER_MAP = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}
+
+
+def df_to_xml(df):
+    def escape_xml(s):
+        return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    root = ET.Element("Root")
+    for _, row in df.iterrows():
+        item = ET.SubElement(root, "Row")
+        for col in df.columns:
+            col_elem = ET.SubElement(item, col)
+            val = "" if pd.isnull(row[col]) else escape_xml(row[col])
+            col_elem.text = val
+    return ET.tostring(root, encoding="unicode")
+
+
+def open_text_output(save_path, encoding, compression=None):
+    if not compression:
+        return open(save_path, "w", encoding=encoding)
+    return open_output(save_path, encoding, compression)[0]
+
+
+def write_output(df, save_path, fmt, encoding="utf-8", delimiter=",", widths=None, xml_str=None, compression=None):
+    if fmt == "Fixed Width":
+        with open_text_output(save_path, encoding, compression) as f:
+            header = ''.join(col[:widths[col]].ljust(widths[col]) for col in df.columns)
+            f.write(header + "\n")
+            for _, row in df.iterrows():
+                line = ''.join(str(row[col])[:widths[col]].ljust(widths[col]) if pd.notnull(row[col]) else ''.ljust(widths[col]) for col in df.columns)
+                f.write(line + "\n")
+    elif fmt == "Delimited":
+        sep = DELIMITER_MAP[delimiter]
+        csv = df.to_csv(index=False, sep="|", encoding=encoding)
+        if sep == "|||":
+            csv = csv.replace("|", "|||")
+        elif sep != "|":
+            csv = df.to_csv(index=False, sep=sep, encoding=encoding)
+        with open_text_output(save_path, encoding, compression) as f:
+            f.write(csv)
+    elif fmt == "JSON":
+        if compression:
+            with open_text_output(save_path, "utf-8", compression) as f:
+                f.write(df.to_json(orient="records", lines=True, force_ascii=False))
+        else:
+            df.to_json(save_path, orient="records", lines=True, force_ascii=False)
+    else:
+        # XML: either pre-rendered from a sample mapping or the generic layout
+        if xml_str is None:
+            xml_str = df_to_xml(df)
+        with open_text_output(save_path, encoding, compression) as f:
+            f.write(xml_str)
+
 
 class ExcelConverterApp:
     def __init__(self, root):
@@ -53,7 +109,7 @@ class ExcelConverterApp:
         ttk.Label(options_frame, text="Delimiter:").grid(row=1, column=0, sticky="e", padx=5)
         self.delimiter_var = tk.StringVar()
         self.delimiter_combo = ttk.Combobox(options_frame, textvariable=self.delimiter_var, state="readonly",
-                                            values=[",", "Single Pipe (|)", "Triple Pipe (|||)"], width=20)
+                                            values=list(DELIMITER_MAP), width=20)
         self.delimiter_combo.grid(row=1, column=1, sticky="w")
 
         ttk.Label(options_frame, text="File Extension:").grid(row=2, column=0, sticky="e", padx=5)
@@ -68,6 +124,12 @@ class ExcelConverterApp:
                                            values=["utf-8", "utf-16", "ascii", "iso-8859-1"], width=20)
         self.encoding_combo.grid(row=3, column=1, sticky="w")
 
+        ttk.Label(options_frame, text="Compression:").grid(row=0, column=2, sticky="e", padx=5)
+        self.compression_var = tk.StringVar(value="None")
+        self.compression_combo = ttk.Combobox(options_frame, textvariable=self.compression_var, state="readonly",
+                                              values=["None"] + COMPRESSION_CODECS, width=20)
+        self.compression_combo.grid(row=0, column=3, sticky="w")
+
         self.browse_xml_btn = tk.Button(options_frame, text="Browse XML/XSD", command=self.load_xml_sample, bg="orange", fg="white")
         self.browse_xml_btn.grid(row=4, column=0, columnspan=2, pady=5)
         self.browse_xml_btn.grid_remove()
@@ -193,16 +255,7 @@ class ExcelConverterApp:
             return self.convert_df_to_xml(df)
 
     def convert_df_to_xml(self, df):
-        def escape_xml(s):
-            return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        root = ET.Element("Root")
-        for _, row in df.iterrows():
-            item = ET.SubElement(root, "Row")
-            for col in df.columns:
-                col_elem = ET.SubElement(item, col)
-                val = "" if pd.isnull(row[col]) else escape_xml(row[col])
-                col_elem.text = val
-        return ET.tostring(root, encoding="unicode")
+        return df_to_xml(df)
 
     def preview_output(self):
         if self.df is None:
@@ -221,8 +274,7 @@ class ExcelConverterApp:
                     line = ''.join(str(row[col])[:widths[col]].ljust(widths[col]) if pd.notnull(row[col]) else ''.ljust(widths[col]) for col in self.df.columns)
                     output += line + "\n"
             elif fmt == "Delimited":
-                delim_map = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}
-                sep = delim_map.get(self.delimiter_var.get(), ",")
+                sep = DELIMITER_MAP.get(self.delimiter_var.get(), ",")
                 output = preview_df.to_csv(index=False, sep="|")
                 if sep == "|||":
                     output = output.replace("|", "|||")
@@ -254,40 +306,23 @@ class ExcelConverterApp:
             fmt = self.format_var.get()
             ext = self.ext_var.get() or ".txt"
             encoding = self.encoding_var.get() or "utf-8"
+            compression = None if self.compression_var.get() == "None" else self.compression_var.get()
             save_path = filedialog.asksaveasfilename(defaultextension=ext,
                                                      filetypes=[(f"{ext} files", f"*{ext}"), ("All files", "*.*")],
                                                      initialfile="output" + ext)
             if not save_path:
                 self.set_status("Save cancelled.")
                 return
+            if compression:
+                save_path = compressed_path(save_path, compression)
 
+            widths = None
+            xml_str = None
             if fmt == "Fixed Width":
                 widths = {col: int(entry.get()) for col, entry in self.col_width_entries}
-                with open(save_path, "w", encoding=encoding) as f:
-                    header = ''.join(col[:widths[col]].ljust(widths[col]) for col in self.df.columns)
-                    f.write(header + "\n")
-                    for _, row in self.df.iterrows():
-                        line = ''.join(str(row[col])[:widths[col]].ljust(widths[col]) if pd.notnull(row[col]) else ''.ljust(widths[col]) for col in self.df.columns)
-                        f.write(line + "\n")
-            elif fmt == "Delimited":
-                sep = {",": ",", "Single Pipe (|)": "|", "Triple Pipe (|||)": "|||"}[self.delimiter_var.get()]
-                csv = self.df.to_csv(index=False, sep="|", encoding=encoding)
-                if sep == "|||":
-                    csv = csv.replace("|", "|||")
-                elif sep != "|":
-                    csv = self.df.to_csv(index=False, sep=sep, encoding=encoding)
-                with open(save_path, "w", encoding=encoding) as f:
-                    f.write(csv)
-            elif fmt == "JSON":
-                self.df.to_json(save_path, orient="records", lines=True, force_ascii=False)
             elif fmt == "XML" and self.xml_sample_path:
                 xml_str = self.convert_df_to_sampled_xml(self.df)
-                with open(save_path, "w", encoding=encoding) as f:
-                    f.write(xml_str)
-            else:
-                xml_str = self.convert_df_to_xml(self.df)
-                with open(save_path, "w", encoding=encoding) as f:
-                    f.write(xml_str)
+            write_output(self.df, save_path, fmt, encoding, self.delimiter_var.get(), widths, xml_str, compression)
 
             self.set_status(f"File saved: {save_path}")
         except Exception as e:
@@ -300,6 +335,7 @@ class ExcelConverterApp:
 def main():
     root = tk.Tk()
     app = ExcelConverterApp(root)
+    warm_in_background(root, pd, ET)
     root.mainloop()
 
 if __name__ == "__main__":
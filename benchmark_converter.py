@@ -0,0 +1,568 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import compressed_io as cio
+import Dataformatting_tool as dft
+import Excelconverter as exc
+
+# ---------------------------
+# Synthetic workbooks
+# ---------------------------
+
+DEFAULT_MIX = "int:2,float:2,str:4,date:1,bool:1"
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition(":")
+        weights[name.strip()] = int(weight or 1)
+    unknown = set(weights) - {"int", "float", "str", "date", "bool"}
+    if unknown:
+        raise ValueError(f"Unknown dtypes in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def generate_frame(rows, cols, mix=DEFAULT_MIX, null_ratio=0.02, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = parse_mix(mix)
+    kinds = [kind for kind, weight in weights.items() for _ in range(weight)]
+    words = np.array(["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"])
+    data = {}
+    for i in range(cols):
+        kind = kinds[i % len(kinds)]
+        name = f"{kind}_{i}"
+        if kind == "int":
+            values = pd.Series(rng.integers(0, 1_000_000, rows))
+        elif kind == "float":
+            values = pd.Series(rng.normal(1000, 250, rows).round(4))
+        elif kind == "str":
+            values = pd.Series(words[rng.integers(0, len(words), rows)]) + rng.integers(0, 10_000, rows).astype(str)
+        elif kind == "date":
+            values = pd.Series(pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D"))
+        else:
+            values = pd.Series(rng.integers(0, 2, rows).astype(bool))
+        if null_ratio and kind in ("float", "str"):
+            values = values.where(rng.random(rows) >= null_ratio)
+        data[name] = values
+    return pd.DataFrame(data)
+
+# ---------------------------
+# Measurement
+# ---------------------------
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    # Separate traced run so tracemalloc overhead doesn't skew the timings
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def record(results, suite, case, rows, cols, func, repeat, output_path=None):
+    try:
+        seconds, peak = measure(func, repeat)
+    except Exception as e:
+        results.append({"suite": suite, "case": case, "rows": rows, "cols": cols, "error": str(e)})
+        print(f"{suite:<10} {case:<40} ERROR {e}")
+        return
+    entry = {
+        "suite": suite,
+        "case": case,
+        "rows": rows,
+        "cols": cols,
+        "seconds": round(seconds, 6),
+        "rows_per_s": round(rows / seconds, 1) if seconds else None,
+        "peak_alloc_bytes": peak,
+    }
+    size = ""
+    if output_path and os.path.exists(output_path):
+        entry["output_bytes"] = os.path.getsize(output_path)
+        size = f" {entry['output_bytes'] / 1e6:9.2f} MB out"
+    results.append(entry)
+    print(f"{suite:<10} {case:<40} {seconds:9.4f}s {entry['rows_per_s'] or 0:>12.0f} rows/s {peak / 1e6:9.1f} MB peak"
+          f"{size}")
+
+# ---------------------------
+# Suites
+# ---------------------------
+
+def fixed_widths(df):
+    return [max(10, int(df[col].astype(str).str.len().max())) for col in df.columns]
+
+
+def bench_read(df, workdir, repeat, results):
+    path = os.path.join(workdir, "input.xlsx")
+    df.to_excel(path, index=False)
+    rows, cols = df.shape
+    record(results, "read", "read_excel_file", rows, cols, lambda: dft.read_workbook(path), repeat)
+    record(results, "read", "read_excel_file (streamed blocks)", rows, cols,
+           lambda: [dft.normalize_frame(block) for block in dft.iter_excel_blocks(path, 50000)], repeat)
+    record(results, "read", "profile", rows, cols, lambda: dft.FrameProfile.of(df), repeat)
+
+
+def bench_write(df, workdir, repeat, results):
+    rows, cols = df.shape
+    widths = fixed_widths(df)
+    out = os.path.join(workdir, "out")
+    # Per-column specs of the kinds the column settings offer, by generated column kind
+    specs = {"int": "08", "float": ">.2", "date": "%d/%m/%Y"}
+    formats = dft.ColumnFormat.parse_all({col: specs.get(col.split("_")[0], "") for col in df.columns})
+
+    def block_write(writer):
+        def run():
+            with writer:
+                writer.write_block(df)
+        return run
+
+    # Dataformatting_tool.py convert_and_save
+    writers = {
+        "Fixed Width": lambda: dft.FixedWidthBlockWriter(out, "utf-8", widths),
+        "Fixed Width formatted": lambda: dft.FixedWidthBlockWriter(out, "utf-8", widths, formats),
+        "Delimited ,": lambda: dft.DelimitedBlockWriter(out, "utf-8", ","),
+        "Delimited |": lambda: dft.DelimitedBlockWriter(out, "utf-8", "|"),
+        "Delimited |||": lambda: dft.DelimitedBlockWriter(out, "utf-8", "|||"),
+        "JSON": lambda: dft.JSONBlockWriter(out, "utf-8"),
+        "XML": lambda: dft.XMLBlockWriter(out, "utf-8", "Root", "Row"),
+        "XML formatted": lambda: dft.XMLBlockWriter(out, "utf-8", "Root", "Row", formats),
+    }
+    for case, make_writer in writers.items():
+        record(results, "write", f"convert_and_save {case}", rows, cols,
+               lambda make_writer=make_writer: block_write(make_writer())(), repeat, out)
+
+    # Column text rendering by column kind, against the per-cell Python it replaced
+    def per_cell_texts(series, fmt):
+        if fmt and fmt.date:
+            texts = series.dt.strftime(fmt.date)
+        else:
+            texts = pd.Series(list(map(str, series.to_numpy(dtype=object))), dtype=object)
+            texts = texts.str.zfill(fmt.width or 8) if fmt and fmt.zero else texts
+        if fmt and fmt.width:
+            texts = texts.str.rjust(fmt.width) if fmt.align == ">" else texts.str.ljust(fmt.width)
+        return texts.to_numpy(dtype=object)
+
+    for kind, spec in (("int", ""), ("int", "08"), ("bool", ""), ("date", "%d/%m/%Y")):
+        col = next((c for c in df.columns if c.startswith(kind + "_")), None)
+        if col is None:
+            continue
+        fmt = dft.ColumnFormat(spec) if spec else None
+        for case, render in (("column_texts", lambda s, f: dft.column_texts(s, f, 8)), ("per-cell", per_cell_texts)):
+            record(results, "write", f"{case} {kind} {spec}".rstrip(), rows, 1,
+                   lambda render=render, series=df[col], fmt=fmt: render(series, fmt), repeat)
+
+    # Compressed output written through the codec, against writing plain text and gzipping it afterwards
+    for case in ("Fixed Width", "Delimited ,", "XML"):
+        for codec in cio.COMPRESSION_CODECS:
+            path = out + cio.COMPRESSION_EXTENSIONS[codec]
+
+            def compressed(make_writer=writers[case], codec=codec, path=path):
+                writer = make_writer()
+                writer.path, writer.compression = path, codec
+                block_write(writer)()
+            record(results, "write", f"convert_and_save {case} {codec}", rows, cols, compressed, repeat, path)
+
+        def gzip_afterwards(make_writer=writers[case]):
+            block_write(make_writer())()
+            with open(out, "rb") as src, gzip.open(out + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        record(results, "write", f"convert_and_save {case} then gzip", rows, cols, gzip_afterwards, repeat,
+               out + ".gz")
+
+    # Split output: the same frame as 4 gzip partitions written from the worker pool
+    def partitioned(make_writer=writers["Delimited ,"]):
+        parts = dft.plan_partitions(df, "Rows per file", -(-rows // 4))
+        jobs = []
+        for part in parts:
+            writer = make_writer()
+            writer.path = dft.partition_path(out + ".gz", part["label"])
+            writer.compression, writer.digest = "gzip", hashlib.sha256()
+            writer.compression_threads = dft.partition_compression_threads(min(len(parts), dft.PARTITION_WORKERS))
+            jobs.append((writer, part["frame"]))
+
+        def write_part(job):
+            with job[0] as writer:
+                writer.write_block(job[1])
+        with ThreadPoolExecutor(max_workers=min(len(jobs), dft.PARTITION_WORKERS)) as pool:
+            list(pool.map(write_part, jobs))
+    record(results, "write", "convert_and_save Delimited , gzip x4 parts", rows, cols, partitioned, repeat)
+
+    # Database target: batched executemany load against pandas' to_sql as the baseline
+    db_path = os.path.join(workdir, "out.db")
+    record(results, "write", "convert_and_save Database (SQLite)", rows, cols,
+           lambda: block_write(dft.SQLiteBlockWriter(db_path, "data"))(), repeat, db_path)
+
+    def to_sql_baseline():
+        with sqlite3.connect(db_path) as con:
+            df.to_sql("data", con, index=False, if_exists="replace")
+        con.close()
+    record(results, "write", "to_sql baseline (SQLite)", rows, cols, to_sql_baseline, repeat, db_path)
+
+    # Excelconverter.py _convert_and_save_thread
+    width_map = dict(zip(df.columns, widths))
+    legacy = {
+        "Fixed Width": dict(fmt="Fixed Width", widths=width_map),
+        "Delimited ,": dict(fmt="Delimited", delimiter=","),
+        "Delimited |": dict(fmt="Delimited", delimiter="Single Pipe (|)"),
+        "Delimited |||": dict(fmt="Delimited", delimiter="Triple Pipe (|||)"),
+        "JSON": dict(fmt="JSON"),
+        "XML": dict(fmt="XML"),
+    }
+    for case, kwargs in legacy.items():
+        record(results, "write", f"_convert_and_save_thread {case}", rows, cols,
+               lambda kwargs=kwargs: exc.write_output(df, out, **kwargs), repeat, out)
+
+
+def bench_validate(df, workdir, repeat, results):
+    rows, cols = df.shape
+    str_col = next((col for col in df.columns if col.startswith("str_")), df.columns[0])
+    date_col = next((col for col in df.columns if col.startswith("date_")), df.columns[0])
+    rules = {
+        "not_null": dft.ValidationRule(str_col, "not_null"),
+        "date": dft.ValidationRule(date_col, "date"),
+        "regex": dft.ValidationRule(str_col, "regex", r"[a-z]+\d+"),
+    }
+    for case, rule in rules.items():
+        record(results, "validate", f"perform_validation {case}", rows, 1,
+               lambda rule=rule: rule.validate(df[rule.col_name]), repeat)
+    # Save-time check in "stop after N errors" mode, and the preview's stratified sample
+    rule_list = list(rules.values())
+    record(results, "validate", "perform_validation stop after 100", rows, cols,
+           lambda: dft.validate_frame(df, rule_list, max_errors=100), repeat)
+    record(results, "validate", "perform_validation stratified sample", rows, cols,
+           lambda: dft.validate_frame(dft.stratified_sample(df, 10000), rule_list), repeat)
+
+
+def bench_reverse(df, workdir, repeat, results):
+    rows, cols = df.shape
+    widths = fixed_widths(df)
+    inputs = {
+        "XML": (dft.XMLBlockWriter(os.path.join(workdir, "rev.xml"), "utf-8", "Root", "Row"), {}),
+        "JSON": (dft.JSONBlockWriter(os.path.join(workdir, "rev.json"), "utf-8"), {}),
+        "CSV": (dft.DelimitedBlockWriter(os.path.join(workdir, "rev.csv"), "utf-8", ","), {"delimiter": ","}),
+        "Fixed Width": (dft.FixedWidthBlockWriter(os.path.join(workdir, "rev.fwf"), "utf-8", widths),
+                        {"widths": widths}),
+    }
+    for fmt, (writer, kwargs) in inputs.items():
+        with writer:
+            writer.write_block(df)
+        record(results, "reverse", f"reverse_preview {fmt}", rows, cols,
+               lambda fmt=fmt, path=writer.path, kwargs=kwargs: dft.parse_reverse_file(path, fmt, **kwargs), repeat)
+    for codec in cio.COMPRESSION_CODECS:
+        path = os.path.join(workdir, "rev.csv" + cio.COMPRESSION_EXTENSIONS[codec])
+        writer = dft.DelimitedBlockWriter(path, "utf-8", ",")
+        writer.compression = codec
+        try:
+            with writer:
+                writer.write_block(df)
+        except ImportError as e:
+            results.append({"suite": "reverse", "case": f"reverse_preview CSV {codec}", "rows": rows, "cols": cols,
+                            "error": str(e)})
+            print(f"{'reverse':<10} {'reverse_preview CSV ' + codec:<40} ERROR {e}")
+            continue
+        record(results, "reverse", f"reverse_preview CSV {codec}", rows, cols,
+               lambda path=path: dft.parse_reverse_file(path, "CSV"), repeat)
+    jsonl = os.path.join(workdir, "rev.jsonl")
+    df.to_json(jsonl, orient="records", lines=True, date_format="iso")
+    record(results, "reverse", "reverse_preview JSONL", rows, cols,
+           lambda: dft.parse_reverse_file(jsonl, "JSONL"), repeat)
+    record(results, "reverse", "InputSniff CSV", rows, cols,
+           lambda: dft.InputSniff(inputs["CSV"][0].path), repeat)
+    nested = os.path.join(workdir, "rev_nested.xml")
+    write_nested_xml(df, nested)
+    record(results, "reverse", "reverse_preview XML nested", rows, cols,
+           lambda: dft.parse_reverse_file(nested, "XML"), repeat)
+
+
+def write_nested_xml(df, path):
+    # Vendor-feed shape: Feed/Items/Item records, the first column as an attribute and half of the rest one level down
+    names = [re.sub(r"\W", "_", str(col)) for col in df.columns]
+    texts = df.astype(str).to_numpy(dtype=object, na_value="")
+    half = 1 + (len(names) - 1) // 2
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<Feed><Header><Rows>%d</Rows></Header><Items>" % len(df))
+        for row in texts:
+            values = [dft.xml_escape(value, {'"': "&quot;"}) for value in row]
+            f.write(f'<Item {names[0]}="{values[0]}">')
+            f.write("".join(f"<{name}>{value}</{name}>" for name, value in zip(names[1:half], values[1:half])))
+            f.write("<Detail>" + "".join(f"<{name}>{value}</{name}>"
+                                         for name, value in zip(names[half:], values[half:])) + "</Detail></Item>")
+        f.write("</Items></Feed>")
+
+
+# ---------------------------
+# SQL corpus
+# ---------------------------
+
+SQL_CORPUS_FILES = ["BasicSELECT_Sql.md", "Aggregation_sql.md", "BasicJoin_sql.md"]
+
+
+def load_sql_corpus(base_dir=os.path.dirname(os.path.abspath(__file__))):
+    # Every ```sql block in the markdown notes, titled by the #**[Title](link)** line above it
+    queries = []
+    for name in SQL_CORPUS_FILES:
+        path = os.path.join(base_dir, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        for title, block in re.findall(r"#\*\*\[(.+?)\]\(.*?\)\*\*\s*```sql\s*(.*?)```", text, re.S):
+            statements = [stmt.strip() for stmt in block.split(";") if stmt.strip()]
+            for i, stmt in enumerate(statements):
+                label = title if len(statements) == 1 else f"{title} #{i + 1}"
+                queries.append((label, stmt))
+    return queries
+
+
+def generate_sql_tables(rows, seed=0):
+    # Tables/columns the corpus queries expect; continents are stored uppercase because the queries were
+    # written for MySQL's case-insensitive comparisons
+    rng = np.random.default_rng(seed)
+    small = max(10, rows // 100)
+    words = np.array(["Acme", "Oslo", "Edison", "Irvine", "Ulm", "Boston", "Tokyo", "Kyoto", "Lima", "Nairobi",
+                      "Osaka", "Aurora", "Eureka", "Paris", "Cairo"])
+
+    def names(n, suffix_range=1000):
+        return pd.Series(words[rng.integers(0, len(words), n)]) + rng.integers(0, suffix_range, n).astype(str) + \
+            pd.Series(np.array(["", "a", "e", "o", "x"])[rng.integers(0, 5, n)])
+
+    countries = pd.DataFrame({
+        "CODE": ["USA", "JPN", "KEN", "EGY", "FRA", "PER", "CHN", "AUS"],
+        "NAME": ["United States", "Japan", "Kenya", "Egypt", "France", "Peru", "China", "Australia"],
+        "CONTINENT": ["NORTH AMERICA", "ASIA", "AFRICA", "AFRICA", "EUROPE", "SOUTH AMERICA", "ASIA", "OCEANIA"],
+    })
+    city_ids = np.arange(1, rows + 1)
+    city_ids[0] = 1661
+    city = pd.DataFrame({
+        "ID": city_ids,
+        "NAME": names(rows),
+        "COUNTRYCODE": countries["CODE"].to_numpy()[rng.integers(0, len(countries), rows)],
+        "DISTRICT": names(rows, 50),
+        "POPULATION": rng.integers(1_000, 5_000_000, rows),
+    })
+    station = pd.DataFrame({
+        "ID": np.arange(1, rows + 1),
+        "CITY": names(rows),
+        "STATE": pd.Series(np.array(["CA", "NY", "TX", "WA", "FL"])[rng.integers(0, 5, rows)]),
+        "LAT_N": rng.uniform(0, 160, rows).round(4),
+        "LONG_W": rng.uniform(0, 180, rows).round(4),
+    })
+    students = pd.DataFrame({"ID": np.arange(1, rows + 1), "NAME": names(rows),
+                             "MARKS": rng.integers(0, 101, rows)})
+    grades = pd.DataFrame({"GRADE": np.arange(1, 11), "MIN_MARK": np.arange(0, 100, 10),
+                           "MAX_MARK": np.append(np.arange(9, 99, 10), 100)})
+    employee = pd.DataFrame({"EMPLOYEE_ID": np.arange(1, rows + 1), "NAME": names(rows),
+                             "MONTHS": rng.integers(1, 30, rows), "SALARY": rng.integers(1000, 100_000, rows)})
+    hackers = pd.DataFrame({"HACKER_ID": np.arange(1, small + 1), "NAME": names(small)})
+    difficulty = pd.DataFrame({"DIFFICULTY_LEVEL": np.arange(1, 7), "SCORE": np.arange(1, 7) * 20})
+    challenges = pd.DataFrame({"CHALLENGE_ID": np.arange(1, small + 1),
+                               "HACKER_ID": rng.integers(1, small + 1, small),
+                               "DIFFICULTY_LEVEL": rng.integers(1, 7, small)})
+    submissions = pd.DataFrame({"SUBMISSION_ID": np.arange(1, rows + 1),
+                                "HACKER_ID": rng.integers(1, small + 1, rows),
+                                "CHALLENGE_ID": rng.integers(1, small + 1, rows),
+                                "SCORE": rng.integers(0, 7, rows) * 20})
+    wands_property = pd.DataFrame({"CODE": np.arange(1, 21), "AGE": rng.integers(1, 500, 20),
+                                   "IS_EVIL": (np.arange(1, 21) % 4 == 0).astype(int)})
+    wands = pd.DataFrame({"ID": np.arange(1, rows + 1), "CODE": rng.integers(1, 21, rows),
+                          "COINS_NEEDED": rng.integers(100, 10_000, rows), "POWER": rng.integers(1, 11, rows)})
+    return {"STATION": station, "CITY": city, "COUNTRY": countries, "STUDENTS": students, "GRADES": grades,
+            "EMPLOYEE": employee, "HACKERS": hackers, "CHALLENGES": challenges, "DIFFICULTY": difficulty,
+            "SUBMISSIONS": submissions, "WANDS": wands, "WANDS_PROPERTY": wands_property}
+
+
+def result_checksum(result):
+    # Engine-independent fingerprint: column names differ between engines for expressions, so only values count
+    values = result.astype(str).to_numpy().tolist()
+    rounded = [[re.sub(r"^(-?\d+)\.0$", r"\1", v) for v in row] for row in values]
+    # Rows are sorted first: without an ORDER BY the engines are free to return them in any order
+    return hashlib.sha1(json.dumps(sorted(rounded)).encode()).hexdigest()
+
+
+def bench_sql(df, workdir, repeat, results):
+    rows = len(df)
+    tables = generate_sql_tables(rows)
+    queries = load_sql_corpus()
+    engines = []
+    for engine in ("DuckDB", "SQLite"):
+        try:
+            stage = dft.SQLStage(engine)
+        except ImportError as e:
+            print(f"sql        {engine} skipped: {e}")
+            continue
+        start = time.perf_counter()
+        for name, table in tables.items():
+            stage.register(name, table)
+        results.append({"suite": "sql", "case": f"register tables ({engine})", "rows": rows, "cols": len(tables),
+                        "seconds": round(time.perf_counter() - start, 6)})
+        engines.append(stage)
+
+    for title, sql in queries:
+        checksums = {}
+        for stage in engines:
+            case = f"{title} ({stage.engine})"
+            record(results, "sql", case, rows, 0, lambda stage=stage, sql=sql: stage.query(sql), repeat)
+            if "error" in results[-1]:
+                continue
+            result = stage.query(sql)
+            results[-1]["result_rows"] = len(result)
+            checksums[stage.engine] = result_checksum(result)
+        if len(set(checksums.values())) > 1:
+            print(f"sql        {title}: engines disagree on the result")
+            results[-1]["engines_agree"] = False
+    for stage in engines:
+        stage.close()
+
+
+SUITES = {
+    "read": bench_read,
+    "write": bench_write,
+    "validate": bench_validate,
+    "reverse": bench_reverse,
+    "sql": bench_sql,
+}
+
+# ---------------------------
+# Cold start
+# ---------------------------
+
+# Runs in a fresh interpreter; EAGER reproduces the old behaviour of importing everything up front
+STARTUP_PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+if EAGER:
+    import pandas, numpy, xmlschema, xml.etree.ElementTree
+import tkinter as tk
+import Dataformatting_tool as dft
+result = {"import_s": time.perf_counter() - start}
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    root = None
+    result["window_error"] = str(e)
+if root is not None:
+    app = dft.ExcelConverterApp(root)
+    root.update()
+    result["first_window_s"] = time.perf_counter() - start
+    app.df = dft.pd.DataFrame({"id": range(25), "name": ["sample"] * 25})
+    app.on_format_change()
+    app.preview_output()
+    root.update()
+    root.destroy()
+else:
+    # No display: time the same first-preview work without the widgets
+    df = dft.pd.DataFrame({"id": range(25), "name": ["sample"] * 25})
+    dft.render_fixed_width_lines(df, [10, 10])
+result["first_preview_s"] = time.perf_counter() - start
+print(json.dumps(result))
+'''
+
+
+def bench_startup(repeat, results):
+    here = os.path.dirname(os.path.abspath(__file__))
+    for case, eager in (("lazy imports", False), ("eager imports", True)):
+        runs = []
+        for _ in range(repeat):
+            probe = f"EAGER = {eager}\n" + STARTUP_PROBE
+            out = subprocess.run([sys.executable, "-c", probe], cwd=here, capture_output=True, text=True)
+            if out.returncode != 0:
+                results.append({"suite": "startup", "case": case, "error": out.stderr.strip().splitlines()[-1]})
+                print(f"{'startup':<10} {case:<40} ERROR {out.stderr.strip()}")
+                break
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        if not runs:
+            continue
+        entry = {"suite": "startup", "case": case, "rows": 0, "cols": 0}
+        for key in ("import_s", "first_window_s", "first_preview_s"):
+            values = [run[key] for run in runs if key in run]
+            if values:
+                entry[key] = round(min(values), 4)
+        if "window_error" in runs[0]:
+            entry["window_error"] = runs[0]["window_error"]
+        # "seconds" is time to first window when a display exists, otherwise module import time
+        entry["seconds"] = entry.get("first_window_s", entry["import_s"])
+        results.append(entry)
+        print(f"{'startup':<10} {case:<40} window {entry.get('first_window_s', float('nan')):7.3f}s "
+              f"import {entry['import_s']:7.3f}s first preview {entry['first_preview_s']:7.3f}s")
+
+# ---------------------------
+# Reporting
+# ---------------------------
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["suite"], r["case"], r["rows"], r["cols"]): r for r in json.load(f)["results"]}
+    print(f"\nComparison against {baseline_path} (ratio > 1 means slower than baseline)")
+    for r in results:
+        old = baseline.get((r["suite"], r["case"], r["rows"], r["cols"]))
+        if old and "seconds" in r and old.get("seconds"):
+            print(f"{r['suite']:<10} {r['case']:<40} {r['seconds'] / old['seconds']:6.2f}x time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the converter's startup, read, write, validation, reverse and SQL paths.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000], help="row counts to benchmark")
+    parser.add_argument("--cols", type=int, default=10, help="number of columns")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="dtype mix as name:weight pairs (int, float, str, date, bool)")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES) + ["startup"], default=list(SUITES) + ["startup"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per case; the fastest is reported")
+    parser.add_argument("--output", default="bench_output.json", help="JSON results file")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    if "startup" in args.suites:
+        bench_startup(args.repeat, results)
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            df = generate_frame(rows, args.cols, args.mix)
+            for suite in args.suites:
+                if suite in SUITES:
+                    SUITES[suite](df, workdir, args.repeat, results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cols": args.cols,
+            "mix": args.mix,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
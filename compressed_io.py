@@ -0,0 +1,195 @@
+import bz2
+import gzip
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Output/input stack shared by Dataformatting_tool.py and Excelconverter.py: standard library only, so
+# Excelconverter can compress without importing the full tool (and pandas with it)
+
+# ---------------------------
+# Helper Classes for Instrumentation
+# ---------------------------
+
+class MeteredFile(io.RawIOBase):
+    # Raw file layer under the text/compression stack; records the bytes and time spent in actual disk writes
+    def __init__(self, f, digest=None):
+        self.f = f
+        self.bytes = 0
+        self.seconds = 0.0
+        self.digest = digest    # optional hashlib object fed with every byte written
+
+    def writable(self):
+        return True
+
+    # Reported as seekable with tell() at the bytes written so TextIOWrapper knows it is at the start of the
+    # stream and emits the BOM for utf-16 / utf-8-sig (it never writes one to a non-seekable raw file)
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.bytes
+
+    def write(self, data):
+        start = time.perf_counter()
+        n = self.f.write(data)
+        if self.digest is not None:
+            self.digest.update(data)
+        self.seconds += time.perf_counter() - start
+        self.bytes += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self.f.close()
+        super().close()
+
+# ---------------------------
+# Helper Functions for Compressed I/O
+# ---------------------------
+
+COMPRESSION_CODECS = ["gzip", "zstd", "bz2"]
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst", "bz2": ".bz2"}
+COMPRESSION_LEVELS = {"gzip": 6, "zstd": 3, "bz2": 9}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd", b"BZh": "bz2"}
+COMPRESS_BUFFER_BYTES = 1 << 20
+
+
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd needs the zstandard package (pip install zstandard); choose gzip or bz2 instead.")
+    return zstandard
+
+
+class GzipMembersWriter(io.RawIOBase):
+    # Multithreaded gzip without pgzip: the stream is cut into blocks that are compressed as separate gzip
+    # members on a thread pool (zlib releases the GIL) and written in order. Concatenated members are one
+    # valid gzip stream to gzip, zcat and pandas, and mtime=0 keeps the bytes independent of the thread count
+    block_bytes = COMPRESS_BUFFER_BYTES
+
+    def __init__(self, sink, level, threads):
+        self.sink = sink
+        self.level = level
+        self.threads = threads
+        self.pool = ThreadPoolExecutor(threads)
+        self.pending = []
+        self.buffer = bytearray()
+        self.members = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_bytes:
+            self.submit(bytes(self.buffer[:self.block_bytes]))
+            del self.buffer[:self.block_bytes]
+        return len(data)
+
+    def submit(self, block):
+        self.pending.append(self.pool.submit(gzip.compress, block, self.level, mtime=0))
+        self.members += 1
+        # Bounded look-ahead: enough blocks in flight to keep every thread busy
+        while len(self.pending) > 2 * self.threads:
+            self.sink.write(self.pending.pop(0).result())
+
+    def close(self):
+        if not self.closed:
+            try:
+                if self.buffer or not self.members:
+                    self.submit(bytes(self.buffer))
+                    self.buffer.clear()
+                for future in self.pending:
+                    self.sink.write(future.result())
+                self.pending = []
+            finally:
+                self.pool.shutdown()
+        super().close()
+
+
+def open_compressor(sink, codec, level=None, threads=None):
+    # Binary writer compressing into sink, which stays open. threads=None uses every core where the codec
+    # can: zstd always, gzip through pgzip when installed and GzipMembersWriter otherwise; bz2 is single-threaded.
+    level = COMPRESSION_LEVELS[codec] if level is None else level
+    if codec == "gzip":
+        try:
+            import pgzip
+            return pgzip.PgzipFile(fileobj=sink, mode="wb", compresslevel=level, mtime=0, thread=threads)
+        except ImportError:
+            threads = threads or os.cpu_count() or 1
+            if threads > 1:
+                return GzipMembersWriter(sink, level, threads)
+            # mtime=0 keeps identical exports byte-identical
+            return gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=level, mtime=0)
+    if codec == "zstd":
+        compressor = import_zstandard().ZstdCompressor(level=level, threads=-1 if threads is None else threads)
+        return compressor.stream_writer(sink, closefd=False)
+    if codec == "bz2":
+        return bz2.BZ2File(sink, "wb", compresslevel=level)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+class CompressedFile(MeteredFile):
+    # Uncompressed side of the codec; its bytes/seconds cover compression plus the disk writes underneath
+    def __init__(self, disk, codec, level=None, threads=None):
+        self.sink = io.BufferedWriter(disk, COMPRESS_BUFFER_BYTES)
+        super().__init__(open_compressor(self.sink, codec, level, threads))
+
+    def close(self):
+        if not self.closed:
+            self.f.close()
+            self.sink.close()
+        io.RawIOBase.close(self)
+
+
+def open_output(path, encoding, compression=None, level=None, digest=None, threads=None):
+    # Text layer -> [MeteredFile of uncompressed bytes -> codec] -> MeteredFile of the bytes on disk
+    disk = MeteredFile(open(path, "wb"), digest)
+    plain = None
+    try:
+        if compression:
+            plain = CompressedFile(disk, compression, level, threads)
+            binary = io.BufferedWriter(plain, COMPRESS_BUFFER_BYTES)
+        else:
+            binary = io.BufferedWriter(disk)
+    except Exception:
+        disk.close()
+        os.remove(path)
+        raise
+    return io.TextIOWrapper(binary, encoding=encoding, newline=""), disk, plain
+
+
+def compressed_path(path, codec):
+    ext = COMPRESSION_EXTENSIONS.get(codec, "")
+    return path if not ext or path.lower().endswith(ext) else path + ext
+
+
+def input_compression(path):
+    # Decided by magic bytes, so a mislabelled extension doesn't matter
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_input(path):
+    # Binary reader that decompresses gzip/zstd/bz2 inputs as a stream
+    codec = input_compression(path)
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "bz2":
+        return bz2.open(path, "rb")
+    if codec == "zstd":
+        return import_zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True,
+                                                                   closefd=True)
+    return open(path, "rb")
+
+
+def strip_compression_ext(path):
+    base, ext = os.path.splitext(path)
+    return base if ext.lower() in COMPRESSION_EXTENSIONS.values() else path
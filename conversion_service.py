@@ -0,0 +1,450 @@
+import argparse
+import csv
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lazy_imports import LazyModule, warm_imports
+
+# The HTTP side only needs the standard library; the engine is imported in the workers
+dft = LazyModule("Dataformatting_tool")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+WORKBOOK_CACHE_SIZE = 4     # parsed workbooks kept per worker process
+SCHEMA_CACHE_SIZE = 16      # compiled XSDs / record generators kept per worker process
+JOB_HISTORY = 1000          # finished jobs kept for GET /jobs/<id>
+RETURN_ERRORS = 50          # validation errors sent back with a job result
+
+# ---------------------------
+# Worker Side
+# ---------------------------
+
+_workbooks = OrderedDict()   # (path, mtime_ns, size) -> DataFrame
+_schemas = OrderedDict()     # (kind, path, mtime_ns, ...) -> XMLSchema / XSDRecordGenerator
+
+
+def init_worker():
+    # Runs once per pool process, so jobs never pay for the pandas/xmlschema imports
+    warm_imports(dft, dft.pd, dft.np, dft.xmlschema)
+
+
+def worker_info():
+    return {"pid": os.getpid(), "workbooks": len(_workbooks), "schemas": len(_schemas)}
+
+
+def cached(cache, key, limit, build):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key], True
+    value = build()
+    cache[key] = value
+    while len(cache) > limit:
+        cache.popitem(last=False)
+    return value, False
+
+
+def file_key(path):
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def load_workbook(path, trace):
+    # Cached frames are shared between jobs; writers and validation only read them
+    return cached(_workbooks, file_key(path), WORKBOOK_CACHE_SIZE, lambda: dft.read_workbook(path, trace))
+
+
+def load_generator(xsd_path, columns):
+    key = ("generator",) + file_key(xsd_path) + (tuple(columns),)
+    return cached(_schemas, key, SCHEMA_CACHE_SIZE, lambda: dft.XSDRecordGenerator(xsd_path, columns))
+
+
+def load_schema(xsd_path):
+    key = ("schema",) + file_key(xsd_path)
+    return cached(_schemas, key, SCHEMA_CACHE_SIZE, lambda: dft.xmlschema.XMLSchema(xsd_path))
+
+
+def suggested_widths(df):
+    return [max(10, int(df[col].astype(str).str.len().max()) if len(df) else 10) for col in df.columns]
+
+
+def job_writer(spec, df, generator=None):
+    fmt, path = spec["format"], spec["output"]
+    encoding = spec.get("encoding", "utf-8")
+    formats = dft.ColumnFormat.parse_all(spec.get("formats"))
+    if fmt == "Fixed Width":
+        writer = dft.FixedWidthBlockWriter(path, encoding, spec.get("widths") or suggested_widths(df), formats)
+    elif fmt == "Delimited":
+        writer = dft.DelimitedBlockWriter(path, encoding, spec.get("delimiter", ","), formats)
+    elif fmt == "JSON":
+        writer = dft.JSONBlockWriter(path, encoding)
+    elif fmt == "XML":
+        if generator is not None:
+            writer = dft.XSDBlockWriter(path, encoding, generator, spec.get("skip_invalid", False))
+        else:
+            writer = dft.XMLBlockWriter(path, encoding, spec.get("root_tag", "Root"), spec.get("row_tag", "Row"),
+                                        formats)
+    elif fmt == "Database (SQLite)":
+        return dft.SQLiteBlockWriter(path, spec.get("table") or "data", spec.get("index_columns", []))
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    writer.compression = spec.get("compression")
+    return writer
+
+
+def validate_job(spec, df, generator, trace):
+    # Same checks as the GUI's perform_validation: column rules, then the XSD field checks
+    rules = [dft.ValidationRule(*rule) for rule in spec.get("rules", [])]
+    max_errors = spec.get("max_errors")
+    with trace.span("perform_validation", rows=len(df)):
+        if spec.get("report"):
+            with open(spec["report"], "w", newline="", encoding="utf-8") as f:
+                report = csv.writer(f)
+                report.writerow(["row", "column", "rule", "message"])
+                errors, count, stopped = dft.validate_frame(df, rules, max_errors, report)
+        else:
+            errors, count, stopped = dft.validate_frame(df, rules, max_errors)
+        schema_errors = []
+        if generator is not None and not stopped:
+            try:
+                schema_errors.extend(generator.problems)
+                schema_errors.extend(generator.row_errors(df, limit=10))
+                if spec.get("xsd_check") and not schema_errors:
+                    load_schema(spec["xsd"])[0].validate(generator.document(df))
+            except dft.xmlschema.validators.exceptions.XMLSchemaValidationError as e:
+                schema_errors.append(str(e))
+            except Exception as e:
+                schema_errors.append(f"Schema validation failed: {e}")
+    return {
+        "error_count": count,
+        "stopped": stopped,
+        "errors": [[int(idx) + 1, msg] for idx, msg in errors[:RETURN_ERRORS]],
+        "schema_errors": [str(e) for e in schema_errors[:RETURN_ERRORS]]
+    }
+
+
+def run_job(spec):
+    trace = dft.PipelineTrace()
+    result = {"worker": os.getpid(), "written": False}
+    df, result["workbook_cached"] = load_workbook(spec["input"], trace)
+    generator = None
+    if spec.get("format") == "XML" and spec.get("xsd"):
+        with trace.span("compile xsd"):
+            generator, result["schema_cached"] = load_generator(spec["xsd"], df.columns)
+    if spec.get("validate"):
+        result["validation"] = validation = validate_job(spec, df, generator, trace)
+        if (validation["error_count"] or validation["schema_errors"]) and not spec.get("write_on_errors"):
+            result["stages"] = trace.stages
+            return result
+    writer = job_writer(spec, df, generator)
+    writer.trace = trace
+    with writer:
+        writer.write_block(df)
+    result.update(written=True, rows=len(df), output=spec["output"], stages=trace.stages)
+    if isinstance(writer, dft.XSDBlockWriter) and writer.rows_rejected:
+        result["rows"] -= writer.rows_rejected
+        result["rows_rejected"] = writer.rows_rejected
+        result["rejected"] = writer.errors[:RETURN_ERRORS]
+    if not isinstance(writer, dft.SQLiteBlockWriter):
+        result["bytes"] = writer.raw.bytes
+    return result
+
+# ---------------------------
+# Service
+# ---------------------------
+
+class ConversionService:
+    # Jobs wait in a priority queue (higher first, FIFO within a priority) and are handed to the
+    # pool only when a worker is free, so a late high-priority job overtakes the backlog
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # spawn: workers start clean (no copied server threads) and behave the same on Windows
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=init_worker)
+        self.queue = queue.PriorityQueue()
+        self.slots = threading.Semaphore(self.workers)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.started = time.time()
+        threading.Thread(target=self.dispatch, daemon=True).start()
+
+    def warm(self):
+        # One no-op per worker so the imports happen before the first real job
+        return [f.result() for f in [self.pool.submit(worker_info) for _ in range(self.workers)]]
+
+    def submit(self, spec):
+        missing = [key for key in ("input", "output", "format") if not spec.get(key)]
+        if missing:
+            raise ValueError(f"Job is missing {', '.join(missing)}")
+        priority = int(spec.get("priority", 0))
+        with self.lock:
+            job_id = str(next(self.ids))
+            self.jobs[job_id] = {"id": job_id, "state": "queued", "priority": priority,
+                                 "format": spec["format"], "input": spec["input"], "output": spec["output"],
+                                 "submitted": time.time()}
+        self.queue.put((-priority, int(job_id), job_id, spec))
+        return job_id
+
+    def dispatch(self):
+        while True:
+            self.slots.acquire()
+            _, _, job_id, spec = self.queue.get()
+            with self.lock:
+                job = self.jobs[job_id]
+                job["state"] = "running"
+                job["started"] = time.time()
+                job["queue_seconds"] = job["started"] - job["submitted"]
+            try:
+                future = self.pool.submit(run_job, spec)
+            except Exception as e:    # a broken pool (a worker was killed) fails the job instead of the dispatcher
+                self.slots.release()
+                with self.lock:
+                    job.update(state="failed", error=str(e), finished=time.time(), run_seconds=0.0)
+                continue
+            future.add_done_callback(lambda f, job=job: self.finish(job, f))
+
+    def finish(self, job, future):
+        self.slots.release()
+        with self.lock:
+            job["finished"] = time.time()
+            job["run_seconds"] = job["finished"] - job["started"]
+            try:
+                job["result"] = future.result()
+                job["state"] = "done" if job["result"]["written"] else "rejected"
+            except Exception as e:
+                job["state"] = "failed"
+                job["error"] = str(e)
+            self.prune()
+
+    def prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if "finished" in job]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def health(self):
+        with self.lock:
+            states = [job["state"] for job in self.jobs.values()]
+        return {"status": "ok", "workers": self.workers, "queued": states.count("queued"),
+                "running": states.count("running"), "uptime_seconds": time.time() - self.started}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def send_json(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, self.service.health())
+        elif self.path.startswith("/jobs/"):
+            job = self.service.status(self.path[len("/jobs/"):])
+            if job is None:
+                self.send_json(404, {"error": "Unknown job"})
+            else:
+                self.send_json(200, job)
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self.send_json(404, {"error": "Not found"})
+            return
+        # A web page can't send application/json to another origin without a preflight this server never answers
+        if self.headers.get("Content-Type", "").split(";")[0].strip() != "application/json":
+            self.send_json(415, {"error": "Jobs must be posted as application/json"})
+            return
+        try:
+            spec = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            job_id = self.service.submit(spec)
+        except (ValueError, TypeError, AttributeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(202, {"id": job_id})
+
+
+def is_loopback(host):
+    try:
+        return all(ipaddress.ip_address(info[4][0]).is_loopback
+                   for info in socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP))
+    except (socket.gaierror, ValueError):
+        return False
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    # Jobs name any input/output/report path and the workers write there, so only local clients may submit
+    if not is_loopback(host):
+        raise ValueError(f"Refusing to listen on {host}: jobs write to paths chosen by the client, so the service "
+                         f"only listens on loopback addresses (127.0.0.1, ::1, localhost).")
+    service = ConversionService(workers)
+    print(f"Warming {service.workers} worker(s)...", flush=True)
+    service.warm()
+    ServiceHandler.service = service
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    print(f"Conversion service listening on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+# ---------------------------
+# Client
+# ---------------------------
+
+def service_request(url, path, payload=None, timeout=10):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url.rstrip("/") + path, data=data,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.load(e).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise RuntimeError(f"Conversion service: {message}") from None
+
+
+def service_available(url=DEFAULT_URL):
+    try:
+        return service_request(url, "/health", timeout=2).get("status") == "ok"
+    except (OSError, RuntimeError, ValueError):
+        return False
+
+
+def submit_job(spec, url=DEFAULT_URL):
+    return service_request(url, "/jobs", spec)["id"]
+
+
+def job_status(job_id, url=DEFAULT_URL):
+    return service_request(url, f"/jobs/{job_id}")
+
+
+def wait_for_job(job_id, url=DEFAULT_URL, poll=0.2, timeout=None):
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        job = job_status(job_id, url)
+        if job["state"] not in ("queued", "running"):
+            return job
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"Job {job_id} still {job['state']} after {timeout}s")
+        time.sleep(poll)
+
+
+def job_summary(job):
+    if job["state"] == "failed":
+        return f"Job {job['id']} failed: {job.get('error')}"
+    result = job.get("result", {})
+    validation = result.get("validation")
+    if job["state"] == "rejected":
+        return (f"Job {job['id']} not written: {validation['error_count']} validation error(s), "
+                f"{len(validation['schema_errors'])} schema error(s)")
+    if job["state"] != "done":
+        return f"Job {job['id']} {job['state']}"
+    stages = ", ".join(f"{name} {stage['seconds']:.2f}s" for name, stage in result.get("stages", {}).items())
+    cache = "cached workbook" if result.get("workbook_cached") else "workbook parsed"
+    rejected = result.get("rows_rejected")
+    rejected = f", {rejected} rows left out (not valid for the XSD)" if rejected else ""
+    return (f"Job {job['id']}: {result['rows']} rows to {result['output']} in {job['run_seconds']:.2f}s "
+            f"(queued {job['queue_seconds']:.2f}s, {cache}; {stages}){rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local conversion service with a warm worker pool.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the service")
+    serve_cmd.add_argument("--host", default=DEFAULT_HOST, help="loopback address to listen on")
+    serve_cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_cmd.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+
+    submit_cmd = commands.add_parser("submit", help="queue a conversion job")
+    submit_cmd.add_argument("input", help="Excel workbook")
+    submit_cmd.add_argument("output")
+    submit_cmd.add_argument("--format", default="Delimited",
+                            choices=["Fixed Width", "Delimited", "JSON", "XML", "Database (SQLite)"])
+    submit_cmd.add_argument("--delimiter", default=",")
+    submit_cmd.add_argument("--encoding", default="utf-8")
+    submit_cmd.add_argument("--compression", choices=["gzip", "zstd", "bz2"])
+    submit_cmd.add_argument("--widths", type=lambda s: [int(w) for w in s.split(",")],
+                            help="comma separated fixed widths")
+    submit_cmd.add_argument("--xsd", help="generate/validate XML from this schema")
+    submit_cmd.add_argument("--skip-invalid", action="store_true",
+                            help="leave out rows that don't fit the XSD instead of failing the job")
+    submit_cmd.add_argument("--spec", help="JSON file with further job settings (rules, formats, table, ...)")
+    submit_cmd.add_argument("--priority", type=int, default=0, help="higher runs first")
+    submit_cmd.add_argument("--wait", action="store_true", help="wait for the job and print its timing")
+    submit_cmd.add_argument("--url", default=DEFAULT_URL)
+
+    status_cmd = commands.add_parser("status", help="show a job")
+    status_cmd.add_argument("job_id")
+    status_cmd.add_argument("--url", default=DEFAULT_URL)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            serve(args.host, args.port, args.workers)
+        except ValueError as e:
+            sys.exit(str(e))
+        return
+    if args.command == "status":
+        print(json.dumps(job_status(args.job_id, args.url), indent=2))
+        return
+
+    spec = {}
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    spec.update({"input": os.path.abspath(args.input), "output": os.path.abspath(args.output),
+                 "format": args.format, "delimiter": args.delimiter, "encoding": args.encoding,
+                 "priority": args.priority})
+    for key in ("compression", "widths"):
+        if getattr(args, key):
+            spec[key] = getattr(args, key)
+    if args.xsd:
+        spec["xsd"] = os.path.abspath(args.xsd)
+    if args.skip_invalid:
+        spec["skip_invalid"] = True
+    spec.setdefault("validate", bool(spec.get("rules")))
+    job_id = submit_job(spec, args.url)
+    if not args.wait:
+        print(job_id)
+        return
+    job = wait_for_job(job_id, args.url)
+    print(job_summary(job))
+    sys.exit(0 if job["state"] == "done" else 1)
+
+
+if __name__ == "__main__":
+    main()
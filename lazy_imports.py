@@ -0,0 +1,42 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    # Stand-in for a module that is only imported on first attribute access, so the Tk window
+    # can appear before pandas/xmlschema have loaded
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def warm_imports(*modules):
+    # Meant for a background thread once the window is up; a failed optional import is reported on first real use
+    for module in modules:
+        try:
+            module._load()
+        except ImportError:
+            pass
+
+
+def warm_in_background(root, *modules, delay_ms=100):
+    root.after(delay_ms, lambda: threading.Thread(target=warm_imports, args=modules, daemon=True).start())
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeVar:
+    # Stands in for tk.StringVar / tk.Entry so app methods can run without a display
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    import Dataformatting_tool as dft
+
+    statuses = []
+
+    def build(df, fmt="Fixed Width", encoding="utf-8", width="8", **values):
+        app = object.__new__(dft.ExcelConverterApp)
+        app.df = df
+        app.workbook_df = df
+        app.format_var = FakeVar(fmt)
+        app.encoding_var = FakeVar(encoding)
+        app.delimiter_var = FakeVar(",")
+        app.compression_var = FakeVar("None")
+        app.xml_sample_type = None
+        app.col_width_entries = [(col, FakeVar(width)) for col in df.columns]
+        app.col_format_entries = []
+        for name, value in values.items():
+            setattr(app, name, FakeVar(value))
+        app.statuses = statuses
+        app.set_status = statuses.append
+        return app
+
+    errors = []
+    monkeypatch.setattr(dft.messagebox, "showerror", lambda *args: errors.append(args))
+    monkeypatch.setattr(dft.messagebox, "showwarning", lambda *args: errors.append(args))
+    build.errors = errors
+    return build
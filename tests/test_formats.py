@@ -0,0 +1,119 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Dataformatting_tool as dft
+
+
+def iterrows_fixed_width(df, widths):
+    # The row-by-row renderer the column-wise one replaced
+    lines = []
+    for _, row in df.iterrows():
+        line = ""
+        for col, width in zip(df.columns, widths):
+            val = "" if pd.isnull(row[col]) else str(row[col])
+            line += val[:width].ljust(width)
+        lines.append(line)
+    return lines
+
+
+def iterrows_xml(df, row_tag):
+    rows = []
+    for _, row in df.iterrows():
+        item = ET.Element(row_tag)
+        for col in df.columns:
+            child = ET.SubElement(item, col)
+            child.text = "" if pd.isnull(row[col]) else str(row[col])
+        rows.append(ET.tostring(item, encoding="unicode"))
+    return rows
+
+
+@pytest.fixture
+def frame():
+    n = 500
+    rng = np.random.RandomState(1)
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "amt": rng.rand(n) * 1e4 - 5e3,
+        "name": rng.choice(["a&b", "<x>", "plain", "", None], n),
+        "when": pd.date_range("2020-01-01", periods=n, freq="h"),
+        "flag": rng.rand(n) > .5,
+        "mixed": rng.choice(np.array([1, "x", 2.5, None], dtype=object), n),
+        "ts": pd.date_range("2020-01-01", periods=n, freq="1500ms"),
+        "nint": pd.array(rng.choice([1, None], n), dtype="Int64"),
+    })
+    df.loc[::7, "amt"] = np.nan
+    df.loc[::11, "when"] = pd.NaT
+    return df
+
+
+def test_no_spec_matches_the_row_by_row_renderers(frame):
+    widths = [6, 12, 5, 19, 5, 4, 26, 3]
+    assert dft.render_fixed_width_lines(frame, widths) == iterrows_fixed_width(frame, widths)
+    assert dft.render_xml_rows(frame, "Row") == iterrows_xml(frame, "Row")
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("%d/%m/%Y", {"date": "%d/%m/%Y", "align": "<", "zero": False, "width": None, "decimals": None}),
+    (".2", {"date": None, "align": "<", "zero": False, "width": None, "decimals": 2}),
+    (">12.2", {"date": None, "align": ">", "zero": False, "width": 12, "decimals": 2}),
+    ("08", {"date": None, "align": ">", "zero": True, "width": 8, "decimals": None}),
+    ("0", {"date": None, "align": ">", "zero": True, "width": None, "decimals": None}),
+])
+def test_column_format_parses_specs(spec, expected):
+    fmt = dft.ColumnFormat(spec)
+    assert {key: getattr(fmt, key) for key in expected} == expected
+
+
+@pytest.mark.parametrize("spec", ["x", "<<", ".a", "0>", ""])
+def test_column_format_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        dft.ColumnFormat(spec)
+
+
+def test_parse_all_names_the_column():
+    assert dft.ColumnFormat.parse_all({"a": " ", "b": ".1"}).keys() == {"b"}
+    with pytest.raises(ValueError, match="Column 'a'"):
+        dft.ColumnFormat.parse_all({"a": "bad"})
+
+
+def test_numbers_dates_and_padding():
+    numbers = pd.Series([1.234, -5.0, None])
+    assert list(dft.column_texts(numbers, dft.ColumnFormat(".2"))) == ["1.23", "-5.00", ""]
+    assert list(dft.column_texts(numbers, dft.ColumnFormat("08.1"))) == ["000001.2", "-00005.0", ""]
+    assert list(dft.column_texts(pd.Series([7, 42]), dft.ColumnFormat("0"), width=4)) == ["0007", "0042"]
+    dates = pd.Series(pd.to_datetime(["2021-03-04", None]))
+    assert list(dft.column_texts(dates, dft.ColumnFormat("%d/%m/%Y"))) == ["04/03/2021", ""]
+    text_dates = pd.Series(["2021-03-04", "soon"], dtype=object)
+    assert list(dft.column_texts(text_dates, dft.ColumnFormat("%Y%m%d"))) == ["20210304", "soon"]
+
+
+@pytest.mark.parametrize("pattern", ["%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%y%m%d %% at %H.%M", "%b %d", "100%"])
+def test_date_texts_match_strftime(pattern):
+    seconds = np.random.default_rng(0).integers(-9 * 10**9, 10**11, 2000)
+    dates = pd.Series(pd.to_datetime(seconds, unit="s"))
+    dates[::7] = pd.NaT
+    texts = dft.column_texts(dates, dft.ColumnFormat(pattern))
+    assert list(texts) == [text if isinstance(text, str) else "" for text in dates.dt.strftime(pattern)]
+
+
+def test_plain_texts_match_str():
+    for series in (pd.Series([True, False]), pd.Series([1, -2, np.iinfo(np.int64).min]),
+                   pd.Series([2**64 - 1], dtype=np.uint64), pd.Series([1, None], dtype="Int64")):
+        assert list(dft.plain_texts(series)) == [str(v) for v in series.to_numpy(dtype=object)]
+
+
+@pytest.mark.parametrize("dtype", [object, "str"])
+def test_numbers_held_as_text_are_formatted(dtype):
+    series = pd.Series(["1.5", "x", None, "-2"], dtype=dtype)
+    assert list(dft.column_texts(series, dft.ColumnFormat(".2"))) == ["1.50", "x", "", "-2.00"]
+
+
+def test_formats_apply_to_fixed_width_and_xml():
+    df = pd.DataFrame({"id": [3, 14], "amt": [2.5, None], "name": ["a&b", "c"]})
+    formats = dft.ColumnFormat.parse_all({"id": "0", "amt": ">8.2", "name": ">4"})
+    assert dft.render_fixed_width_lines(df, [4, 8, 4], formats) == ["0003    2.50 a&b", "0014           c"]
+    assert dft.render_xml_rows(df.head(1), "Row", formats) == [
+        "<Row><id>3</id><amt>    2.50</amt><name> a&amp;b</name></Row>"]
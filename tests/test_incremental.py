@@ -0,0 +1,157 @@
+import os
+
+import pandas as pd
+import pytest
+
+import Dataformatting_tool as dft
+
+FORMATS = ["Fixed Width", "Delimited"]
+ENCODINGS = ["utf-8", "utf-16"]
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "name": ["a", 'b,"c', "x\ny", "d"],
+        "when": pd.to_datetime(["2024-01-01", "2024-01-02", None, "2024-01-04"]),
+        "amt": [1.5, None, 2.25, 3.0],
+    })
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "patched.txt"), str(tmp_path / "full.txt")
+
+
+def export_both(app, df, patched, full):
+    fmt = app.format_var.get()
+    app.incremental_export(patched, fmt, df)
+    app.write_output(df, full, fmt)
+    with open(patched, "rb") as a, open(full, "rb") as b:
+        return a.read(), b.read()
+
+
+def incremental_app(make_app, df, fmt, encoding):
+    return make_app(df, fmt, encoding, incr_key_var="id", incr_mode_var="Patch in place")
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_first_export_matches_full_write(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    patched, full = export_both(app, frame, *paths)
+    assert patched == full
+    assert dft.ExportManifest.load(paths[0]).in_sync
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_update_is_patched_in_place(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    export_both(app, frame, *paths)
+    changed = frame.copy()
+    changed.loc[0, "name"] = "A"       # same record length, so the bytes can be overwritten
+    changed.loc[3, "amt"] = 4.5
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("Patched")
+    assert "2 updates" in app.statuses[-1]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_insert_is_appended(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    export_both(app, frame, *paths)
+    changed = pd.concat([frame, pd.DataFrame({"id": [9, 10], "name": ["new", "é"]})], ignore_index=True)
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert "2 inserts" in app.statuses[-1]
+
+    # The offsets recorded for the appended rows must hold for the next patch too
+    changed.loc[4, "name"] = "old"
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("Patched")
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_delete_falls_back_to_full_rewrite(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    export_both(app, frame, *paths)
+    changed = frame.drop(index=1).reset_index(drop=True)
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("Patch not possible")
+    assert set(dft.ExportManifest.load(paths[0]).rows) == {"1", "3", "4"}
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_changed_record_length_falls_back(make_app, frame, paths, encoding):
+    app = incremental_app(make_app, frame, "Delimited", encoding)
+    export_both(app, frame, *paths)
+    changed = frame.copy()
+    changed.loc[0, "name"] = "a much longer name"
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("Patch not possible")
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_mismatched_manifest_rewrites(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    export_both(app, frame, *paths)
+    # New widths / delimiter: the old offsets describe a different layout
+    app.col_width_entries[-1][1].set("12")
+    app.delimiter_var.set("Single Pipe (|)")
+    changed = frame.copy()
+    changed.loc[2, "name"] = "z"
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("No matching previous manifest")
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_stale_manifest_rewrites(make_app, frame, paths, fmt, encoding):
+    app = incremental_app(make_app, frame, fmt, encoding)
+    export_both(app, frame, *paths)
+
+    # A delta run leaves the base output behind the manifest
+    changed = frame.copy()
+    changed.loc[0, "name"] = "q"
+    app.incr_mode_var.set("Delta file")
+    app.incremental_export(paths[0], fmt, changed)
+    assert not dft.ExportManifest.load(paths[0]).in_sync
+    base, ext = os.path.splitext(paths[0])
+    assert os.path.exists(f"{base}.delta{ext}")
+
+    app.incr_mode_var.set("Patch in place")
+    changed.loc[3, "name"] = "r"
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+    assert app.statuses[-1].startswith("Patch not possible")
+    assert dft.ExportManifest.load(paths[0]).in_sync
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_missing_output_rewrites(make_app, frame, paths, fmt):
+    app = incremental_app(make_app, frame, fmt, "utf-8")
+    export_both(app, frame, *paths)
+    os.remove(paths[0])
+    changed = frame.copy()
+    changed.loc[0, "name"] = "q"
+    patched, full = export_both(app, changed, *paths)
+    assert patched == full
+
+
+def test_unchanged_rows_leave_output_alone(make_app, frame, paths):
+    app = incremental_app(make_app, frame, "Fixed Width", "utf-8")
+    export_both(app, frame, *paths)
+    before = os.stat(paths[0]).st_mtime_ns
+    app.incremental_export(paths[0], "Fixed Width", frame)
+    assert os.stat(paths[0]).st_mtime_ns == before
+    assert app.statuses[-1] == "No changed rows since the previous export."
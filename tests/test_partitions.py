@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import compressed_io as cio
+import Dataformatting_tool as dft
+
+
+@pytest.fixture
+def frame():
+    n = 103
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "region": [["North", "south", "A/B", "A_B", None, "South"][i % 6] for i in range(n)],
+        "amt": np.arange(n) * 1.25,
+    })
+
+
+def test_rows_per_file_plan(frame):
+    parts = dft.plan_partitions(frame, "Rows per file", 25)
+    assert [part["label"] for part in parts] == ["part00001", "part00002", "part00003", "part00004", "part00005"]
+    assert [(part["row_start"], part["row_end"]) for part in parts] == [(0, 25), (25, 50), (50, 75), (75, 100),
+                                                                       (100, 103)]
+    pd.testing.assert_frame_equal(pd.concat(part["frame"] for part in parts), frame)
+
+
+def test_empty_frame_still_gets_one_file(frame):
+    parts = dft.plan_partitions(frame.iloc[:0], "Rows per file", 10)
+    assert len(parts) == 1 and parts[0]["frame"].empty
+
+
+def test_column_value_plan_keeps_first_seen_order_and_unique_labels(frame):
+    parts = dft.plan_partitions(frame, "By column value", column="region")
+    assert [part["label"] for part in parts] == ["North", "south", "A_B", "A_B_2", "empty", "South_2"]
+    assert [part["value"] for part in parts] == ["North", "south", "A/B", "A_B", None, "South"]
+    for part in parts:
+        expected = frame[frame["region"].isna()] if part["value"] is None else \
+            frame[frame["region"] == part["value"]]
+        pd.testing.assert_frame_equal(part["frame"], expected)
+    assert sum(len(part["frame"]) for part in parts) == len(frame)
+
+
+def test_partition_path_keeps_the_compression_extension():
+    assert dft.partition_path("out/data.txt.gz", "part00001") == "out/data.part00001.txt.gz"
+    assert dft.partition_path("data.csv", "North") == "data.North.csv"
+
+
+def partition_app(make_app, frame, fmt, mode, value, compression="None"):
+    app = make_app(frame, fmt, partition_mode_var=mode, partition_value_var=value)
+    app.compression_var.set(compression)
+    return app
+
+
+@pytest.mark.parametrize("fmt", ["Fixed Width", "Delimited", "JSON", "XML"])
+def test_each_partition_matches_writing_its_rows_alone(make_app, frame, tmp_path, fmt):
+    app = partition_app(make_app, frame, fmt, "Rows per file", "40")
+    save_path = str(tmp_path / "out.txt")
+    entries = app.write_partitions(frame, save_path, fmt, dft.PipelineTrace())
+    assert [entry["file"] for entry in entries] == ["out.part00001.txt", "out.part00002.txt", "out.part00003.txt"]
+
+    with open(dft.partition_manifest_path(save_path)) as f:
+        manifest = json.load(f)
+    assert manifest["total_rows"] == len(frame) and manifest["files"] == entries
+    for entry, part in zip(entries, dft.plan_partitions(frame, "Rows per file", 40)):
+        data = (tmp_path / entry["file"]).read_bytes()
+        alone = str(tmp_path / "alone.txt")
+        app.write_output(part["frame"], alone, fmt, app.fixed_widths_for(frame))
+        with open(alone, "rb") as f:
+            assert data == f.read()
+        assert entry["rows"] == len(part["frame"])
+        assert entry["bytes"] == len(data)
+        assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_column_value_partitions_record_their_value(make_app, frame, tmp_path):
+    app = partition_app(make_app, frame, "Delimited", "By column value", "region")
+    entries = app.write_partitions(frame, str(tmp_path / "out.csv"), "Delimited", dft.PipelineTrace())
+    assert [entry["value"] for entry in entries] == ["North", "south", "A/B", "A_B", None, "South"]
+    north = pd.read_csv(tmp_path / "out.North.csv")
+    assert north["id"].tolist() == frame["id"][frame["region"] == "North"].tolist()
+
+
+def test_partitions_share_the_cores_for_compression(make_app, frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(dft, "PARTITION_WORKERS", 4)
+    monkeypatch.setattr(dft.os, "cpu_count", lambda: 8)
+    threads = []
+    open_compressor = cio.open_compressor
+
+    def recording(sink, codec, level=None, count=None):
+        threads.append(count)
+        return open_compressor(sink, codec, level, count)
+
+    monkeypatch.setattr(cio, "open_compressor", recording)
+    app = partition_app(make_app, frame, "Delimited", "Rows per file", "20", "gzip")
+    save_path = str(tmp_path / "out.csv.gz")
+    entries = app.write_partitions(frame, save_path, "Delimited", dft.PipelineTrace())
+    assert len(entries) == 6
+    # 4 files at a time, 8 cores: two compression threads each rather than 8 per file
+    assert threads == [2] * 6
+
+    for entry, part in zip(entries, dft.plan_partitions(frame, "Rows per file", 20)):
+        alone = str(tmp_path / "alone.csv")
+        app.compression_var.set("None")
+        app.write_output(part["frame"], alone, "Delimited")
+        with open(alone, "rb") as f:
+            assert gzip.decompress((tmp_path / entry["file"]).read_bytes()) == f.read()
+
+
+def test_partition_compression_threads():
+    cores = os.cpu_count() or 1
+    assert dft.partition_compression_threads(1) == cores
+    assert dft.partition_compression_threads(cores * 2) == 1
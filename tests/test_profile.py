@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Dataformatting_tool as dft
+
+
+def hashes(values):
+    return pd.util.hash_pandas_object(pd.Series(values).astype(str), index=False).to_numpy()
+
+
+def sketch(values, precision=12):
+    hll = dft.HyperLogLog(precision)
+    hll.add_hashes(hashes(values))
+    return hll
+
+
+def relative_error(hll, n):
+    return abs(hll.count() - n) / n
+
+
+# Standard error is 1.04 / sqrt(4096) ~ 1.6%; allow four of them
+TOLERANCE = 4 * 1.04 / np.sqrt(4096)
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 100])
+def test_small_counts_are_near_exact(n):
+    # Linear counting range: hardly any register collisions
+    assert abs(sketch([f"v{i}" for i in range(n)]).count() - n) <= 2
+
+
+@pytest.mark.parametrize("n", [1000, 20000, 100000, 300000])
+def test_counts_stay_within_error(n):
+    assert relative_error(sketch([f"v{i}" for i in range(n)]), n) < TOLERANCE
+    assert relative_error(sketch(np.arange(n)), n) < TOLERANCE
+
+
+def test_duplicates_do_not_count():
+    values = [f"v{i % 500}" for i in range(50000)]
+    assert relative_error(sketch(values), 500) < TOLERANCE
+
+
+def test_empty_sketch_counts_zero():
+    hll = dft.HyperLogLog()
+    hll.add_hashes(np.array([], dtype=np.uint64))
+    assert hll.count() == 0
+
+
+def test_merge_matches_single_sketch():
+    a, b = sketch(np.arange(0, 60000)), sketch(np.arange(40000, 100000))
+    whole = sketch(np.arange(0, 100000))
+    merged = a.merge(b)
+    assert np.array_equal(merged.registers, whole.registers)
+    assert relative_error(merged, 100000) < TOLERANCE
+
+
+def test_merge_refuses_other_precision():
+    with pytest.raises(ValueError):
+        dft.HyperLogLog(10).merge(dft.HyperLogLog(12))
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "id": np.arange(1000),
+        "amt": np.where(np.arange(1000) % 10 == 0, np.nan, np.arange(1000) * 1.5),
+        "name": [None if i % 4 == 0 else f"name{i % 37}" for i in range(1000)],
+        "when": pd.to_datetime("2024-01-01") + pd.to_timedelta(np.arange(1000) % 5, unit="D"),
+    })
+
+
+def test_column_profile(frame):
+    profile = dft.FrameProfile.of(frame)
+    assert profile.rows == 1000
+    assert profile.columns == list(frame.columns)
+    amt = profile.column_profiles["amt"]
+    assert amt.nulls == 100
+    assert amt.min == 1.5 and amt.max == 999 * 1.5
+    assert amt.distinct.count() == pytest.approx(900, abs=10)
+    name = profile.column_profiles["name"]
+    assert name.min == "name0" and name.max == "name9"
+    assert name.distinct.count() == 37
+    assert profile.column_profiles["when"].max == pd.Timestamp("2024-01-05")
+    assert profile.max_width("name") == 6
+    assert profile.max_width("missing") == 0
+    assert profile.null_counts.to_dict() == {"id": 0, "amt": 100, "name": 250, "when": 0}
+
+
+def test_block_updates_match_whole_frame(frame):
+    whole = dft.FrameProfile.of(frame)
+    blocked = dft.FrameProfile()
+    for start in range(0, 1000, 128):
+        blocked.update(frame.iloc[start:start + 128])
+    assert blocked.rows == whole.rows
+    for col in frame.columns:
+        a, b = whole.column_profiles[col], blocked.column_profiles[col]
+        assert (a.nulls, a.min, a.max, a.max_len, a.dtype) == (b.nulls, b.min, b.max, b.max_len, b.dtype)
+        assert np.array_equal(a.distinct.registers, b.distinct.registers)
+
+
+def test_blocks_of_different_types_compare_as_text():
+    profile = dft.FrameProfile()
+    profile.update(pd.DataFrame({"c": [5, 12]}))
+    profile.update(pd.DataFrame({"c": ["abc", "10"]}))
+    column = profile.column_profiles["c"]
+    assert column.dtype == "int64/str"
+    assert (column.min, column.max) == ("10", "abc")
@@ -0,0 +1,82 @@
+import pandas as pd
+
+import Dataformatting_tool as dft
+
+
+def test_single_record_document_picks_the_record_not_the_header(tmp_path):
+    path = tmp_path / "feed.xml"
+    path.write_text('<Feed><Header><Rows>1</Rows></Header>'
+                    '<Items><Item id="1"><Name>a</Name><Qty>2</Qty></Item></Items></Feed>')
+    assert dft.XMLRecordMapper.find_record_path(str(path)) == "Items/Item"
+    df = dft.parse_reverse_file(str(path), "XML")
+    assert df.to_dict("records") == [{"id": "1", "Name": "a", "Qty": "2"}]
+
+
+def test_records_match_on_their_full_path(tmp_path):
+    path = tmp_path / "feed.xml"
+    path.write_text('<Feed><Items><Item id="1"/><Item id="2"><Sub><Item id="99"/></Sub></Item></Items>'
+                    '<Other><Item id="x"/></Other></Feed>')
+    df = dft.XMLRecordMapper({"id": "@id"}, "Items/Item").read(str(path))
+    assert df["id"].tolist() == ["1", "2"]
+
+
+def test_xml_round_trip_keeps_dotted_column_names(tmp_path):
+    path = tmp_path / "out.xml"
+    df = pd.DataFrame({"x.y": ["1", "2"], "b": ["p", "q"]})
+    with dft.XMLBlockWriter(str(path), "utf-8", "root", "row") as writer:
+        writer.write_block(df)
+    assert list(dft.parse_reverse_file(str(path), "XML").columns) == ["x.y", "b"]
+
+
+def test_fixed_width_output_sniffs_back_to_its_own_columns(tmp_path):
+    # Every column has values that fill their width, so no blank character column separates the fields
+    words = ["alpha", "beta", "gamma", "epsilon", "eta", "kappa"]
+    n = 60
+    df = pd.DataFrame({
+        "id": [100000 + i * 7919 % 900000 for i in range(n)],
+        "name": [f"{words[i % 6]}{i * 37 % 1000}" for i in range(n)],
+        "code": [f"{words[i * 5 % 6]}{i % 10}" for i in range(n)],
+        "price": [round(i * 1.37 % 500, 2) for i in range(n)],
+        "flag": [i % 3 == 0 for i in range(n)],
+    })
+    widths = [int(df[col].astype(str).str.len().max()) for col in df.columns]
+    path = tmp_path / "out.txt"
+    with dft.FixedWidthBlockWriter(str(path), "utf-8", widths) as writer:
+        writer.write_block(df)
+    sniff = dft.InputSniff(str(path))
+    assert sniff.format == "Fixed Width"
+    assert sniff.widths == widths
+    assert not sniff.header
+    back = dft.parse_reverse_file(str(path), "Fixed Width", widths=sniff.widths, header=False)
+    assert back.astype(str).values.tolist() == df.astype(str).values.tolist()
+
+
+def test_fixed_width_sniff_keeps_text_with_spaces_together():
+    lines = ["New York    12", "Los Angeles 13", "Paris       14", "San Diego   15"]
+    assert dft.fixed_width_boundaries(lines) == [12, 2]
+
+
+def test_iter_records_detaches_finished_records(tmp_path, monkeypatch):
+    path = tmp_path / "feed.xml"
+    groups = "".join(f'<Group n="{g}">' + "".join(f'<Item id="{g}-{i}"><Name>n{i}</Name></Item>' for i in range(50))
+                     + "</Group><Note>skip</Note>" for g in range(200))
+    path.write_text(f"<Feed><Header><Rows>10000</Rows></Header>{groups}</Feed>")
+    roots = []
+    iterparse = dft.ET.iterparse
+
+    def watched(*args, **kwargs):
+        for event, elem in iterparse(*args, **kwargs):
+            if not roots:
+                roots.append(elem)
+            yield event, elem
+
+    monkeypatch.setattr(dft.ET, "iterparse", watched)
+    ids, sizes = [], []
+    for records in dft.XMLRecordMapper.iter_records(str(path), "Group/Item", batch=30):
+        ids.extend(record.get("id") for record in records)
+        assert all(record.find("Name") is not None for record in records)
+        sizes.append(sum(1 for _ in roots[0].iter()))
+    assert len(ids) == 10000 and ids[-1] == "199-49"
+    # Only the elements the parser has read ahead stay in the tree, not the 20,000+ already handed out
+    assert max(sizes) < 2000
+    assert len(roots[0]) == 0
@@ -0,0 +1,70 @@
+import time
+
+import pandas as pd
+import pytest
+
+import conversion_service as svc
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = svc.ConversionService(1)
+    service.warm()
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "book.xlsx"
+    pd.DataFrame({"id": range(1, 2001), "name": ["a", None] * 1000}).to_excel(path, index=False)
+    return str(path)
+
+
+def wait(service, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while service.status(job_id)["state"] in ("queued", "running"):
+        assert time.time() < deadline, f"job {job_id} did not finish"
+        time.sleep(0.05)
+    return service.status(job_id)
+
+
+def test_job_is_converted(service, workbook, tmp_path):
+    out = tmp_path / "out.csv"
+    job = wait(service, service.submit({"input": workbook, "output": str(out), "format": "Delimited"}))
+    assert job["state"] == "done"
+    assert job["result"]["rows"] == 2000
+    assert out.read_text().splitlines()[:2] == ["id,name", "1,a"]
+
+
+def test_higher_priority_overtakes_the_queue(service, workbook, tmp_path):
+    # The first job holds the only worker while the other two wait in the queue
+    spec = {"input": workbook, "format": "Delimited"}
+    busy = service.submit(dict(spec, output=str(tmp_path / "busy.csv")))
+    while service.status(busy)["state"] == "queued":
+        time.sleep(0.001)
+    low = service.submit(dict(spec, output=str(tmp_path / "low.csv"), priority=0))
+    high = service.submit(dict(spec, output=str(tmp_path / "high.csv"), priority=5))
+    jobs = {job_id: wait(service, job_id) for job_id in (busy, low, high)}
+    assert all(job["state"] == "done" for job in jobs.values())
+    assert jobs[busy]["started"] <= jobs[high]["started"] <= jobs[low]["started"]
+
+
+def test_failed_validation_rejects_the_job(service, workbook, tmp_path):
+    out = tmp_path / "out.csv"
+    job = wait(service, service.submit({"input": workbook, "output": str(out), "format": "Delimited",
+                                        "validate": True, "rules": [["name", "not_null", None]]}))
+    assert job["state"] == "rejected"
+    assert job["result"]["validation"]["error_count"] == 1000
+    assert not out.exists()
+
+
+def test_incomplete_job_is_refused(service):
+    with pytest.raises(ValueError, match="output"):
+        service.submit({"input": "book.xlsx", "format": "JSON"})
+
+
+def test_serve_refuses_non_loopback_hosts():
+    assert svc.is_loopback("127.0.0.1") and svc.is_loopback("localhost")
+    with pytest.raises(ValueError, match="loopback"):
+        svc.serve("0.0.0.0", 0)
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pandas as pd
+
+import Dataformatting_tool as dft
+
+
+def test_sqlite_dialect_renames_calls_only_outside_quotes():
+    sql = "SELECT LEFT(name, 2), 'LEFT(x', \"RIGHT(\" FROM t LEFT JOIN u ON 1 WHERE right (a, 1) = 'it''s LEFT('"
+    assert dft.sqlite_dialect(sql) == ("SELECT STR_LEFT(name, 2), 'LEFT(x', \"RIGHT(\" FROM t LEFT JOIN u ON 1 "
+                                       "WHERE STR_RIGHT(a, 1) = 'it''s LEFT('")
+
+
+def test_sqlite_stage_runs_renamed_calls():
+    stage = dft.SQLStage("SQLite")
+    stage.register("t", pd.DataFrame({"name": ["alpha", "beta"]}))
+    result = stage.query("SELECT LEFT(name, 2) AS l, RIGHT(name, 2) AS r, 'LEFT(' AS s FROM t ORDER BY name")
+    assert result.values.tolist() == [["al", "ha", "LEFT("], ["be", "ta", "LEFT("]]
+
+
+def test_sqlite_writer_stores_durations_as_seconds(tmp_path):
+    path = tmp_path / "out.db"
+    df = pd.DataFrame({"id": [1, 2], "took": pd.to_timedelta(["1 min 30s", None])})
+    with dft.SQLiteBlockWriter(str(path), "t") as writer:
+        writer.write_block(df)
+    con = sqlite3.connect(path)
+    try:
+        assert con.execute("SELECT * FROM t").fetchall() == [(1, 90.0), (2, None)]
+        assert con.execute("SELECT type FROM pragma_table_info('t') WHERE name = 'took'").fetchone() == ("REAL",)
+    finally:
+        con.close()
+
+
+class FakeListbox:
+    def __init__(self):
+        self.items = []
+        self.selected = ()
+
+    def delete(self, first, last=None):
+        self.items = []
+
+    def insert(self, index, item):
+        self.items.append(item)
+
+    def curselection(self):
+        return self.selected
+
+
+class FakeWidget:
+    def config(self, **kwargs):
+        self.options = kwargs
+
+    def select(self, tab):
+        pass
+
+
+def test_validation_errors_on_sql_result_point_into_the_grid(make_app):
+    df = pd.DataFrame({"id": range(6), "name": ["a", None, "c", "d", None, "f"]})
+    app = make_app(df, sql_enabled=True, sql_engine_var="SQLite", validation_enabled=True)
+    app.sql_stage = None
+    app.reverse_df = None
+    app.sql_text = type("Text", (), {"get": lambda self, *args: "SELECT * FROM data WHERE id >= 3"})()
+    app.validation_rules = [dft.ValidationRule("name", "not_null")]
+    app.error_listbox = FakeListbox()
+    app.validation_summary_label = app.preview_notebook = FakeWidget()
+    jumped = []
+    grid = app.data_grid = object.__new__(dft.VirtualGrid)
+    grid.render = lambda: None
+    grid.jump_to_position = jumped.append
+    grid.set_frame(df)
+
+    result = app.export_frame()
+    app.perform_validation(result)
+    assert grid.df is result
+    assert app.error_listbox.items == ["Row 2: Value cannot be null or empty"]
+
+    app.error_listbox.selected = (0,)
+    app.on_error_select()
+    assert jumped == [1]
+    assert result.iloc[jumped[0]]["id"] == 4
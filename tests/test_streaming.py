@@ -0,0 +1,96 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+import Dataformatting_tool as dft
+
+openpyxl = pytest.importorskip("openpyxl")
+
+ROWS = 10
+
+
+def cells(r):
+    return [
+        None if r == 7 else r,                              # ints with one null, late in the sheet
+        r + 0.5,
+        None if r == 3 else f" s{r} ",
+        r if r < 5 else f"t{r}",                            # numbers, then text
+        r % 2 == 0,
+        None if r == 8 else datetime.datetime(2024, 1, r + 1),
+        None,
+        float(r),                                           # whole floats read back as ints
+        None if r == 6 else r % 2 == 0,
+        None if r < 6 else r,                               # empty until the last blocks
+    ]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["i", "f", "s", "mix", "b", "d", "empty", "wf", "bn", "late"])
+    for r in range(ROWS):
+        ws.append(cells(r))
+    ws.append([None] * 10)      # trailing blank rows are dropped by read_excel
+    ws.append([None] * 10)
+    path = str(tmp_path / "book.xlsx")
+    wb.save(path)
+    return path
+
+
+def streamed(path, block_size):
+    types = dft.ExcelColumnTypes()
+    first = list(dft.iter_excel_blocks(path, block_size, types=types))
+    dtypes = types.dtypes(first[0].columns)
+    return dtypes, [dft.normalize_frame(block) for block in dft.iter_excel_blocks(path, block_size, dtypes)]
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 4, 7, 100])
+def test_streamed_blocks_match_read_excel(workbook, block_size):
+    full = dft.read_workbook(workbook)
+    dtypes, blocks = streamed(workbook, block_size)
+    assert list(full.dtypes) == dtypes
+    pd.testing.assert_frame_equal(pd.concat(blocks), full)
+    assert [len(block) for block in blocks][:-1] == [block_size] * (len(blocks) - 1)
+
+
+def test_first_pass_blocks_are_typed_on_their_own(workbook):
+    first, second, third = dft.iter_excel_blocks(workbook, 4)
+    assert first["i"].dtype == "int64" and second["i"].dtype == "float64"
+    assert third["late"].dtype == "int64" and first["late"].dtype == "float64"
+    assert list(third.index) == [8, 9]
+
+
+def test_conform_block_casts_to_settled_dtypes():
+    block = pd.DataFrame({"a": [1, 2], "b": ["x", "y"], "c": [True, False]})
+    dft.conform_block(block, [pd.api.types.pandas_dtype("float64"), object, bool])
+    assert block["a"].dtype == "float64"
+    assert block["b"].dtype == object
+    assert block["c"].dtype == bool
+
+
+def test_xls_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        next(dft.iter_excel_blocks(str(tmp_path / "old.xls"), 10))
+
+
+@pytest.mark.parametrize("fmt", ["Fixed Width", "Delimited", "JSON", "XML"])
+def test_streaming_export_matches_in_memory_export(make_app, workbook, tmp_path, fmt):
+    full = dft.read_workbook(workbook)
+    app = make_app(full, fmt, width="12", block_size_var="3")
+    in_memory = tmp_path / "memory.out"
+    app.write_output(full, str(in_memory), fmt)
+
+    app.load_excel_streaming(workbook, dft.PipelineTrace())
+    assert app.stream_source == workbook
+    assert app.profile.rows == ROWS
+    assert app.profile.column_profiles["i"].dtype == "float64"
+    pd.testing.assert_frame_equal(app.df, full.iloc[:3])
+
+    out = tmp_path / "streamed.out"
+    writer = app.make_block_writer(str(out), fmt, app.fixed_widths_for(full), app.df.columns)
+    with writer:
+        for block in app.iter_stream_blocks(workbook, dft.PipelineTrace()):
+            writer.write_block(block)
+    assert out.read_bytes() == in_memory.read_bytes()
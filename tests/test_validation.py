@@ -0,0 +1,138 @@
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Dataformatting_tool as dft
+
+
+@pytest.fixture
+def frame():
+    n = 1000
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "name": ["" if i % 10 == 3 else None if i % 10 == 7 else f"n{i}" for i in range(n)],
+        "code": [f"A{i}" if i % 50 else f"x{i}" for i in range(n)],
+        "when": ["2024-02-30" if i % 100 == 5 else "2024-01-01" for i in range(n)],
+    }, index=np.arange(n) + 5000)
+
+
+RULES = [dft.ValidationRule("name", "not_null"), dft.ValidationRule("code", "regex", r"A\d+"),
+         dft.ValidationRule("when", "date")]
+
+
+@pytest.mark.parametrize("rule, expected", [
+    (RULES[0], [i for i in range(1000) if i % 10 in (3, 7)]),
+    (RULES[1], list(range(0, 1000, 50))),
+    (RULES[2], list(range(5, 1000, 100))),
+])
+def test_rule_finds_every_bad_row(frame, rule, expected):
+    found = rule.validate(frame[rule.col_name])
+    assert [idx for idx, _ in found] == [5000 + i for i in expected]
+
+
+@pytest.mark.parametrize("limit", [0, 1, 7, 10, 500])
+@pytest.mark.parametrize("rule", RULES, ids=lambda rule: rule.rule_type)
+def test_rule_limit_keeps_the_first_rows(frame, rule, limit):
+    everything = rule.validate(frame[rule.col_name])
+    assert rule.validate(frame[rule.col_name], limit) == everything[:limit]
+
+
+def test_not_null_catches_blank_strings():
+    series = pd.Series(["a", " ", None, "b"], dtype="string")
+    assert [idx for idx, _ in dft.ValidationRule("s", "not_null").validate(series)] == [1, 2]
+
+
+def test_uncapped_run_reports_everything(frame):
+    errors, count, stopped = dft.validate_frame(frame, RULES)
+    assert count == 200 + 20 + 10
+    assert not stopped
+    assert len(errors) == count
+
+
+@pytest.mark.parametrize("cap", [1, 15, 199, 200, 205])
+def test_cap_stops_at_exactly_max_errors(frame, cap):
+    errors, count, stopped = dft.validate_frame(frame, RULES, max_errors=cap)
+    assert count == cap
+    assert stopped
+    assert len(errors) == cap
+
+
+def test_cap_above_total_does_not_stop(frame):
+    errors, count, stopped = dft.validate_frame(frame, RULES, max_errors=1000)
+    assert (count, stopped) == (230, False)
+
+
+def test_chunks_are_checked_in_row_order(frame, monkeypatch):
+    monkeypatch.setattr(dft, "VALIDATION_CHUNK_ROWS", 64)
+    errors, count, stopped = dft.validate_frame(frame, RULES)
+    assert (count, stopped) == (230, False)
+    assert sorted(errors) == sorted(dft.validate_frame(frame, RULES)[0])
+    chunks = [(idx - 5000) // 64 for idx, _ in errors]
+    assert chunks == sorted(chunks)
+
+
+def test_capped_run_skips_later_chunks(frame, monkeypatch):
+    monkeypatch.setattr(dft, "VALIDATION_CHUNK_ROWS", 100)
+    seen = []
+    original = dft.ValidationRule.validate
+
+    def spy(self, series, limit=None):
+        seen.append(series.index[0])
+        return original(self, series, limit)
+
+    monkeypatch.setattr(dft.ValidationRule, "validate", spy)
+    errors, count, stopped = dft.validate_frame(frame, RULES, max_errors=25)
+    assert stopped and count == 25
+    # 20 not_null errors per 100 rows: the second chunk's not_null check reaches the cap
+    assert seen == [5000, 5000, 5000, 5100]
+    assert [idx for idx, _ in errors][-5:] == [5000, 5050, 5005, 5103, 5107]
+
+
+def test_kept_errors_are_capped_but_counted(frame, monkeypatch):
+    monkeypatch.setattr(dft, "VALIDATION_KEEP_ERRORS", 12)
+    report = io.StringIO()
+    errors, count, stopped = dft.validate_frame(frame, RULES, report=csv.writer(report))
+    assert len(errors) == 12 and count == 230
+    rows = list(csv.reader(io.StringIO(report.getvalue())))
+    assert len(rows) == 230
+    assert rows[0] == ["5004", "name", "not_null", "Value cannot be null or empty"]
+
+
+def test_rules_for_missing_columns_are_skipped(frame):
+    rules = [dft.ValidationRule("gone", "not_null")] + RULES[:1]
+    assert dft.validate_frame(frame[["id", "name"]], rules)[1] == 200
+
+
+def test_empty_frame():
+    assert dft.validate_frame(pd.DataFrame({"name": []}), RULES) == ([], 0, False)
+
+
+@pytest.mark.parametrize("rows, n, strata", [(1000, 100, 100), (1003, 250, 100), (99991, 1000, 100),
+                                             (5000, 37, 100), (777, 400, 7)])
+def test_stratified_sample_covers_every_stratum(rows, n, strata):
+    df = pd.DataFrame({"v": np.arange(rows)}, index=np.arange(rows) * 3)
+    sample = dft.stratified_sample(df, n, strata, seed=1)
+    assert len(sample) == n
+    assert sample.index.is_unique and sample.index.is_monotonic_increasing
+    assert sample["v"].tolist() == (sample.index // 3).tolist()
+    edges = np.linspace(0, rows, min(strata, n) + 1).astype(int)
+    per_stratum = np.histogram(sample["v"], bins=edges)[0]
+    assert per_stratum.min() >= 1
+    share = np.diff(edges) * n / rows
+    assert np.all(np.abs(per_stratum - share) < 1)
+
+
+def test_stratified_sample_returns_small_frames_whole():
+    df = pd.DataFrame({"v": range(10)})
+    assert dft.stratified_sample(df, 10) is df
+
+
+def test_stratified_sample_finds_a_problem_confined_to_the_end():
+    rows = 100000
+    df = pd.DataFrame({"name": ["ok"] * (rows - 500) + [None] * 500})
+    sample = dft.stratified_sample(df, 1000, seed=3)
+    errors, count, _ = dft.validate_frame(sample, RULES[:1])
+    assert count >= 5
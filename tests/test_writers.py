@@ -0,0 +1,56 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+import compressed_io as cio
+import Dataformatting_tool as dft
+
+FRAME = pd.DataFrame({"id": [1, 2], "name": ["a", "é"]})
+
+WRITERS = {
+    "Fixed Width": lambda path, enc: dft.FixedWidthBlockWriter(path, enc, [5, 5]),
+    "Delimited ,": lambda path, enc: dft.DelimitedBlockWriter(path, enc, ","),
+    "Delimited ||": lambda path, enc: dft.DelimitedBlockWriter(path, enc, "||"),
+    "JSON": lambda path, enc: dft.JSONBlockWriter(path, enc),
+    "XML": lambda path, enc: dft.XMLBlockWriter(path, enc, "root", "row"),
+}
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+@pytest.mark.parametrize("encoding, bom", [("utf-16", b"\xff\xfe"), ("utf-8-sig", b"\xef\xbb\xbf")])
+@pytest.mark.parametrize("name", list(WRITERS))
+def test_writers_emit_one_bom(tmp_path, name, encoding, bom, compression):
+    path = tmp_path / "out"
+    writer = WRITERS[name](str(path), encoding)
+    writer.compression = compression
+    with writer:
+        writer.write_block(FRAME)
+        writer.write_block(FRAME)
+    data = path.read_bytes()
+    if compression:
+        data = gzip.decompress(data)
+    assert data.startswith(bom)
+    assert "\ufeff" not in data[len(bom):].decode(encoding.replace("-sig", ""))
+
+
+def test_gzip_members_writer_is_one_gzip_stream(monkeypatch):
+    monkeypatch.setattr(cio.GzipMembersWriter, "block_bytes", 1000)
+    data = b"".join(b"%d,alpha%d\n" % (i, i % 7) for i in range(5000))
+    sink = io.BytesIO()
+    writer = cio.GzipMembersWriter(sink, 6, 3)
+    for i in range(0, len(data), 777):
+        writer.write(data[i:i + 777])
+    writer.close()
+    assert writer.members == -(-len(data) // 1000)
+    assert gzip.decompress(sink.getvalue()) == data
+
+
+def test_excelconverter_compresses_through_the_shared_stack(tmp_path):
+    import Excelconverter as exc
+    path = str(tmp_path / "out.csv")
+    exc.write_output(FRAME, exc.compressed_path(path, "gzip"), "Delimited", compression="gzip")
+    exc.write_output(FRAME, path, "Delimited")
+    with open(path, "rb") as f:
+        assert gzip.decompress((tmp_path / "out.csv.gz").read_bytes()) == f.read().replace(b"\r\n", b"\n")
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+import xmlschema
+
+import Dataformatting_tool as dft
+
+SCHEMA = """<?xml version="1.0"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:simpleType name="Recent">
+    <xs:restriction base="xs:date">
+      <xs:minInclusive value="2020-01-01"/>
+      <xs:maxExclusive value="2030-01-01"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="Small">
+    <xs:restriction base="xs:int">
+      <xs:maxInclusive value="100"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="Orders">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Order" maxOccurs="unbounded">
+          <xs:complexType>
+            <xs:sequence>
+              <xs:element name="Qty" type="Small"/>
+              <xs:element name="Placed" type="Recent"/>
+            </xs:sequence>
+            <xs:attribute name="id" type="xs:int" use="required"/>
+          </xs:complexType>
+        </xs:element>
+      </xs:sequence>
+      <xs:attribute name="source" type="xs:string" use="required" fixed='A &amp; "B" &lt;C&gt;'/>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    path = tmp_path / "orders.xsd"
+    path.write_text(SCHEMA)
+    return str(path)
+
+
+def frame():
+    return pd.DataFrame({"id": [1, 2, 3, 4],
+                         "Qty": [5, 500, 7, 8],
+                         "Placed": pd.to_datetime(["2021-05-01", "2022-01-01", "2019-12-31", "2030-01-01"])})
+
+
+def test_date_range_facets_are_enforced(schema_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    errors = generator.row_errors(frame())
+    assert [error.split(":")[0] for error in errors] == ["Row 2", "Row 3", "Row 4"]
+    assert "Placed" in errors[1] and "Placed" in errors[2]
+
+
+def test_prologue_escapes_root_attributes(schema_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    assert generator.prologue() == '<Orders source=\'A &amp; "B" &lt;C&gt;\'>'
+
+
+def test_writer_fails_on_bad_rows(schema_path, tmp_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    path = tmp_path / "out.xml"
+    with pytest.raises(ValueError, match="Row 2"):
+        with dft.XSDBlockWriter(str(path), "utf-8", generator) as writer:
+            writer.write_block(frame().iloc[:1])
+            writer.write_block(frame().iloc[1:])
+    assert writer.rows_rejected == 0
+
+
+def test_writer_leaves_out_and_reports_bad_rows_when_asked(schema_path, tmp_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    path = tmp_path / "out.xml"
+    with dft.XSDBlockWriter(str(path), "utf-8", generator, skip_invalid=True) as writer:
+        writer.write_block(frame().iloc[:2])
+        writer.write_block(frame().iloc[2:])
+    assert writer.rows_rejected == 3
+    assert [error.split(":")[0] for error in writer.errors] == ["Row 2", "Row 3", "Row 4"]
+    document = path.read_text()
+    xmlschema.XMLSchema(schema_path).validate(document)
+    assert document.count("<Order ") == 1 and '<Order id="1">' in document
+
+
+def test_writer_accepts_valid_rows(schema_path, tmp_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    path = tmp_path / "out.xml"
+    with dft.XSDBlockWriter(str(path), "utf-8", generator) as writer:
+        writer.write_block(frame().iloc[:1])
+    xmlschema.XMLSchema(schema_path).validate(path.read_text())
+
+
+def test_document_still_fails_on_bad_rows(schema_path):
+    generator = dft.XSDRecordGenerator(schema_path, frame().columns)
+    with pytest.raises(ValueError, match="Row 2"):
+        generator.document(frame())